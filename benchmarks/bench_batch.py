@@ -0,0 +1,110 @@
+"""Batch capture benchmark: one Chrome per worker against tabs of one Chrome
+
+Usage:
+    python benchmarks/bench_batch.py [--decks N] [--slides N] [--workers N] [--tabs N]
+                                     [--modes processes,tabs] [--json FILE]
+
+Serves benchmarks/mock_presenter from localhost and captures the same mock
+deck N times with run_batch() (a process and browser per worker) and with
+run_async_batch() (tabs of one headless Chrome driven over DevTools). Reports
+decks/minute, peak RSS and the peak number of processes of the whole tree
+(Linux only) and both per deck. Needs Chrome, chromedriver and the websockets
+package, but no network access.
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from bench_capture import MOCK_DIR, load_capture_module, process_tree, serve
+
+
+class TreeSampler(threading.Thread):
+    """Track the peak RSS and process count of this process tree"""
+
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            tree = process_tree(os.getpid())
+            if tree:
+                self.peak_rss = max(self.peak_rss, sum(tree.values()))
+                self.peak_processes = max(self.peak_processes, len(tree))
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def run_mode(module, mode, url, decks, workers, tabs):
+    folder = tempfile.mkdtemp(prefix='bench_batch_')
+    jobs = [(url, os.path.join(folder, f'deck_{number:03d}')) for number in range(1, decks + 1)]
+    options = {'settle_mode': 'event', 'in_memory': True, 'frame_path_cache': None, 'headless': True}
+    try:
+        sampler = TreeSampler()
+        sampler.start()
+        started = time.perf_counter()
+        if mode == 'processes':
+            summary = module.run_batch(jobs, workers=workers, capture_options=options, summary_path=None)
+        else:
+            summary = module.run_async_batch(jobs, tabs=tabs, capture_options=options, summary_path=None)
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        failed = [result for result in summary if result['status'] != 'ok']
+        if failed:
+            raise RuntimeError(f"{len(failed)} decks failed: {failed[0]['error']}")
+        return {
+            'decks': decks,
+            'seconds': round(elapsed, 2),
+            'decks_per_minute': round(decks * 60 / elapsed, 2),
+            'peak_rss_mb': round(sampler.peak_rss / 1024 ** 2, 1),
+            'peak_processes': sampler.peak_processes,
+            'rss_mb_per_deck': round(sampler.peak_rss / 1024 ** 2 / decks, 1),
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch capture with worker processes and with browser tabs")
+    parser.add_argument('--decks', type=int, default=8, help="Decks to capture (default: 8)")
+    parser.add_argument('--slides', type=int, default=10, help="Slides in the mock deck (default: 10)")
+    parser.add_argument('--transition-ms', type=int, default=300, help="Slide transition duration (default: 300)")
+    parser.add_argument('--workers', type=int, default=4, help="Worker processes of run_batch (default: 4)")
+    parser.add_argument('--tabs', type=int, default=8, help="Concurrent tabs of run_async_batch (default: 8)")
+    parser.add_argument('--modes', default='processes,tabs', help="Comma-separated modes to run (default: processes,tabs)")
+    parser.add_argument('--json', metavar='FILE', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    module = load_capture_module()
+    logging.getLogger().setLevel(logging.WARNING)
+    server = serve(MOCK_DIR)
+    url = f'http://127.0.0.1:{server.server_address[1]}/index.html?slides={args.slides}&transition={args.transition_ms}'
+
+    results = {}
+    print(f"{'mode':<10} {'decks':>5} {'seconds':>8} {'decks/min':>10} {'peak RSS MB':>12} {'processes':>10} {'MB/deck':>8}")
+    try:
+        for mode in args.modes.split(','):
+            result = run_mode(module, mode, url, args.decks, args.workers, args.tabs)
+            results[mode] = result
+            print(f"{mode:<10} {result['decks']:>5} {result['seconds']:>8.2f} {result['decks_per_minute']:>10.2f} "
+                  f"{result['peak_rss_mb']:>12.1f} {result['peak_processes']:>10} {result['rss_mb_per_deck']:>8.1f}")
+    finally:
+        server.shutdown()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
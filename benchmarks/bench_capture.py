@@ -0,0 +1,188 @@
+"""End-to-end capture benchmark against a local mock of the PowerPoint Online presenter
+
+Usage:
+    python benchmarks/bench_capture.py [--slides N] [--transition-ms MS] [--builds N]
+                                       [--configs fixed,event,...] [--cross-origin] [--json FILE]
+
+Serves benchmarks/mock_presenter from localhost, runs capture_slides() with
+headless Chrome under each configuration and reports slides/sec, time to the
+first slide, peak RSS of the capture process tree (Chrome included, Linux
+only) and PDF size. Needs Chrome and chromedriver, but no network access.
+No results are recorded in the repository yet.
+"""
+import argparse
+import functools
+import http.server
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'powerpoint_capture.py')
+MOCK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_presenter')
+
+# PowerPointCapture options of each benchmarked configuration
+CONFIGS = {
+    'fixed': {},
+    'event': {'settle_mode': 'event'},
+    'event-memory': {'settle_mode': 'event', 'in_memory': True},
+    'event-pipeline': {'settle_mode': 'event', 'writer_threads': 2, 'stream_pdf': True},
+    'event-clip': {'settle_mode': 'event', 'in_memory': True, 'clip_to_slide': True},
+    'event-collapse': {'settle_mode': 'event', 'collapse_builds': True},
+    'single-step': {'single_step': True, 'in_memory': True},
+}
+
+
+def load_capture_module():
+    spec = importlib.util.spec_from_file_location('powerpoint_capture', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    """Serve directory on a free localhost port from a background thread"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def process_tree(pid):
+    """Resident memory in bytes of a process and each of its descendants, {pid: rss}, or None without /proc"""
+    parents = {}
+    rss = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status') as f:
+                fields = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue  # Process exited meanwhile
+        parents[int(entry)] = int(fields['PPid'])
+        rss[int(entry)] = int(fields.get('VmRSS', '0 kB').split()[0]) * 1024
+    tree = {pid}
+    grew = True
+    while grew:
+        children = {child for child, parent in parents.items() if parent in tree} - tree
+        grew = bool(children)
+        tree |= children
+    return {member: rss.get(member, 0) for member in tree}
+
+
+def tree_rss(pid):
+    """Resident memory in bytes of a process and all its descendants, or None without /proc"""
+    tree = process_tree(pid)
+    return sum(tree.values()) if tree is not None else None
+
+
+class Sampler(threading.Thread):
+    """Track the peak RSS of this process tree and when the first slide file appears"""
+
+    def __init__(self, folder, interval=0.05):
+        super().__init__(daemon=True)
+        self.folder = folder
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.first_slide = None
+        self.peak_rss = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            rss = tree_rss(os.getpid())
+            if rss:
+                self.peak_rss = max(self.peak_rss, rss)
+            if self.first_slide is None and any(name.startswith('slide_000') for name in os.listdir(self.folder)):
+                self.first_slide = time.perf_counter() - self.started
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def run_config(module, options, url):
+    folder = tempfile.mkdtemp(prefix='bench_capture_')
+    try:
+        sampler = Sampler(folder)
+        sampler.start()
+        with module.PowerPointCapture(headless=True, frame_path_cache=None, **options) as capture:
+            screenshots = capture.capture_slides(url, folder)
+        sampler.stop()
+        elapsed = time.perf_counter() - sampler.started
+        if screenshots is None:
+            raise RuntimeError(capture.last_error)
+        peak_rss = sampler.peak_rss
+        if not peak_rss and resource:
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # This process only
+        pdf_file = os.path.join(folder, 'presentation.pdf')
+        return {
+            'slides': len(screenshots),
+            'seconds': round(elapsed, 2),
+            'slides_per_second': round(len(screenshots) / elapsed, 3),
+            'first_slide_seconds': round(sampler.first_slide, 2) if sampler.first_slide is not None else None,
+            'peak_rss_mb': round(peak_rss / 1024 ** 2, 1),
+            'pdf_kb': round(os.path.getsize(pdf_file) / 1024, 1) if os.path.exists(pdf_file) else None,
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark capture_slides against a local mock presenter")
+    parser.add_argument('--slides', type=int, default=10, help="Slides in the mock deck (default: 10)")
+    parser.add_argument('--transition-ms', type=int, default=300, help="Slide transition duration (default: 300)")
+    parser.add_argument('--builds', type=int, default=0, help="Build animation steps per slide (default: 0)")
+    parser.add_argument('--no-counter', action='store_true', help="Hide the mock's slide counter")
+    parser.add_argument('--cross-origin', action='store_true', help="Load the viewer frame from another origin")
+    parser.add_argument('--configs', default=','.join(CONFIGS),
+                        help=f"Comma-separated configurations to run (default: {','.join(CONFIGS)})")
+    parser.add_argument('--json', metavar='FILE', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    module = load_capture_module()
+    logging.getLogger().setLevel(logging.WARNING)
+    server = serve(MOCK_DIR)
+    query = f'slides={args.slides}&transition={args.transition_ms}&builds={args.builds}'
+    if args.no_counter:
+        query += '&counter=0'
+    if args.cross_origin:
+        query += '&cross=1'
+    url = f'http://127.0.0.1:{server.server_address[1]}/index.html?{query}'
+
+    results = {}
+    print(f"{'config':<16} {'slides':>6} {'seconds':>8} {'slides/s':>9} {'first s':>8} {'peak RSS MB':>12} {'PDF KB':>8}")
+    try:
+        for name in args.configs.split(','):
+            result = run_config(module, CONFIGS[name], url)
+            results[name] = result
+            print(f"{name:<16} {result['slides']:>6} {result['seconds']:>8.2f} {result['slides_per_second']:>9.3f} "
+                  f"{result['first_slide_seconds'] or 0:>8.2f} {result['peak_rss_mb']:>12.1f} {result['pdf_kb'] or 0:>8.1f}")
+    finally:
+        server.shutdown()
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Micro-benchmark for the slide comparison engines
+
+Usage:
+    python benchmarks/bench_compare.py [--iterations N]
+
+Reports the median latency of images_equal() (including the grayscale/resize
+reduction) and of the buffer comparison alone, at 1080p and 4K.
+"""
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'powerpoint_capture.py')
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+}
+
+
+def load_capture_module():
+    spec = importlib.util.spec_from_file_location('powerpoint_capture', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_slide(size, seed):
+    """Draw a slide-like frame: flat background, title bar, text lines and a chart"""
+    rng = random.Random(seed)
+    width, height = size
+    img = Image.new('RGB', size, (250, 250, 250))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, width, height // 8], fill=(30, 60, 120))
+    for line in range(12):
+        y = height // 5 + line * height // 20
+        draw.rectangle([width // 12, y, width // 12 + rng.randint(width // 4, width // 2), y + height // 60],
+                       fill=(40, 40, 40))
+    for bar in range(6):
+        x = width // 2 + bar * width // 14
+        draw.rectangle([x, height - rng.randint(height // 8, height // 2), x + width // 20, height - height // 10],
+                       fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    return img
+
+
+def median_ms(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slide comparison engines")
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    module = load_capture_module()
+    engines = [e for e in module.SlideComparator.ENGINES if e != 'auto']
+    if module.np is None:
+        engines.remove('numpy')
+
+    print(f"{'resolution':<10} {'engine':<12} {'images_equal ms':>16} {'compare ms':>12}")
+    for label, size in RESOLUTIONS.items():
+        slide_a = make_slide(size, 1)
+        slide_b = make_slide(size, 2)
+        for engine in engines:
+            capture = module.PowerPointCapture(compare_engine=engine)
+            comparator = capture.comparator
+            buf_a = comparator.prepare(slide_a)
+            buf_b = comparator.prepare(slide_b)
+            # The pure-Python reference is orders of magnitude slower, keep its run short
+            iterations = max(1, args.iterations // 10) if engine == 'python' else args.iterations
+            full = median_ms(lambda: capture.images_equal(slide_a, slide_b), iterations)
+            compare = median_ms(lambda: comparator.equal(buf_a, buf_b), iterations)
+            print(f"{label:<10} {engine:<12} {full:>16.2f} {compare:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
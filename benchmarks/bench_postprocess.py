@@ -0,0 +1,92 @@
+"""Post-processing time of a deck with a growing number of worker processes
+
+Usage:
+    python benchmarks/bench_postprocess.py [--slides-folder slides] [--limit N] [--workers 0,1,2,4]
+                                           [--format png] [--no-sprite] [--optimize {png,webp}]
+
+Runs PowerPointCapture.postprocess() on the sample slides, building the PDF,
+the thumbnail sprite and (with --optimize) optimized copies, once inline and
+once per worker count, and reports the time, the slides per second and the
+speedup over one worker. Slides are first encoded under --format, like
+capture_slides() writes them. Needs no browser.
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'powerpoint_capture.py')
+SLIDES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'slides')
+
+
+def load_capture_module():
+    spec = importlib.util.spec_from_file_location('powerpoint_capture', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    # Worker processes look the post-processing function up by module name
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time post-processing of sample slides on worker processes")
+    parser.add_argument('--slides-folder', default=SLIDES, help="Folder with PNG slides (default: slides)")
+    parser.add_argument('--limit', type=int, default=100, help="Slides to post-process (default: 100)")
+    parser.add_argument('--workers', default=f'0,1,2,{os.cpu_count() or 1}',
+                        help="Comma-separated worker counts, 0 for inline (default: 0,1,2,<cores>)")
+    parser.add_argument('--format', default='png', help="Output profile of the slide files (default: png)")
+    parser.add_argument('--no-sprite', action='store_true', help="Do not build the thumbnail sprite")
+    parser.add_argument('--optimize', choices=('png', 'webp'), help="Also write optimized copies")
+    args = parser.parse_args()
+
+    module = load_capture_module()
+    files = sorted(glob.glob(os.path.join(args.slides_folder, '*.png')))[:args.limit]
+    if not files:
+        parser.error(f"No PNG files in {args.slides_folder}")
+
+    source = tempfile.mkdtemp(prefix='bench_postprocess_')
+    try:
+        profile = module.OutputProfile(args.format)
+        slides = []
+        for number, path in enumerate(files):
+            slide = os.path.join(source, f'slide_{number:03d}{profile.extension}')
+            if profile.passthrough:
+                shutil.copyfile(path, slide)
+            else:
+                with Image.open(path) as image, open(slide, 'wb') as f:
+                    f.write(profile.encode(image))
+            slides.append(slide)
+
+        print(f"{len(slides)} {args.format} slides, {os.cpu_count()} cores")
+        print(f"{'workers':>7} {'seconds':>8} {'slides/s':>9} {'speedup':>8}")
+        single = None
+        for workers in (int(value) for value in args.workers.split(',')):
+            folder = tempfile.mkdtemp(prefix='bench_postprocess_out_')
+            capture = module.PowerPointCapture(image_format=args.format, postprocess_workers=workers,
+                                               sprite=not args.no_sprite, optimize=args.optimize)
+            try:
+                if capture.postprocess_pool:
+                    # Start the worker processes before timing
+                    list(capture.postprocess_pool.map(abs, range(workers)))
+                start = time.perf_counter()
+                capture.postprocess(slides, folder, os.path.join(folder, 'presentation.pdf'))
+                elapsed = time.perf_counter() - start
+            finally:
+                capture.close()
+                shutil.rmtree(folder, ignore_errors=True)
+            if workers == 1:
+                single = elapsed
+            speedup = f'{single / elapsed:.2f}' if single else '-'
+            print(f"{workers:>7} {elapsed:>8.2f} {len(slides) / elapsed:>9.1f} {speedup:>8}")
+    finally:
+        shutil.rmtree(source, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Output size and encoding time of each output profile
+
+Usage:
+    python benchmarks/bench_profiles.py [--slides-folder slides] [--limit N] [--quality Q] [--dpi DPI]
+
+Encodes the sample slides under every image format (and, with --dpi, also
+downscaled), builds the PDF from the encoded files like capture_slides()
+does and reports the total size of the slide files and of the PDF, and the
+encoding time per slide.
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'powerpoint_capture.py')
+SLIDES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'slides')
+
+
+def load_capture_module():
+    spec = importlib.util.spec_from_file_location('powerpoint_capture', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_profile(module, profile, files, folder):
+    paths = []
+    start = time.perf_counter()
+    for number, source in enumerate(files):
+        path = os.path.join(folder, f'slide_{number:03d}{profile.extension}')
+        if profile.passthrough:
+            shutil.copyfile(source, path)
+        else:
+            with Image.open(source) as image, open(path, 'wb') as f:
+                f.write(profile.encode(image))
+        paths.append(path)
+    encode_ms = (time.perf_counter() - start) * 1000 / len(files)
+
+    pdf_file = os.path.join(folder, 'presentation.pdf')
+    start = time.perf_counter()
+    with module.StreamingPdfWriter(pdf_file, profile.pdf_resolution) as writer:
+        for path in paths:
+            writer.add_file(path, profile.pdf_quality)
+    pdf_ms = (time.perf_counter() - start) * 1000 / len(files)
+    return sum(os.path.getsize(path) for path in paths), os.path.getsize(pdf_file), encode_ms, pdf_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the output profiles on sample slides")
+    parser.add_argument('--slides-folder', default=SLIDES, help="Folder with PNG slides (default: slides)")
+    parser.add_argument('--limit', type=int, default=20, help="Slides to encode (default: 20)")
+    parser.add_argument('--quality', type=int, default=85, help="jpeg and webp quality (default: 85)")
+    parser.add_argument('--dpi', type=float, help="Also run every format downscaled to this DPI")
+    args = parser.parse_args()
+
+    module = load_capture_module()
+    files = sorted(glob.glob(os.path.join(args.slides_folder, '*.png')))[:args.limit]
+    if not files:
+        parser.error(f"No PNG files in {args.slides_folder}")
+
+    print(f"{len(files)} slides from {args.slides_folder}")
+    print(f"{'format':<12} {'dpi':>5} {'slides KB':>10} {'PDF KB':>8} {'encode ms':>10} {'PDF ms':>8}")
+    for dpi in (None, args.dpi) if args.dpi else (None,):
+        for image_format in module.OutputProfile.FORMATS:
+            profile = module.OutputProfile(image_format, args.quality, dpi)
+            folder = tempfile.mkdtemp(prefix='bench_profiles_')
+            try:
+                image_bytes, pdf_bytes, encode_ms, pdf_ms = run_profile(module, profile, files, folder)
+            finally:
+                shutil.rmtree(folder, ignore_errors=True)
+            print(f"{image_format:<12} {dpi or '-':>5} {image_bytes / 1024:>10.0f} {pdf_bytes / 1024:>8.0f} "
+                  f"{encode_ms:>10.1f} {pdf_ms:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
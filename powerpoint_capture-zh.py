@@ -1,331 +1,200 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, StaleElementReferenceException
-import time
-import os
-from PIL import Image
-import logging
-import sys
+"""SharePoint PowerPoint 演示文稿截图工具的中文命令行入口
 
-# 配置日志
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+采集功能都在 powerpoint_capture.py 中，这里只提供其消息的中文翻译。
+"""
+import powerpoint_capture
 
-class PowerPointCapture:
-    def __init__(self):
-        self.chrome_options = Options()
-        # 设置浏览器窗口大小为1920x1080
-        self.chrome_options.add_argument('--window-size=1920,1080')
-        self.chrome_options.add_argument('--start-maximized')
-        
-        # 其他必要的设置
-        self.chrome_options.add_argument('--disable-infobars')
-        self.chrome_options.add_argument('--disable-notifications')
-        self.chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-        self.chrome_options.add_experimental_option('useAutomationExtension', False)
+# 显示给用户的消息的中文翻译，键是 powerpoint_capture 中的英文 str.format 模板
+MESSAGES = {
+    "Could not save frame path cache: {}": "无法保存框架路径缓存: {}",
+    "Unknown comparison engine: {}": "未知的比较引擎: {}",
+    "The numpy comparison engine requires numpy to be installed": "numpy比较引擎需要安装numpy",
+    "Unknown image format: {}": "未知的图像格式：{}",
+    "Could not hard link slides from the store, copying them instead: {}": "无法从存储硬链接幻灯片，改为复制: {}",
+    "Failed to write slide {}: {}": "写入第 {} 页失败: {}",
+    "Could not fetch response body for {}: {}": "无法获取 {} 的响应内容: {}",
+    "Starting browser...": "启动浏览器...",
+    "Failed to quit browser: {}": "关闭浏览器失败: {}",
+    "Discarding unresponsive browser": "丢弃无响应的浏览器",
+    "Failed to reset browser, recycling it: {}": "重置浏览器失败，将其回收: {}",
+    "Unknown settle mode: {}": "未知的等待模式: {}",
+    "Unknown capture backend: {}": "未知的捕获后端: {}",
+    "Unknown optimized format: {}": "未知的优化格式: {}",
+    "Click attempt {} failed: {}": "点击尝试 {} 失败: {}",
+    "Present button search failed in frame {}: {}": "在框架 {} 中查找演示按钮失败: {}",
+    "Looking for Present button...": "正在查找演示按钮...",
+    "Could not find clickable Present button in any location": "在所有位置都未找到可点击的演示按钮",
+    "main page": "主页面",
+    "Present button found in {}": "在 {} 中找到演示按钮",
+    "Failed to click Present button: {}": "点击演示按钮失败: {}",
+    "Slide did not settle within the time limit, using fixed wait": "幻灯片在时限内未静止，改用固定等待",
+    "Settle detection failed, using fixed wait: {}": "静止检测失败，改用固定等待: {}",
+    "Could not read slide counter: {}": "无法读取页码计数器: {}",
+    "Could not read document version: {}": "无法读取文档版本: {}",
+    "Could not locate slide container: {}": "无法定位幻灯片容器: {}",
+    "Could not read slide text: {}": "无法读取幻灯片文字: {}",
+    "Slide container not found, no text layer for this frame": "未找到幻灯片容器，此画面没有文本层",
+    "Could not list slide images: {}": "无法列出幻灯片图片: {}",
+    "Failed to jump to slide {}: {}": "跳转到第 {} 张幻灯片失败: {}",
+    "Slide counter shows {} instead of slide {} after resuming; the deck may have changed since the last capture":
+        "恢复后幻灯片计数器显示 {}，而不是第 {} 页；上次采集后演示文稿可能已更改",
+    "nothing": "无",
+    "Slide still changing after {} build steps, moving on": "经过 {} 个动画步骤后幻灯片仍在变化，继续下一页",
+    "Slide step script failed: {}": "翻页脚本执行失败：{}",
+    "Presenter ignores keys sent from the page, using WebDriver key presses": "演示器忽略页面内发送的按键，改用 WebDriver 按键",
+    "Failed to send right arrow key: {}": "发送右箭头键失败: {}",
+    "Failed to simulate keypress: {}": "模拟按键失败: {}",
+    "Accessing PowerPoint page...": "访问PowerPoint页面...",
+    "Page load timeout": "等待页面加载超时",
+    "Document version unchanged ({}), skipping capture": "文档版本未变化（{}），跳过采集",
+    "Page source saved to page_source.html": "页面源码已保存到 page_source.html",
+    "Could not enter presentation mode": "无法进入演示模式",
+    "Resuming after slide {0} from {1}": "根据 {1} 从第 {0} 张幻灯片之后继续",
+    "Comparing with the previous capture ({} slides)": "与上一次采集进行比较（{} 张幻灯片）",
+    "Starting slide capture...": "开始捕获幻灯片...",
+    "Capture cancelled after {} slides": "采集已在 {} 页后取消",
+    "Clipping captures to the slide at {x:.0f},{y:.0f} ({width:.0f}x{height:.0f})":
+        "截图将裁剪到位于 {x:.0f},{y:.0f} 的幻灯片区域({width:.0f}x{height:.0f})",
+    "Slide container not found, capturing the whole window": "未找到幻灯片容器，截取整个窗口",
+    "Presentation wrapped back to slide 1, last slide reached": "演示已回到第 1 张幻灯片，已到达最后一张",
+    "Frame matches captured slide {}": "该帧与已捕获的第 {} 页相同",
+    "Detected identical screenshot ({}/10), trying next slide...": "检测到相同截图 ({}/10)，尝试翻到下一页...",
+    "Confirmed last slide reached": "确认已到达最后一页",
+    "Skipped {0} build steps of slide {1}": "已跳过第 {1} 页的 {0} 个动画步骤",
+    "Captured slide {} (unchanged)": "已捕获第 {} 页（未变化）",
+    "Captured slide {}": "已捕获第 {} 页",
+    "Slide counter shows {}/{}, last slide reached": "页码计数器显示 {}/{}，已到达最后一页",
+    "No slide counter found, detecting the last slide from screenshots": "未找到页码计数器，通过截图检测最后一页",
+    "No slide changed since the last capture, keeping the existing PDF": "自上次采集以来没有幻灯片变化，保留现有 PDF",
+    "Presentation saved as PDF: {}": "演示文稿已保存为PDF: {}",
+    "Leaving the PDF to post-processing": "PDF 留待后处理生成",
+    "{} slides changed since the last capture": "自上次采集以来有 {} 张幻灯片发生变化",
+    "Total slides captured: {}": "共捕获 {} 页幻灯片",
+    "Capture cancelled": "采集已取消",
+    "An error occurred: {}": "发生错误: {}",
+    "Error page source saved to error_page_source.html": "错误页面源码已保存到 error_page_source.html",
+    "Time per phase: {}": "各阶段耗时: {}",
+    "Output size ({}): slides {:.0f} KB": "输出大小（{}）：幻灯片 {:.0f} KB",
+    ", PDF {:.0f} KB": "，PDF {:.0f} KB",
+    "Could not write capture report: {}": "无法写入采集报告: {}",
+    "Could not jump to slide {}, stepping forward": "无法跳转到第 {} 张幻灯片，改为逐张前进",
+    "Could not reach slide {}": "无法到达第 {} 张幻灯片",
+    "[slides {}-{}] Captured slide {}": "[幻灯片 {}-{}] 已捕获第 {} 页",
+    "No slide counter found, capturing sequentially": "未找到幻灯片计数器，改为按顺序采集",
+    "Capturing {} slides in {} ranges: {}": "将 {} 张幻灯片分为 {} 个范围采集: {}",
+    "Generating PDF...": "正在生成PDF...",
+    "No complete capture of {0} in {1}": "{1} 中没有 {0} 的完整采集",
+    "Deck {}: {}": "演示文稿 {}: {}",
+    "Capturing {0} decks with {1} workers...": "使用 {1} 个工作进程捕获 {0} 个演示文稿...",
+    "Deck {} timed out after {:.0f}s, terminating worker": "演示文稿 {} 在 {:.0f} 秒后超时，终止工作进程",
+    "Deck {0}/{1} {2}: {3} slides in {4:.1f}s": "演示文稿 {0}/{1} {2}: {4:.1f} 秒内捕获 {3} 页",
+    "Deck {} unchanged, keeping its outputs": "演示文稿 {} 未变化，保留原有输出",
+    "Post-processing deck {} failed: {}": "演示文稿 {} 后处理失败: {}",
+    "Batch finished: {} succeeded, {} failed": "批量任务完成: {} 个成功, {} 个失败",
+    "  {:3d}. {:<7} {:4d} slides {:8.1f}s  {}": "  {:3d}. {:<7} {:4d} 页 {:8.1f}秒  {}",
+    "Batch summary saved to {}": "批量任务汇总已保存到 {}",
+    "DevTools connection closed": "DevTools 连接已关闭",
+    "DevTools connection lost: {}": "DevTools 连接中断: {}",
+    "Could not close tab: {}": "无法关闭标签页: {}",
+    "Chrome not found, pass its path with --chrome-binary": "未找到 Chrome，请用 --chrome-binary 指定路径",
+    "Chrome did not start (exit code {})": "Chrome 未能启动（退出码 {}）",
+    "The asyncio engine needs the websockets package (pip install websockets)":
+        "asyncio 引擎需要 websockets 包（pip install websockets）",
+    "The asyncio engine does not support: {}": "asyncio 引擎不支持: {}",
+    ("{} holds an interrupted capture, which the asyncio engine cannot resume; capture the deck without "
+     "--async-tabs or pass --no-resume"):
+        "{} 中有一次中断的采集，asyncio 引擎无法续采；请不使用 --async-tabs 采集该演示文稿，或加上 --no-resume",
+    "[tab] Deck {}: {}": "[标签页] 演示文稿 {}: {}",
+    "Deck {} timed out after {:.0f}s, closing its tab": "演示文稿 {} 超过 {:.0f} 秒超时，关闭其标签页",
+    "Successfully clicked Present button": "成功点击演示按钮",
+    "Could not find the Present button": "未找到演示按钮",
+    "[{}] Slide did not settle within the time limit": "[{}] 幻灯片在时限内未静止",
+    "[{}] Settle detection failed: {}": "[{}] 静止检测失败: {}",
+    "[{}] Detected 10 consecutive identical slides, presentation ended": "[{}] 连续 10 次截图相同，演示结束",
+    "[{}] Captured slide {}": "[{}] 已捕获第 {} 页",
+    "[{}] Slide counter shows {}/{}, last slide reached": "[{}] 页码计数器显示 {}/{}，已到达最后一页",
+    "[{}] Presentation saved as PDF: {}": "[{}] 演示文稿已保存为PDF: {}",
+    "[{}] Total slides captured: {}": "[{}] 共捕获 {} 页幻灯片",
+    "[{}] An error occurred: {}": "[{}] 发生错误: {}",
+    "Capturing {0} decks in up to {1} tabs of one browser...": "在同一浏览器的最多 {1} 个标签页中采集 {0} 个演示文稿...",
+    "Capture a SharePoint PowerPoint presentation as images and PDF": "将SharePoint PowerPoint演示文稿捕获为图片和PDF",
+    "SharePoint PowerPoint page URL (prompted when omitted)": "SharePoint PowerPoint页面URL（省略时交互输入）",
+    "Output folder (default: slides)": "输出文件夹（默认为slides）",
+    "Slide comparison engine (default: numpy when installed, otherwise imagechops)":
+        "幻灯片比较引擎（默认：已安装numpy时使用numpy，否则使用imagechops）",
+    "Compare frames in memory and write only accepted slides to disk": "在内存中比较帧，只将确认的幻灯片写入磁盘",
+    "How to wait for each slide: fixed sleeps or in-page settle detection (default: fixed)":
+        "每页的等待方式：固定等待或页面内静止检测（默认：fixed）",
+    "Maximum seconds to wait for a slide to settle in event mode (default: 5)": "event模式下等待幻灯片静止的最长秒数（默认：5）",
+    "Ignore the presenter's slide counter and detect the last slide from screenshots only": "忽略演示界面的页码计数器，仅通过截图检测最后一页",
+    "Run Chrome without a visible window": "以无窗口模式运行Chrome",
+    "Append each slide to the PDF as soon as it is captured": "每捕获一张幻灯片就立即追加到PDF",
+    "Threads that write slides and PDF pages in the background (default: 0, inline)":
+        "在后台写入幻灯片和PDF页面的线程数（默认：0，即在当前线程中写入）",
+    "Also save a small preview of every slide in a thumbnails folder": "同时在thumbnails文件夹中保存每张幻灯片的小预览图",
+    ("Take screenshots, or store the slide images the presenter downloads and fall back to screenshots (default: "
+     "screenshot)"):
+        "截图，或保存演示界面下载的幻灯片图片并以截图作为后备（默认：screenshot）",
+    "Only treat downloaded images whose URL matches REGEX as slide images": "只将URL匹配REGEX的下载图片视为幻灯片图片",
+    "Capture only the slide area instead of the whole window": "只截取幻灯片区域而不是整个窗口",
+    "Scale factor for clipped captures, e.g. 2 for double resolution (default: 1)": "裁剪截图的缩放系数，例如2表示两倍分辨率（默认：1）",
+    "Start from the first slide even if the output folder holds an interrupted capture": "即使输出文件夹中存在中断的采集，也从第一张幻灯片开始",
+    ("Only rewrite slides that changed since the last capture in the output folder, and skip decks whose document "
+     "version is unchanged"):
+        "只重写自输出文件夹中上次采集以来发生变化的幻灯片，并跳过文档版本未变化的演示文稿",
+    "Seconds to look for the Present button before giving up (default: 30)": "查找演示按钮的最长秒数（默认：30）",
+    "Drop frames identical to any slide already captured, not just the previous one": "丢弃与任意已采集幻灯片完全相同的帧，而不仅是与上一张比较",
+    "Stop when the presentation wraps back to its first slide": "演示回到第一张幻灯片时停止采集",
+    ("Capture one deck with N browsers working on separate slide ranges (needs the presenter's slide counter; "
+     "default: 1)"):
+        "用 N 个浏览器分别采集不同的幻灯片范围来采集同一个演示文稿（需要演示器的幻灯片计数器；默认：1）",
+    "Also write the capture metrics in Prometheus text format to capture_metrics.prom":
+        "同时以 Prometheus 文本格式将采集指标写入 capture_metrics.prom",
+    "Advance, wait for the slide and read its counter with one in-page script per slide (implies --settle event)":
+        "每张幻灯片用一个页面内脚本完成翻页、等待渲染和读取计数器（隐含 --settle event）",
+    "Save one image per slide with all its build animations shown, instead of one per animation step":
+        "每张幻灯片只保存一张显示全部动画效果的图片，而不是每个动画步骤一张",
+    ("Save the text shown on each slide with its position as slide_NNN.json and make the PDF searchable with an "
+     "invisible text layer"):
+        "将每张幻灯片上显示的文字及其位置保存为 slide_NNN.json，并通过不可见的文本层使 PDF 可搜索",
+    "Slide image format: lossless png, png-palette (256 colors, small for text slides), jpeg or webp (default: png)":
+        "幻灯片图像格式：无损 png、png-palette（256 色，文字幻灯片体积小）、jpeg 或 webp（默认：png）",
+    "Quality of jpeg and webp slides, 1-100 (default: 85)": "jpeg 和 webp 幻灯片的质量，1-100（默认：85）",
+    "Downscale slides to this density on a 13.33-inch wide page and use it as PDF resolution":
+        "按 13.33 英寸宽页面上的该密度缩小幻灯片，并用作 PDF 分辨率",
+    ("Keep each distinct slide once in a content-addressed store shared by all decks and hard link deck folders "
+     "to it (default DIR: {})"):
+        "在所有演示文稿共用的内容寻址存储中每张不同的幻灯片只保存一次，演示文稿文件夹硬链接到其中（DIR 默认：{}）",
+    "Build the PDF, sprite and optimized copies after capture on N processes (default: 0, in the capture process)":
+        "采集后在 N 个进程中生成 PDF、拼图和优化副本（默认：0，在采集进程中进行）",
+    "Also save thumbnails.jpg, one sheet with a thumbnail of every slide, indexed by thumbnails.json":
+        "同时保存 thumbnails.jpg（包含每张幻灯片缩略图的拼图），并由 thumbnails.json 索引",
+    "Also save losslessly optimized copies of the slides in this format to optimized/":
+        "同时以此格式在 optimized/ 中保存无损优化的幻灯片副本",
+    "Capture every URL listed in FILE ('-' for stdin), one 'URL [output_folder]' per line":
+        "捕获FILE中列出的所有URL（'-'表示标准输入），每行一个'URL [输出文件夹]'",
+    "Parallel Chrome workers in batch mode (default: limited by CPU cores and memory)":
+        "批量模式下并行的Chrome工作进程数（默认：由CPU核心数和内存决定）",
+    "Memory budget in GB per worker when sizing the batch pool (default: {})": "确定批量进程数时每个工作进程的内存预算，单位GB（默认：{}）",
+    "Seconds after which a batch deck is abandoned (default: 3600)": "批量模式下单个演示文稿的超时秒数（默认：3600）",
+    "Where to write the batch summary (default: batch_summary.json)": "批量任务汇总的保存路径（默认：batch_summary.json）",
+    "Restart a batch worker's browser after this many decks (default: 20)": "批量工作进程的浏览器处理这么多个演示文稿后重启（默认：20）",
+    ("Capture decks as up to N tabs of one headless Chrome driven over DevTools, instead of a browser per worker "
+     "(needs the websockets package)"):
+        "将演示文稿作为同一无头 Chrome 的最多 N 个标签页采集，通过 DevTools 驱动，而不是每个工作进程一个浏览器（需要 websockets 包）",
+    "Chrome executable for --async-tabs (default: looked up on PATH)": "--async-tabs 使用的 Chrome 可执行文件（默认：在 PATH 中查找）",
+    "Use a running Chrome's DevTools browser websocket for --async-tabs instead of starting one":
+        "--async-tabs 使用已运行 Chrome 的 DevTools 浏览器 websocket，而不启动新的浏览器",
+    "No URLs found in batch file": "批量文件中没有找到URL",
+    "Enter SharePoint PowerPoint page URL: ": "请输入SharePoint PowerPoint页面的URL: ",
+    "URL cannot be empty": "URL不能为空",
+    "Enter output folder name (default: slides): ": "请输入保存文件夹名称（默认为slides）: ",
+    "\nProgram interrupted by user": "\n程序已被用户中断",
+    "Program execution error: {}": "程序执行出错: {}",
+}
 
-    def find_and_click_present_button(self, driver, max_attempts=3):
-        """在指定frame中查找并点击演示按钮"""
-        for attempt in range(max_attempts):
-            try:
-                # 等待按钮出现
-                present_button = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[aria-label="Present"]'))
-                )
-                
-                # 移除遮挡元素
-                driver.execute_script("""
-                    const overlays = document.querySelectorAll('[role="dialog"], [class*="overlay"], [class*="modal"]');
-                    overlays.forEach(overlay => overlay.remove());
-                """)
-                
-                # 确保按钮可见
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", present_button)
-                time.sleep(1)
-                
-                # 尝试点击
-                try:
-                    present_button.click()
-                except:
-                    driver.execute_script("arguments[0].click();", present_button)
-                
-                time.sleep(2)
-                return True
-            except StaleElementReferenceException:
-                if attempt < max_attempts - 1:
-                    time.sleep(1)
-                    continue
-            except Exception as e:
-                logging.warning(f"点击尝试 {attempt + 1} 失败: {str(e)}")
-                if attempt < max_attempts - 1:
-                    time.sleep(1)
-                    continue
-        return False
-
-    def try_click_present_button(self, driver):
-        """尝试在所有可能的frame中点击演示按钮"""
-        try:
-            # 首先在主页面尝试
-            logging.info("在主页面中查找演示按钮...")
-            if self.find_and_click_present_button(driver):
-                return True
-            
-            # 查找所有iframe
-            iframes = driver.find_elements(By.TAG_NAME, "iframe")
-            if not iframes:
-                logging.info("未找到iframe")
-                return False
-            
-            # 遍历每个iframe
-            for i, iframe in enumerate(iframes):
-                try:
-                    logging.info(f"切换到iframe {i + 1}/{len(iframes)}...")
-                    driver.switch_to.frame(iframe)
-                    
-                    if self.find_and_click_present_button(driver):
-                        return True
-                    
-                except Exception as e:
-                    logging.warning(f"处理iframe {i + 1} 时出错: {str(e)}")
-                finally:
-                    driver.switch_to.default_content()
-            
-            logging.error("在所有位置都未找到可点击的演示按钮")
-            return False
-            
-        except Exception as e:
-            logging.error(f"点击演示按钮失败: {str(e)}")
-            return False
-
-    def check_presentation_mode(self, driver):
-        """检查是否已进入演示模式"""
-        try:
-            time.sleep(2)
-            # 检查URL变化
-            if "view=present" in driver.current_url.lower():
-                return True
-            # 检查是否全屏
-            is_fullscreen = driver.execute_script("""
-                return document.fullscreenElement !== null || 
-                       document.webkitFullscreenElement !== null ||
-                       document.mozFullScreenElement !== null ||
-                       document.msFullscreenElement !== null;
-            """)
-            if is_fullscreen:
-                return True
-            # 检查特定元素
-            try:
-                return driver.find_element(By.CSS_SELECTOR, '[class*="presentationMode"]').is_displayed()
-            except:
-                return False
-        except:
-            return False
-        
-    def capture_slides(self, url, output_folder='slides'):
-        driver = None
-        try:
-            # 创建输出文件夹
-            if not os.path.exists(output_folder):
-                os.makedirs(output_folder)
-            
-            logging.info("启动浏览器...")
-            driver = webdriver.Chrome(options=self.chrome_options)
-            driver.maximize_window()
-            
-            logging.info("访问PowerPoint页面...")
-            driver.get(url)
-            time.sleep(5)  # 等待页面加载
-            
-            # 尝试点击演示按钮
-            if not self.try_click_present_button(driver):
-                # 保存页面源码以供调试
-                with open('page_source.html', 'w', encoding='utf-8') as f:
-                    f.write(driver.page_source)
-                logging.info("页面源码已保存到 page_source.html")
-                raise Exception("无法进入演示模式")
-            
-            # 等待演示模式加载
-            time.sleep(3)
-            
-            # 开始截图循环
-            slide_count = 0
-            last_screenshot = None
-            screenshots = []
-            consecutive_same_count = 0  # 连续相同的次数
-            
-            logging.info("开始捕获幻灯片...")
-            while True:
-                # 等待页面加载完成
-                try:
-                    WebDriverWait(driver, 5).until(
-                        lambda d: d.execute_script('return document.readyState') == 'complete'
-                    )
-                except:
-                    logging.warning("等待页面加载超时")
-
-                # 截取当前页面
-                screenshot_path = os.path.join(output_folder, f'slide_{slide_count:03d}.png')
-                
-                # 等待动画完成
-                time.sleep(2)  # 基础等待时间
-                
-                # 检查页面是否仍在变化
-                old_source = driver.page_source
-                time.sleep(0.5)
-                if old_source != driver.page_source:
-                    time.sleep(1.5)  # 如果页面在变化，多等待一会
-                
-                driver.save_screenshot(screenshot_path)
-                
-                # 检查是否与上一张截图相同
-                if last_screenshot:
-                    current_img = Image.open(screenshot_path)
-                    last_img = Image.open(last_screenshot)
-                    
-                    if self.images_equal(current_img, last_img):
-                        consecutive_same_count += 1
-                        logging.info(f"检测到相同截图 ({consecutive_same_count}/10)，尝试翻到下一页...")
-                        
-                        if consecutive_same_count >= 10:  # 连续10次相同才确认是最后一页
-                            logging.info("确认已到达最后一页")
-                            os.remove(screenshot_path)
-                            break
-                        
-                        os.remove(screenshot_path)
-                        
-                        # 尝试翻到下一页
-                        try:
-                            actions = ActionChains(driver)
-                            actions.send_keys(Keys.ARROW_RIGHT)
-                            actions.pause(0.5)
-                            actions.perform()
-                            time.sleep(2)  # 等待动画完成
-                        except Exception as e:
-                            logging.warning(f"发送右箭头键失败: {str(e)}")
-                            try:
-                                driver.execute_script("""
-                                    var event = new KeyboardEvent('keydown', {
-                                        'key': 'ArrowRight',
-                                        'code': 'ArrowRight',
-                                        'keyCode': 39,
-                                        'which': 39,
-                                        'bubbles': true
-                                    });
-                                    document.dispatchEvent(event);
-                                """)
-                                time.sleep(2)
-                            except Exception as e:
-                                logging.error(f"模拟按键失败: {str(e)}")
-                        continue
-                    else:
-                        consecutive_same_count = 0
-                        logging.info(f"已捕获第 {slide_count + 1} 页")
-                        last_screenshot = screenshot_path
-                        screenshots.append(screenshot_path)
-                        slide_count += 1
-                else:
-                    logging.info(f"已捕获第 {slide_count + 1} 页")
-                    last_screenshot = screenshot_path
-                    screenshots.append(screenshot_path)
-                    slide_count += 1
-                
-                # 模拟按右箭头键
-                try:
-                    actions = ActionChains(driver)
-                    actions.send_keys(Keys.ARROW_RIGHT)
-                    actions.pause(0.5)
-                    actions.perform()
-                    time.sleep(2)  # 等待动画完成
-                except Exception as e:
-                    logging.warning(f"发送右箭头键失败: {str(e)}")
-                    try:
-                        driver.execute_script("""
-                            var event = new KeyboardEvent('keydown', {
-                                'key': 'ArrowRight',
-                                'code': 'ArrowRight',
-                                'keyCode': 39,
-                                'which': 39,
-                                'bubbles': true
-                            });
-                            document.dispatchEvent(event);
-                        """)
-                        time.sleep(2)
-                    except Exception as e:
-                        logging.error(f"模拟按键失败: {str(e)}")
-            
-            # 转换为PDF
-            if screenshots:
-                self.create_pdf(screenshots, os.path.join(output_folder, 'presentation.pdf'))
-                logging.info(f"演示文稿已保存为PDF: {os.path.join(output_folder, 'presentation.pdf')}")
-            
-            logging.info(f"共捕获 {len(screenshots)} 页幻灯片")
-            
-        except Exception as e:
-            logging.error(f"发生错误: {str(e)}")
-            if driver:
-                # 保存错误时的页面源码
-                with open('error_page_source.html', 'w', encoding='utf-8') as f:
-                    f.write(driver.page_source)
-                logging.info("错误页面源码已保存到 error_page_source.html")
-        finally:
-            if driver:
-                driver.quit()
-    
-    def images_equal(self, img1, img2):
-        """比较两张图片是否相同"""
-        if img1.size != img2.size:
-            return False
-            
-        # 转换为灰度图像并调整大小以减少计算量
-        size = (img1.size[0] // 2, img1.size[1] // 2)
-        img1_gray = img1.convert('L').resize(size)
-        img2_gray = img2.convert('L').resize(size)
-        
-        # 获取图像数据
-        data1 = list(img1_gray.getdata())
-        data2 = list(img2_gray.getdata())
-        
-        # 计算差异
-        total_pixels = len(data1)
-        diff_pixels = sum(1 for i in range(total_pixels) if abs(data1[i] - data2[i]) > 25)
-        
-        # 计算差异百分比
-        diff_percentage = (diff_pixels / total_pixels) * 100
-        
-        return diff_percentage < 2.0  # 允许2%的差异
-    
-    def create_pdf(self, image_files, output_file):
-        """将图片合并为PDF"""
-        if not image_files:
-            return
-            
-        logging.info("正在生成PDF...")
-        images = [Image.open(f) for f in image_files]
-        first_image = images[0]
-        first_image.save(output_file, "PDF", resolution=100.0, save_all=True, append_images=images[1:])
-
-def main():
-    try:
-        url = input("请输入SharePoint PowerPoint页面的URL: ").strip()
-        if not url:
-            logging.error("URL不能为空")
-            return
-            
-        output_folder = input("请输入保存文件夹名称（默认为slides）: ").strip() or 'slides'
-        
-        capture = PowerPointCapture()
-        capture.capture_slides(url, output_folder)
-        
-    except KeyboardInterrupt:
-        logging.info("\n程序已被用户中断")
-        sys.exit(0)
-    except Exception as e:
-        logging.error(f"程序执行出错: {str(e)}")
-        sys.exit(1)
+# 在模块导入时安装翻译，这样批量模式中以 spawn 方式启动的子进程也输出中文
+powerpoint_capture.MESSAGES.update(MESSAGES)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    powerpoint_capture.main()
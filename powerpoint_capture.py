@@ -0,0 +1,3901 @@
+"""Capture SharePoint PowerPoint presentations as slide images and a PDF
+
+The capture engine shared by the command-line scripts powerpoint_capture-en.py
+and powerpoint_capture-zh.py, which only differ in the language of the
+messages (see MESSAGES). It can also be imported as a library, see
+PowerPointCapture.iter_slides().
+"""
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, StaleElementReferenceException
+import time
+import os
+import io
+from PIL import Image, ImageChops
+import argparse
+import base64
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import hashlib
+import json
+import re
+import shutil
+import logging
+import multiprocessing
+import multiprocessing.connection
+import queue
+import signal
+import struct
+import sys
+import tempfile
+import threading
+import urllib.parse
+import asyncio
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the ImageChops engine needs only Pillow
+    np = None
+
+try:
+    import websockets
+except ImportError:  # websockets is optional, only the asyncio DevTools engine needs it
+    websockets = None
+
+# Translations of the messages shown to the user, keyed by the English str.format
+# template; localized front-ends such as powerpoint_capture-zh.py fill it in
+MESSAGES = {}
+
+
+def tr(message):
+    """The translation of a user-facing message, or the message itself when there is none"""
+    return MESSAGES.get(message, message)
+
+# Resolves once the page (and its same-origin frames) has had no DOM mutations,
+# no running finite animations and no pending images for `quietMs` and
+# `stableFrames` consecutive animation frames, or when `timeoutMs` expires.
+SETTLE_SCRIPT = """
+    var quietMs = arguments[0], timeoutMs = arguments[1], stableFrames = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var start = performance.now(), lastChange = start, stable = 0, finished = false;
+    var docs = [document], observers = [];
+    (function collect(doc) {
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var i = 0; i < frames.length; i++) {
+            try {
+                var child = frames[i].contentDocument;
+                if (child) { docs.push(child); collect(child); }
+            } catch (e) {}  // Cross-origin frame
+        }
+    })(document);
+    function touch() { lastChange = performance.now(); }
+    var events = ['animationstart', 'animationend', 'animationcancel',
+                  'transitionrun', 'transitionend', 'transitioncancel', 'load'];
+    docs.forEach(function (doc) {
+        var observer = new MutationObserver(touch);
+        observer.observe(doc, {subtree: true, childList: true, attributes: true, characterData: true});
+        observers.push(observer);
+        events.forEach(function (name) { doc.addEventListener(name, touch, true); });
+    });
+    function busy() {
+        return docs.some(function (doc) {
+            var running = doc.getAnimations ? doc.getAnimations().some(function (a) {
+                return a.playState === 'running' && a.effect && a.effect.getTiming().iterations !== Infinity;
+            }) : false;
+            var loading = Array.prototype.some.call(doc.images, function (img) { return !img.complete; });
+            return running || loading || (doc.fonts && doc.fonts.status === 'loading');
+        });
+    }
+    function finish(settled) {
+        if (finished) { return; }
+        finished = true;
+        observers.forEach(function (o) { o.disconnect(); });
+        docs.forEach(function (doc) {
+            events.forEach(function (name) { doc.removeEventListener(name, touch, true); });
+        });
+        done({settled: settled, elapsed: performance.now() - start});
+    }
+    function tick() {
+        if (finished) { return; }
+        var now = performance.now();
+        if (now - lastChange >= quietMs && !busy()) {
+            stable++;
+        } else {
+            stable = 0;
+        }
+        if (stable >= stableFrames) { finish(true); return; }
+        if (now - start >= timeoutMs) { finish(false); return; }
+        requestAnimationFrame(tick);
+    }
+    // requestAnimationFrame does not fire in hidden tabs, make sure the ceiling still applies
+    setTimeout(function () { finish(false); }, timeoutMs + 100);
+    requestAnimationFrame(tick);
+"""
+
+# Returns {index, total} read from the presenter's slide counter (ARIA labels,
+# progress/slider values or counter text), or null when no counter is found.
+SLIDE_COUNTER_SCRIPT = """
+    var patterns = [
+        /slide\\s+(\\d+)\\s+of\\s+(\\d+)/i,
+        /第\\s*(\\d+)\\s*张[^\\d]*共\\s*(\\d+)\\s*张/,
+        /幻灯片\\s*(\\d+)\\s*\\/\\s*(\\d+)/
+    ];
+    var loose = /^\\s*(\\d+)\\s*(?:\\/|of)\\s*(\\d+)\\s*$/i;
+    function valid(index, total) {
+        return total > 0 && index > 0 && index <= total;
+    }
+    function match(text, regexes) {
+        if (!text) { return null; }
+        for (var i = 0; i < regexes.length; i++) {
+            var m = regexes[i].exec(text);
+            if (m && valid(+m[1], +m[2])) { return {index: +m[1], total: +m[2]}; }
+        }
+        return null;
+    }
+    function search(doc) {
+        var labelled = doc.querySelectorAll('[aria-label], [title], [aria-valuetext]');
+        for (var i = 0; i < labelled.length; i++) {
+            var el = labelled[i];
+            var found = match(el.getAttribute('aria-label'), patterns) ||
+                        match(el.getAttribute('title'), patterns) ||
+                        match(el.getAttribute('aria-valuetext'), patterns);
+            if (found) { return found; }
+        }
+        var ranged = doc.querySelectorAll('[role="progressbar"][aria-valuemax], [role="slider"][aria-valuemax]');
+        for (var j = 0; j < ranged.length; j++) {
+            var now = +ranged[j].getAttribute('aria-valuenow'), max = +ranged[j].getAttribute('aria-valuemax');
+            if (/slide|幻灯片/i.test(ranged[j].getAttribute('aria-label') || '') && valid(now, max)) {
+                return {index: now, total: max};
+            }
+        }
+        // Bare "3 / 20" text is only trusted inside elements that look like a counter
+        var counters = doc.querySelectorAll('[class*="lide" i][class*="umber" i], [class*="ounter" i], [id*="ounter" i]');
+        for (var k = 0; k < counters.length; k++) {
+            var text = counters[k].textContent;
+            var found2 = match(text, patterns) || (text.length < 20 ? match(text, [loose]) : null);
+            if (found2) { return found2; }
+        }
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var f = 0; f < frames.length; f++) {
+            try {
+                var child = frames[f].contentDocument;
+                var nested = child ? search(child) : null;
+                if (nested) { return nested; }
+            } catch (e) {}  // Cross-origin frame
+        }
+        return null;
+    }
+    return search(document);
+"""
+
+# Sends ArrowRight to the presenter, waits like SETTLE_SCRIPT and resolves with
+# {settled, elapsed, readyState, counter, fingerprint, changed} in one round trip.
+# `fingerprint` hashes the presenter's DOM, `changed` tells whether it or the slide
+# counter changed after the key.
+SLIDE_STEP_SCRIPT = """
+    var callback = arguments[arguments.length - 1];
+    var settleArgs = [arguments[0], arguments[1], arguments[2]];
+    function readCounter() {""" + SLIDE_COUNTER_SCRIPT + """}
+    function fingerprint() {
+        var html = document.body ? document.body.innerHTML : '', hash = 2166136261;
+        for (var i = 0; i < html.length; i++) {
+            hash = Math.imul(hash ^ html.charCodeAt(i), 16777619);
+        }
+        return (hash >>> 0).toString(16);
+    }
+    var before = fingerprint(), counterBefore = JSON.stringify(readCounter());
+    var target = document.activeElement || document.body;
+    ['keydown', 'keyup'].forEach(function (type) {
+        target.dispatchEvent(new KeyboardEvent(type, {
+            key: 'ArrowRight', code: 'ArrowRight', keyCode: 39, which: 39, bubbles: true
+        }));
+    });
+    (function () {""" + SETTLE_SCRIPT + """}).apply(null, settleArgs.concat([function (result) {
+        result.readyState = document.readyState;
+        result.counter = readCounter();
+        result.fingerprint = fingerprint();
+        result.changed = result.fingerprint !== before || JSON.stringify(result.counter) !== counterBefore;
+        callback(result);
+    }]));
+"""
+
+# Returns the URLs of the images currently shown over the slide container
+# (img elements, SVG <image> elements and CSS backgrounds), largest first.
+# arguments[0] is the container rectangle from SLIDE_RECT_SCRIPT; an image is
+# kept when its visible part covers at least arguments[1] of the container's
+# area. Nothing is returned when visible text is drawn over the slide, since
+# no downloaded image then shows the whole slide.
+SLIDE_IMAGES_SCRIPT = """
+    var slide = arguments[0], coverage = arguments[1];
+    var found = [], text = false;
+    function covered(rect, offsetX, offsetY) {
+        var width = Math.min(offsetX + rect.right, slide.x + slide.width) - Math.max(offsetX + rect.left, slide.x);
+        var height = Math.min(offsetY + rect.bottom, slide.y + slide.height) - Math.max(offsetY + rect.top, slide.y);
+        return width > 0 && height > 0 ? width * height / (slide.width * slide.height) : 0;
+    }
+    function add(url, rect, offsetX, offsetY, doc) {
+        if (url && covered(rect, offsetX, offsetY) >= coverage) {
+            found.push({url: new URL(url, doc.baseURI).href, area: rect.width * rect.height});
+        }
+    }
+    function hasText(doc, offsetX, offsetY) {
+        var win = doc.defaultView, walker = doc.createTreeWalker(doc.body || doc, NodeFilter.SHOW_TEXT), node;
+        while ((node = walker.nextNode())) {
+            var el = node.parentElement;
+            if (!node.data.trim() || !el || /^(SCRIPT|STYLE|NOSCRIPT)$/.test(el.tagName)) { continue; }
+            var range = doc.createRange();
+            range.selectNodeContents(node);
+            var r = range.getBoundingClientRect();
+            if (r.width < 2 || r.height < 2 || !covered(r, offsetX, offsetY)) { continue; }
+            for (var shown = true; el && shown; el = el.parentElement) {
+                var style = win.getComputedStyle(el);
+                shown = style.display !== 'none' && style.visibility !== 'hidden' && parseFloat(style.opacity) !== 0;
+            }
+            if (shown) { return true; }
+        }
+        return false;
+    }
+    function scan(doc, offsetX, offsetY) {
+        text = text || hasText(doc, offsetX, offsetY);
+        var images = doc.querySelectorAll('img');
+        for (var i = 0; i < images.length; i++) {
+            add(images[i].currentSrc || images[i].src, images[i].getBoundingClientRect(), offsetX, offsetY, doc);
+        }
+        var svgImages = doc.querySelectorAll('image');
+        for (var j = 0; j < svgImages.length; j++) {
+            var href = svgImages[j].getAttribute('href') || svgImages[j].getAttribute('xlink:href');
+            add(href, svgImages[j].getBoundingClientRect(), offsetX, offsetY, doc);
+        }
+        var all = doc.querySelectorAll('div, section, span');
+        for (var k = 0; k < all.length; k++) {
+            var m = /url\\(["']?([^"')]+)["']?\\)/.exec(getComputedStyle(all[k]).backgroundImage);
+            if (m) { add(m[1], all[k].getBoundingClientRect(), offsetX, offsetY, doc); }
+        }
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var f = 0; f < frames.length; f++) {
+            try {
+                var child = frames[f].contentDocument;
+                if (!child) { continue; }
+                var fr = frames[f].getBoundingClientRect();
+                scan(child, offsetX + fr.left + frames[f].clientLeft, offsetY + fr.top + frames[f].clientTop);
+            } catch (e) {}  // Cross-origin frame
+        }
+    }
+    scan(document, 0, 0);
+    if (text) { return []; }
+    found.sort(function (a, b) { return b.area - a.area; });
+    return found;
+"""
+
+# Returns the viewport rectangle {x, y, width, height} of the slide container
+# (the largest visible slide-like element that is not a full-window wrapper),
+# searching same-origin frames too, or null.
+SLIDE_RECT_SCRIPT = """
+    var selectors = '[id*="SlideStage" i], [class*="SlideStage" i], [id*="SlidePanel" i], ' +
+                    '[class*="SlideContainer" i], [aria-roledescription*="slide" i], canvas, svg';
+    var best = null;
+    function visit(doc, offsetX, offsetY) {
+        var win = doc.defaultView, vw = win.innerWidth, vh = win.innerHeight;
+        var candidates = doc.querySelectorAll(selectors);
+        for (var i = 0; i < candidates.length; i++) {
+            var r = candidates[i].getBoundingClientRect();
+            var left = Math.max(r.left, 0), top = Math.max(r.top, 0);
+            var width = Math.min(r.right, vw) - left, height = Math.min(r.bottom, vh) - top;
+            var fullWindow = width >= vw - 2 && height >= vh - 2;
+            if (width <= 0 || height <= 0 || fullWindow || width * height < 0.2 * vw * vh) { continue; }
+            if (!best || width * height > best.width * best.height) {
+                best = {x: offsetX + left, y: offsetY + top, width: width, height: height};
+            }
+        }
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var f = 0; f < frames.length; f++) {
+            try {
+                var child = frames[f].contentDocument;
+                if (!child) { continue; }
+                var fr = frames[f].getBoundingClientRect();
+                visit(child, offsetX + fr.left + frames[f].clientLeft, offsetY + fr.top + frames[f].clientTop);
+            } catch (e) {}  // Cross-origin frame
+        }
+    }
+    visit(document, 0, 0);
+    return best;
+"""
+
+# Returns the words shown on the slide in the document and its same-origin
+# frames as [{text, x, y, width, height}] with boxes in this frame's viewport
+# coordinates (CSS pixels). arguments[0] is the slide container rectangle from
+# SLIDE_RECT_SCRIPT: words centered outside it (the presenter's counter, toolbar
+# and notes) are left out. Hidden and screen-reader-only elements are skipped,
+# and a word that wraps over several lines (text without spaces) is returned
+# one character per box.
+SLIDE_TEXT_SCRIPT = """
+    var slide = arguments[0];
+    var runs = [];
+    function shown(el, win, cache) {
+        if (!el || el.nodeType !== 1) { return true; }
+        if (cache.has(el)) { return cache.get(el); }
+        var style = win.getComputedStyle(el);
+        var srOnly = style.position === 'absolute' && el.offsetWidth <= 1 && el.offsetHeight <= 1;
+        var result = style.display !== 'none' && style.visibility !== 'hidden' && parseFloat(style.opacity) !== 0 &&
+                     !srOnly && shown(el.parentElement, win, cache);
+        cache.set(el, result);
+        return result;
+    }
+    function add(range, text, offsetX, offsetY) {
+        var r = range.getBoundingClientRect();
+        var centerX = offsetX + r.left + r.width / 2, centerY = offsetY + r.top + r.height / 2;
+        var onSlide = centerX >= slide.x && centerX <= slide.x + slide.width &&
+                      centerY >= slide.y && centerY <= slide.y + slide.height;
+        if (r.width >= 1 && r.height >= 1 && onSlide) {
+            runs.push({text: text, x: offsetX + r.left, y: offsetY + r.top, width: r.width, height: r.height});
+        }
+    }
+    function visit(doc, offsetX, offsetY) {
+        var win = doc.defaultView, cache = new Map(), range = doc.createRange();
+        var walker = doc.createTreeWalker(doc.body || doc.documentElement, NodeFilter.SHOW_TEXT);
+        for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+            var text = node.nodeValue, parent = node.parentElement;
+            if (!/\\S/.test(text) || !parent || /^(script|style|noscript|title)$/i.test(parent.tagName) ||
+                    !shown(parent, win, cache)) {
+                continue;
+            }
+            var words = /\\S+/g, match;
+            while ((match = words.exec(text))) {
+                range.setStart(node, match.index);
+                range.setEnd(node, match.index + match[0].length);
+                if (range.getClientRects().length <= 1) {
+                    add(range, match[0], offsetX, offsetY);
+                    continue;
+                }
+                for (var c = 0; c < match[0].length; c++) {
+                    range.setStart(node, match.index + c);
+                    range.setEnd(node, match.index + c + 1);
+                    add(range, match[0][c], offsetX, offsetY);
+                }
+            }
+        }
+        var frames = doc.querySelectorAll('iframe, frame');
+        for (var f = 0; f < frames.length; f++) {
+            try {
+                var child = frames[f].contentDocument;
+                if (!child) { continue; }
+                var fr = frames[f].getBoundingClientRect();
+                visit(child, offsetX + fr.left + frames[f].clientLeft, offsetY + fr.top + frames[f].clientTop);
+            } catch (e) {}  // Cross-origin frame
+        }
+    }
+    visit(document, 0, 0);
+    return runs;
+"""
+# Looks for the Present button in the document and its same-origin frames in one
+# pass. Returns {path, blocked}: path is the list of iframe indices leading to
+# the frame that holds the button (null when not found), blocked the paths of
+# cross-origin frames the script cannot see into.
+PRESENT_BUTTON_SCRIPT = """
+    var selector = '[aria-label="Present"]';
+    var blocked = [];
+    function search(doc, path) {
+        if (doc.querySelector(selector)) { return path; }
+        var frames = doc.querySelectorAll('iframe');
+        for (var i = 0; i < frames.length; i++) {
+            var child = null;
+            try { child = frames[i].contentDocument; } catch (e) {}
+            if (!child) {
+                blocked.push(path.concat([i]));
+                continue;
+            }
+            var found = search(child, path.concat([i]));
+            if (found) { return found; }
+        }
+        return null;
+    }
+    return {path: search(document, []), blocked: blocked};
+"""
+
+# Clicks the Present button in the current document and gives the frame focus
+# so that key events sent to the page reach the presenter.
+PRESENT_CLICK_SCRIPT = """
+    var button = document.querySelector('[aria-label="Present"]');
+    if (!button) { return false; }
+    button.scrollIntoView({block: 'center'});
+    button.click();
+    window.focus();
+    return true;
+"""
+
+# Runs one of the script bodies above in the same-origin frame reached through
+# the iframe indices `path`, with the arguments and (for async scripts) the
+# trailing callback that execute_script/execute_async_script would pass. Used
+# by the DevTools engine, which evaluates expressions instead.
+FRAME_CALL_SCRIPT = """(function (path, source, args, isAsync) {
+    var win = window;
+    for (var i = 0; i < path.length; i++) {
+        win = win.document.querySelectorAll('iframe')[path[i]].contentWindow;
+    }
+    var body = new win.Function(source);
+    if (!isAsync) { return body.apply(null, args); }
+    return new Promise(function (resolve) { body.apply(null, args.concat([resolve])); });
+})"""
+
+# Returns the document's version or last-modified stamp when the page exposes
+# one (meta tags, schema.org markup or the WOPI/SharePoint context objects in
+# inline scripts), or null.
+DOCUMENT_VERSION_SCRIPT = """
+    var metas = document.querySelectorAll(
+        'meta[property="article:modified_time"], meta[name="last-modified" i], meta[http-equiv="last-modified" i], ' +
+        'meta[itemprop="dateModified"], meta[name="version" i], [itemprop="dateModified"]');
+    for (var i = 0; i < metas.length; i++) {
+        var value = metas[i].getAttribute('content') || metas[i].getAttribute('datetime') || metas[i].textContent;
+        if (value && value.trim()) { return value.trim(); }
+    }
+    var pattern = /"(FileVersion|VersionLabel|FileLastModifiedTime|LastModifiedTime|TimeLastModified)"\\s*:\\s*"([^"]+)"/;
+    var scripts = document.querySelectorAll('script:not([src])');
+    for (var j = 0; j < scripts.length; j++) {
+        var match = pattern.exec(scripts[j].textContent);
+        if (match) { return match[1] + ':' + match[2]; }
+    }
+    return null;
+"""
+
+
+# Where the frame path of the Present button is remembered per SharePoint host
+FRAME_PATH_CACHE = os.path.join(os.path.expanduser('~'), '.powerpoint_capture', 'frame_paths.json')
+# Default location of the slide store shared by all decks (--store)
+SLIDE_STORE = os.path.join(os.path.expanduser('~'), '.powerpoint_capture', 'store')
+
+
+def load_frame_paths(cache_path=FRAME_PATH_CACHE):
+    """Read the cached {host: frame path} map, empty if there is none"""
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remember_frame_path(host, path, cache_path=FRAME_PATH_CACHE):
+    """Record the frame path that held the Present button on `host`"""
+    paths = load_frame_paths(cache_path)
+    if paths.get(host) == path:
+        return
+    paths[host] = path
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Batch workers may write at the same time, each through its own temporary file
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(paths, f, indent=2)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logging.debug(tr("Could not save frame path cache: {}").format(e))
+
+
+def file_sha256(path):
+    """SHA-256 of a file, or None if it cannot be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def pixel_hash(image):
+    """SHA-256 of an image's size and RGB pixels, the same however its file was compressed"""
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    digest = hashlib.sha256(f'{image.width}x{image.height}\n'.encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def replace_file(path, data):
+    """Write data to path through a temporary file
+
+    The file at path is replaced rather than rewritten, so a slide that is a
+    hard link into a SlideStore never changes the stored copy. Concurrent
+    writers each use their own temporary file.
+    """
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def text_layer_path(path):
+    """Where the text layer sidecar of the slide image at path is saved"""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def load_text_layer(path):
+    """Read the text layer sidecar of the slide image at path, or None if it has none"""
+    try:
+        with open(text_layer_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def scale_text_layer(text, size):
+    """Return the text layer with its boxes scaled to an image of `size` pixels"""
+    if (text['width'], text['height']) == tuple(size):
+        return text
+    scale_x, scale_y = size[0] / text['width'], size[1] / text['height']
+    runs = [{'text': run['text'], 'x': round(run['x'] * scale_x, 1), 'y': round(run['y'] * scale_y, 1),
+             'width': round(run['width'] * scale_x, 1), 'height': round(run['height'] * scale_y, 1)}
+            for run in text['runs']]
+    return dict(text, width=size[0], height=size[1], runs=runs)
+
+
+def perceptual_hash(image, hash_size=16):
+    """Difference hash (dHash) of an image as a hash_size * hash_size bit integer
+
+    Each bit records whether a pixel of the reduced grayscale image is brighter
+    than its right-hand neighbour, so re-rendering and recompression noise
+    leaves the hash (almost) unchanged while edited text or layout flips bits.
+    """
+    # Shrinking before the grayscale conversion keeps this cheap on full-resolution frames
+    reduced = image.resize((hash_size + 1, hash_size), Image.BILINEAR, reducing_gap=2.0).convert('L')
+    pixels = list(reduced.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_distance(a, b):
+    """Number of differing bits between two perceptual hashes"""
+    return bin(a ^ b).count('1')
+
+
+def adds_content(before, after, size=(480, 270), threshold=32, min_ratio=0.95):
+    """True when `after` differs from `before` only where `before` shows its background
+
+    A build animation reveals new elements on an otherwise unchanged slide,
+    while a transition to the next slide also removes or moves content. Both
+    frames are compared in grayscale at `size`; the background is the most
+    common gray level of `before`.
+    """
+    before = before.convert('L').resize(size, Image.BILINEAR)
+    after = after.convert('L').resize(size, Image.BILINEAR)
+    changed = ImageChops.difference(before, after).point(lambda v: 255 if v > threshold else 0)
+    changed_pixels = changed.histogram()[255]
+    if not changed_pixels:
+        return False
+    histogram = before.histogram()
+    background = histogram.index(max(histogram))
+    empty = before.point(lambda v: 255 if abs(v - background) <= threshold else 0)
+    added_pixels = ImageChops.multiply(changed, empty).histogram()[255]
+    return added_pixels >= changed_pixels * min_ratio
+
+
+class SlideHashIndex:
+    """Perceptual hashes of the accepted slides, searchable by Hamming distance
+
+    Hashes are split into max_distance + 1 bands. Two hashes within
+    max_distance bits of each other must agree exactly on at least one band,
+    so a lookup only checks the slides sharing a band value instead of every
+    slide captured so far.
+    """
+
+    def __init__(self, max_distance=7, bits=256):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-bits // self.bands)
+        self._buckets = collections.defaultdict(list)  # (band, value) -> [(hash, slide index)]
+        self._mask = (1 << self.band_bits) - 1
+
+    def _keys(self, value):
+        return [(band, (value >> (band * self.band_bits)) & self._mask) for band in range(self.bands)]
+
+    def add(self, value, slide):
+        """Index the hash of slide number `slide` (0-based)"""
+        for key in self._keys(value):
+            self._buckets[key].append((value, slide))
+
+    def find(self, value):
+        """Return (slide, distance) of the closest indexed slide within max_distance, or None"""
+        best = None
+        for key in self._keys(value):
+            for candidate, slide in self._buckets.get(key, ()):
+                distance = hash_distance(value, candidate)
+                if distance <= self.max_distance and (best is None or (distance, slide) < best):
+                    best = (distance, slide)
+        return (best[1], best[0]) if best else None
+
+
+class SlideComparator:
+    """Compare slide frames on reduced grayscale buffers
+
+    A frame is reduced once with prepare() (grayscale, half size) and the
+    buffers are then compared in C/NumPy instead of iterating pixels in Python.
+    Two frames are equal when fewer than `tolerance` percent of the pixels
+    differ by more than `pixel_threshold` gray levels.
+    """
+
+    ENGINES = ('auto', 'numpy', 'imagechops', 'python')
+
+    def __init__(self, engine='auto', pixel_threshold=25, tolerance=2.0):
+        if engine not in self.ENGINES:
+            raise ValueError(tr("Unknown comparison engine: {}").format(engine))
+        if engine == 'auto':
+            engine = 'numpy' if np is not None else 'imagechops'
+        if engine == 'numpy' and np is None:
+            raise ValueError(tr("The numpy comparison engine requires numpy to be installed"))
+        self.engine = engine
+        self.pixel_threshold = pixel_threshold
+        self.tolerance = tolerance
+
+    def prepare(self, img):
+        """Reduce an image to the buffer used by the comparison engine"""
+        # Convert to grayscale and resize to reduce computation
+        size = (img.size[0] // 2, img.size[1] // 2)
+        reduced = img.convert('L').resize(size)
+        if self.engine == 'numpy':
+            return np.asarray(reduced)
+        return reduced
+
+    def buffer_size(self, buf):
+        """Return the (width, height) of a prepared buffer"""
+        if self.engine == 'numpy':
+            return (buf.shape[1], buf.shape[0])
+        return buf.size
+
+    def diff_percentage(self, buf1, buf2):
+        """Percentage of pixels whose gray levels differ by more than the threshold"""
+        width, height = self.buffer_size(buf1)
+        total_pixels = width * height
+        if not total_pixels:
+            return 0.0
+
+        if self.engine == 'numpy':
+            # max - min keeps the absolute difference in uint8 without widening
+            diff = np.maximum(buf1, buf2) - np.minimum(buf1, buf2)
+            diff_pixels = int(np.count_nonzero(diff > self.pixel_threshold))
+        elif self.engine == 'imagechops':
+            histogram = ImageChops.difference(buf1, buf2).histogram()
+            diff_pixels = sum(histogram[self.pixel_threshold + 1:])
+        else:
+            # Reference implementation kept for benchmarks
+            data1 = list(buf1.getdata())
+            data2 = list(buf2.getdata())
+            diff_pixels = sum(1 for i in range(total_pixels) if abs(data1[i] - data2[i]) > self.pixel_threshold)
+
+        return (diff_pixels / total_pixels) * 100
+
+    def equal(self, buf1, buf2):
+        """Compare two prepared buffers"""
+        if self.buffer_size(buf1) != self.buffer_size(buf2):
+            return False
+        return self.diff_percentage(buf1, buf2) < self.tolerance
+
+
+# One encoded PDF image: stream bytes, (width, height) and the PDF syntax of its dictionary entries
+PdfImage = collections.namedtuple('PdfImage', 'data size color_space bits filter decode_parms')
+
+# One slide yielded by PowerPointCapture.iter_slides(): its index and output path, the
+# captured bytes (PNG screenshot or downloaded slide image), the decoded image, its
+# perceptual hash, the presenter's slide number (None without counter) and the seconds
+# it took to capture
+CapturedSlide = collections.namedtuple('CapturedSlide', 'index path data image phash slide_number seconds')
+
+
+class StreamingPdfWriter:
+    """Write an image PDF one page at a time
+
+    Each page is encoded and written as soon as it is added, so only the
+    current image is held in memory no matter how many slides the deck has.
+    JPEG files and plain 8-bit or palette PNG files are embedded as they are
+    (DCTDecode and FlateDecode streams); other images are encoded like
+    Pillow's PDF plugin does (JPEG streams). Pages are `resolution` pixels
+    per inch. A page can carry a text layer: its words are drawn invisibly
+    (text render mode 3) over the image, so the PDF is searchable and text
+    can be selected. Pages that show the same slide file share one image
+    object, and with a `store` (SlideStore) the JPEG streams of slides that
+    must be re-encoded are made once and reused by every deck. The file is
+    written to `<output_file>.part` and moved into place by close().
+    """
+
+    # Advance width of every glyph of the text layer font, in 1/1000 em
+    GLYPH_WIDTH = 500
+
+    def __init__(self, output_file, resolution=100.0, store=None):
+        self.output_file = output_file
+        self.resolution = resolution
+        self.store = store
+        self.page_count = 0
+        self._temp_file = output_file + '.part'
+        self._file = open(self._temp_file, 'wb')
+        # Object 1 is the catalog and object 2 the page tree, both written by close()
+        self._offsets = [0, None, None]
+        self._page_ids = []
+        self._images = {}  # Image object number and size by SHA-256 of the slide file
+        self._font_id = None  # Text layer font, written with the first page that has text
+        self._file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _reserve(self):
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _write_object(self, number, body, stream=None):
+        self._offsets[number] = self._file.tell()
+        self._file.write(f'{number} 0 obj\n'.encode('ascii') + body)
+        if stream is not None:
+            self._file.write(b'\nstream\n' + stream + b'\nendstream')
+        self._file.write(b'\nendobj\n')
+
+    @staticmethod
+    def encode_image(image, quality=75):
+        """Encode an image into a JPEG page stream"""
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=quality)
+        return PdfImage(buffer.getvalue(), image.size, '/DeviceRGB' if image.mode == 'RGB' else '/DeviceGray',
+                        8, '/DCTDecode', None)
+
+    @staticmethod
+    def encode_file(data):
+        """Wrap the bytes of a JPEG or PNG file into a page stream without re-encoding
+
+        Returns None for formats a PDF cannot embed directly (WebP, interlaced
+        or 16-bit PNG, transparency, CMYK JPEG), which need encode_image().
+        """
+        if data[:3] == b'\xff\xd8\xff':
+            with Image.open(io.BytesIO(data)) as image:
+                if image.mode in ('RGB', 'L'):
+                    return PdfImage(data, image.size, '/DeviceRGB' if image.mode == 'RGB' else '/DeviceGray',
+                                    8, '/DCTDecode', None)
+            return None
+        if data[:8] != b'\x89PNG\r\n\x1a\n':
+            return None
+        header = palette = None
+        idat = []
+        offset = 8
+        while offset + 8 <= len(data):
+            length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+            chunk = data[offset + 8:offset + 8 + length]
+            offset += length + 12
+            if kind == b'IHDR':
+                header = struct.unpack('>IIBBBBB', chunk)
+            elif kind == b'PLTE':
+                palette = chunk
+            elif kind == b'tRNS':
+                return None
+            elif kind == b'IDAT':
+                idat.append(chunk)
+            elif kind == b'IEND':
+                break
+        if header is None or not idat:
+            return None
+        width, height, bit_depth, color_type, _, _, interlace = header
+        if interlace or color_type not in (0, 2, 3) or (color_type != 3 and bit_depth != 8):
+            return None
+        if color_type == 3:
+            if palette is None:
+                return None
+            colors = 1
+            color_space = f'[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]'
+        else:
+            colors = 3 if color_type == 2 else 1
+            color_space = '/DeviceRGB' if colors == 3 else '/DeviceGray'
+        # The IDAT chunks together are one zlib stream, with PNG row filters the PDF predictor undoes
+        decode_parms = f'<< /Predictor 15 /Colors {colors} /BitsPerComponent {bit_depth} /Columns {width} >>'
+        return PdfImage(b''.join(idat), (width, height), color_space, bit_depth, '/FlateDecode', decode_parms)
+
+    def add_image(self, image, quality=75, text=None):
+        """Append one page showing `image`"""
+        self.add_encoded(self.encode_image(image, quality), text)
+
+    @staticmethod
+    def encode_slide(data, quality=75, image=None, store=None):
+        """Page stream of the image file bytes `data`, embedding its compressed data when possible
+
+        Other formats are encoded from `image`, or from data when no image is
+        given, or taken from `store` when it has already encoded them.
+        """
+        encoded = StreamingPdfWriter.encode_file(data)
+        if encoded is not None:
+            return encoded
+        if store is not None:
+            return store.pdf_image(data, quality, image)
+        if image is not None:
+            return StreamingPdfWriter.encode_image(image, quality)
+        with Image.open(io.BytesIO(data)) as image:
+            return StreamingPdfWriter.encode_image(image, quality)
+
+    def add_file(self, path, quality=75, text=None):
+        """Append one page showing the image file at path"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        key = hashlib.sha256(data).hexdigest()
+        self.add_encoded(None if key in self._images else self.encode_slide(data, quality, store=self.store), text, key)
+
+    def _write_font(self):
+        """Write the text layer font: a Type0 font whose 2-byte codes are UTF-16 code units
+
+        No glyph data is embedded, as the text is never painted; the
+        ToUnicode map turns the codes back into text for search and copy.
+        """
+        self._font_id = self._reserve()
+        cid_font_id, descriptor_id, to_unicode_id = self._reserve(), self._reserve(), self._reserve()
+        self._write_object(self._font_id, (
+            f'<< /Type /Font /Subtype /Type0 /BaseFont /GlyphLessFont /Encoding /Identity-H '
+            f'/DescendantFonts [{cid_font_id} 0 R] /ToUnicode {to_unicode_id} 0 R >>'
+        ).encode('ascii'))
+        self._write_object(cid_font_id, (
+            f'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /GlyphLessFont '
+            f'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+            f'/FontDescriptor {descriptor_id} 0 R /DW {self.GLYPH_WIDTH} /CIDToGIDMap /Identity >>'
+        ).encode('ascii'))
+        self._write_object(descriptor_id, (
+            f'<< /Type /FontDescriptor /FontName /GlyphLessFont /Flags 5 /FontBBox [0 -200 {self.GLYPH_WIDTH} 800] '
+            f'/ItalicAngle 0 /Ascent 800 /Descent -200 /CapHeight 800 /StemV 80 >>'
+        ).encode('ascii'))
+        # bfrange entries may only vary in their last byte, hence one range per high byte
+        ranges = [f'<{high:02x}00> <{high:02x}ff> <{high:02x}00>' for high in range(256)]
+        blocks = ''.join(f'{len(ranges[i:i + 100])} beginbfrange\n' + '\n'.join(ranges[i:i + 100]) + '\nendbfrange\n'
+                         for i in range(0, len(ranges), 100))
+        cmap = ('/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n'
+                '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+                '/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n'
+                '1 begincodespacerange\n<0000> <ffff>\nendcodespacerange\n' + blocks +
+                'endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend').encode('ascii')
+        self._write_object(to_unicode_id, f'<< /Length {len(cmap)} >>'.encode('ascii'), cmap)
+
+    def _text_content(self, text, size, page_height):
+        """Content stream operators drawing the runs of a text layer invisibly over an image of `size` pixels"""
+        scale_x = size[0] * 72.0 / self.resolution / text['width']
+        scale_y = size[1] * 72.0 / self.resolution / text['height']
+        operators = []
+        for run in text['runs']:
+            codes = run['text'].encode('utf-16-be')
+            font_size = run['height'] * scale_y
+            if not codes or font_size <= 0 or run['width'] <= 0:
+                continue
+            # Stretch the fixed-width glyphs horizontally to fill the word's box
+            stretch = run['width'] * scale_x * 1000 * 100 / (len(codes) // 2 * font_size * self.GLYPH_WIDTH)
+            # The box spans the font's descent (-200) to ascent (800)
+            baseline = page_height - (run['y'] + run['height']) * scale_y + font_size * 0.2
+            # A trailing space keeps words apart when the text is extracted
+            operators.append(f'/F0 {font_size:.2f} Tf {stretch:.2f} Tz 1 0 0 1 {run["x"] * scale_x:.2f} {baseline:.2f} Tm '
+                             f'<{codes.hex()}0020> Tj')
+        return ' BT 3 Tr ' + ' '.join(operators) + ' ET' if operators else ''
+
+    def add_encoded(self, encoded, text=None, key=None):
+        """Append one page from the result of encode_image() or encode_file()
+
+        `text` is an optional text layer {'width', 'height', 'runs'}: words
+        [{'text', 'x', 'y', 'width', 'height'}] in the pixels of a width x
+        height capture of the page, which is scaled to the encoded image.
+        `key` identifies the slide file (its SHA-256): a page whose key was
+        added before shows that page's image object again, and `encoded` may
+        then be None.
+        """
+        if key in self._images:
+            image_id, (width, height) = self._images[key]
+        else:
+            width, height = encoded.size
+            image_id = self._reserve()
+            decode_parms = f' /DecodeParms {encoded.decode_parms}' if encoded.decode_parms else ''
+            self._write_object(image_id, (
+                f'<< /Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                f'/ColorSpace {encoded.color_space} /BitsPerComponent {encoded.bits} '
+                f'/Filter {encoded.filter}{decode_parms} /Length {len(encoded.data)} >>'
+            ).encode('ascii'), encoded.data)
+            if key is not None:
+                self._images[key] = (image_id, encoded.size)
+        page_width = width * 72.0 / self.resolution
+        page_height = height * 72.0 / self.resolution
+        content_id, page_id = self._reserve(), self._reserve()
+        content = f'q {page_width:.4f} 0 0 {page_height:.4f} 0 0 cm /Im0 Do Q'
+        fonts = ''
+        if text and text.get('runs'):
+            if self._font_id is None:
+                self._write_font()
+            content += self._text_content(text, (width, height), page_height)
+            fonts = f' /Font << /F0 {self._font_id} 0 R >>'
+        content = content.encode('ascii')
+        self._write_object(content_id, f'<< /Length {len(content)} >>'.encode('ascii'), content)
+        self._write_object(page_id, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.4f} {page_height:.4f}] '
+            f'/Resources << /XObject << /Im0 {image_id} 0 R >>{fonts} >> /Contents {content_id} 0 R >>'
+        ).encode('ascii'))
+        self._page_ids.append(page_id)
+        self.page_count += 1
+
+    def close(self):
+        """Write the page tree, cross-reference table and trailer, then move the file into place"""
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+        self._write_object(2, f'<< /Type /Pages /Kids [{kids}] /Count {self.page_count} >>'.encode('ascii'))
+        self._write_object(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+        xref_offset = self._file.tell()
+        lines = [f'xref\n0 {len(self._offsets)}\n', '0000000000 65535 f \n']
+        lines.extend(f'{offset:010d} 00000 n \n' for offset in self._offsets[1:])
+        lines.append(f'trailer\n<< /Size {len(self._offsets)} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n')
+        self._file.write(''.join(lines).encode('ascii'))
+        self._file.close()
+        os.replace(self._temp_file, self.output_file)
+
+    def abort(self):
+        """Discard the partially written file"""
+        self._file.close()
+        if os.path.exists(self._temp_file):
+            os.remove(self._temp_file)
+
+
+class OutputProfile:
+    """How accepted slides are encoded on disk and in the PDF
+
+    'png' keeps the browser's PNG as it is, 'png-palette' quantizes it to 256
+    colors (much smaller for flat text slides), 'jpeg' and 'webp' compress
+    lossily at `quality`. With `dpi`, slides wider than SLIDE_WIDTH_INCHES at
+    that density are downscaled and PDF pages use it as their resolution.
+    """
+    FORMATS = ('png', 'png-palette', 'jpeg', 'webp')
+    EXTENSIONS = {'png': '.png', 'png-palette': '.png', 'jpeg': '.jpg', 'webp': '.webp'}
+    # Width of a 16:9 PowerPoint slide
+    SLIDE_WIDTH_INCHES = 13.333
+
+    def __init__(self, image_format='png', quality=85, dpi=None):
+        if image_format not in self.FORMATS:
+            raise ValueError(tr("Unknown image format: {}").format(image_format))
+        self.image_format = image_format
+        self.quality = quality
+        self.dpi = dpi
+        self.extension = self.EXTENSIONS[image_format]
+
+    @property
+    def passthrough(self):
+        """True when the captured PNG bytes are written unchanged"""
+        return self.image_format == 'png' and not self.dpi
+
+    @property
+    def key(self):
+        """Name of the profile's folder in a slide store, e.g. 'png' or 'jpeg-q85-150dpi'"""
+        name = self.image_format
+        if self.image_format in ('jpeg', 'webp'):
+            name += f'-q{self.quality}'
+        if self.dpi:
+            name += f'-{self.dpi:g}dpi'
+        return name
+
+    @property
+    def pdf_resolution(self):
+        return float(self.dpi) if self.dpi else 100.0
+
+    @property
+    def pdf_quality(self):
+        """JPEG quality of PDF pages that cannot embed the slide file directly"""
+        return self.quality if self.image_format in ('jpeg', 'webp') else 75
+
+    def output_size(self, size):
+        """Pixel size of a slide of `size` once encoded under this profile"""
+        width, height = size
+        if self.dpi and width > round(self.SLIDE_WIDTH_INCHES * self.dpi):
+            target = round(self.SLIDE_WIDTH_INCHES * self.dpi)
+            return target, round(height * target / width)
+        return width, height
+
+    def encode(self, image):
+        """Encode an image under this profile, returning the file bytes"""
+        size = self.output_size(image.size)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        if self.image_format == 'png-palette':
+            image.convert('RGB').quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, 'PNG', optimize=True)
+        elif self.image_format == 'jpeg':
+            image.convert('RGB').save(buffer, 'JPEG', quality=self.quality, optimize=True)
+        elif self.image_format == 'webp':
+            image.save(buffer, 'WEBP', quality=self.quality)
+        else:
+            image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+class SlideStore:
+    """Content-addressed store of encoded slides shared by every deck
+
+    A slide is stored once per output profile as
+    `<root>/<profile key>/<ab>/<pixel hash><extension>`, keyed by the
+    pixel_hash() of the captured frame, and deck folders get hard links to
+    it. Boilerplate slides that recur across decks (title, agenda, legal)
+    are encoded and take disk space only once, whatever compression the
+    browser gave each screenshot. JPEG page streams made for PDF pages that
+    cannot embed the slide file are kept under `pdf/`, keyed by the SHA-256
+    of the slide file. Objects are written through temporary files, so
+    decks captured at the same time by batch workers can share a store.
+    """
+
+    def __init__(self, root=SLIDE_STORE, profile=None):
+        self.profile = profile or OutputProfile()
+        self.folder = os.path.join(root, self.profile.key)
+        self.link_failed = False
+
+    def object_path(self, key, extension=None):
+        return os.path.join(self.folder, key[:2], key + (extension or self.profile.extension))
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replace_file(path, data)
+
+    def put(self, key, image, data=None):
+        """Return (file bytes, True if already stored) of slide `key`
+
+        A new slide is encoded from `image` under the profile (or kept as
+        `data`, its captured PNG, when the profile passes it through) and
+        stored.
+        """
+        path = self.object_path(key)
+        stored = self._read(path)
+        if stored is not None:
+            return stored, True
+        if data is None or not self.profile.passthrough:
+            data = self.profile.encode(image)
+        self._write(path, data)
+        return data, False
+
+    def link(self, key, path):
+        """Make path a hard link to slide `key`, or a copy of it where hard links are not supported"""
+        source = self.object_path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.link(source, temp_path)
+        except OSError as e:
+            if not self.link_failed:
+                logging.warning(tr("Could not hard link slides from the store, copying them instead: {}").format(e))
+                self.link_failed = True
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, path)
+
+    def pdf_image(self, data, quality, image=None):
+        """JPEG page stream of the slide file bytes `data`, encoded once and then read from the store"""
+        path = os.path.join(self.folder, 'pdf', f'{hashlib.sha256(data).hexdigest()}-q{quality}.jpg')
+        stored = self._read(path)
+        if stored is not None:
+            return StreamingPdfWriter.encode_file(stored)
+        if image is None:
+            with Image.open(io.BytesIO(data)) as image:
+                encoded = StreamingPdfWriter.encode_image(image, quality)
+        else:
+            encoded = StreamingPdfWriter.encode_image(image, quality)
+        self._write(path, encoded.data)
+        return encoded
+
+
+class SlideOutputPipeline:
+    """Write accepted slides, thumbnails and PDF pages off the capture thread
+
+    The capture loop submit()s frames to a bounded queue and `workers` threads
+    encode and write the slide files under `profile`, render thumbnails and
+    encode PDF pages, which are appended in slide order. A full queue blocks
+    submit(), so a slow disk slows the capture down instead of buffering
+    frames without limit. With workers=0 every frame is processed inline.
+    With a `store` (SlideStore), captured frames are looked up by their
+    pixels and only new slides are encoded; slide files are hard links into
+    the store.
+    """
+
+    def __init__(self, workers=0, queue_size=8, pdf_writer=None, thumbnail_folder=None,
+                 thumbnail_size=(320, 180), first_index=0, manifest=None, metrics=None, profile=None, store=None):
+        self.pdf_writer = pdf_writer
+        self.profile = profile or OutputProfile()
+        self.store = store
+        self.manifest = manifest
+        self.metrics = metrics
+        self.thumbnail_folder = thumbnail_folder
+        self.thumbnail_size = thumbnail_size
+        if thumbnail_folder and not os.path.exists(thumbnail_folder):
+            os.makedirs(thumbnail_folder)
+        self._next_page = first_index
+        self._page_ready = threading.Condition()
+        self._errors = []
+        self._closed = False
+        self._queue = queue.Queue(maxsize=queue_size) if workers > 0 else None
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, index, path, png_data=None, image=None, record=None, raw=False, text=None):
+        """Queue slide `index` for output; png_data is encoded under the profile and written to path when given
+
+        With raw=True png_data is written as it is (e.g. an image downloaded
+        by the presenter). `record` is added to the manifest, with the file's
+        hash, once the slide has been written. A `text` layer is saved as the
+        slide's sidecar and drawn invisibly on its PDF page.
+        """
+        if self._errors:
+            raise self._errors[0]
+        if self._queue is None:
+            self._process(index, path, png_data, image, record, raw, text)
+        else:
+            self._queue.put((index, path, png_data, image, record, raw, text))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._process(*item)
+            except Exception as e:
+                logging.error(tr("Failed to write slide {}: {}").format(item[0] + 1, e))
+                self._errors.append(e)
+
+    def _process(self, index, path, data, image, record, raw, text):
+        encoded = None
+        try:
+            if text is not None:
+                if not raw:
+                    # Boxes in the pixels of the slide file
+                    text = scale_text_layer(text, self.profile.output_size((text['width'], text['height'])))
+                with open(text_layer_path(path), 'w', encoding='utf-8') as f:
+                    json.dump(dict(text, file=os.path.basename(path)), f, ensure_ascii=False)
+            if data is not None and self.store is not None and not raw:
+                if image is None:
+                    image = Image.open(io.BytesIO(data))
+                key = (record or {}).get('pixels') or pixel_hash(image)
+                data, stored = self.store.put(key, image, data)
+                self.store.link(key, path)
+                if not self.profile.passthrough:
+                    image = None  # Thumbnails and PDF pages show the encoded slide
+                if record is not None:
+                    record['pixels'] = key
+                if self.metrics:
+                    self.metrics.count('store_hits' if stored else 'store_misses')
+                    if not stored:
+                        self.metrics.count('bytes_written', len(data))
+            elif data is not None:
+                if not raw and not self.profile.passthrough:
+                    data = self.profile.encode(image if image is not None else Image.open(io.BytesIO(data)))
+                    image = None  # Thumbnails and PDF pages show the encoded slide
+                replace_file(path, data)
+                if self.metrics:
+                    self.metrics.count('bytes_written', len(data))
+            elif record is not None or self.pdf_writer:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            digest = hashlib.sha256(data).hexdigest() if data is not None else None
+            if record is not None:
+                record['hash'] = digest
+            if self.thumbnail_folder:
+                if image is None:
+                    image = Image.open(io.BytesIO(data) if data is not None else path)
+                thumbnail = image.convert('RGB')
+                thumbnail.thumbnail(self.thumbnail_size)
+                thumbnail.save(os.path.join(self.thumbnail_folder, os.path.basename(path)))
+            if self.pdf_writer:
+                # Embed the slide file's compressed data when the PDF supports its format
+                encoded = StreamingPdfWriter.encode_slide(data, self.profile.pdf_quality, image, self.store)
+        finally:
+            # Pages must be appended in slide order, even when this slide failed
+            with self._page_ready:
+                while self._next_page != index:
+                    self._page_ready.wait()
+                try:
+                    if encoded is not None:
+                        self.pdf_writer.add_encoded(encoded, text, digest)
+                    if self.manifest is not None and record is not None and record.get('hash'):
+                        self.manifest.add(record)
+                finally:
+                    self._next_page += 1
+                    self._page_ready.notify_all()
+
+    def close(self, raise_errors=True):
+        """Wait until every queued slide has been written"""
+        if not self._closed:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+        if raise_errors and self._errors:
+            raise self._errors[0]
+
+
+# Formats of the optimized slide copies written by post-processing
+OPTIMIZE_FORMATS = ('png', 'webp')
+
+
+def optimize_image(image, image_format):
+    """Losslessly recompress an image as small as Pillow can, returning the file bytes
+
+    'png' stores images of at most 256 colors with an exact palette and uses
+    the strongest zlib settings; 'webp' is lossless WebP at its slowest,
+    smallest method.
+    """
+    buffer = io.BytesIO()
+    if image_format == 'webp':
+        image.save(buffer, 'WEBP', lossless=True, method=6)
+    else:
+        if image.mode == 'RGB' and image.getcolors(256):
+            image = image.convert('P', palette=Image.Palette.ADAPTIVE, colors=256)
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def postprocess_slide(path, pdf_quality=None, thumbnail_size=None, optimize=None, optimized_path=None, store=None):
+    """Decode and compress one slide file for post-processing (run in a worker process)
+
+    Returns (SHA-256 of the file, its PDF page stream when pdf_quality is
+    given, its thumbnail as (size, RGB bytes) when thumbnail_size is given,
+    bytes written to optimized_path when optimize names a format).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    encoded = thumbnail = None
+    written = 0
+    with Image.open(io.BytesIO(data)) as image:
+        if pdf_quality is not None:
+            encoded = StreamingPdfWriter.encode_slide(data, pdf_quality, image, store)
+        if thumbnail_size:
+            small = image.convert('RGB')
+            small.thumbnail(thumbnail_size)
+            thumbnail = (small.size, small.tobytes())
+        if optimize:
+            optimized = optimize_image(image, optimize)
+            replace_file(optimized_path, optimized)
+            written = len(optimized)
+    return hashlib.sha256(data).hexdigest(), encoded, thumbnail, written
+
+
+class NetworkAssetCollector:
+    """Collect the slide images the presenter downloads, via the DevTools Network domain
+
+    Response bodies of image requests are fetched with Network.getResponseBody
+    as they appear in Chrome's performance log and kept in a small cache keyed
+    by URL. slide_assets() then returns the cached bodies of the images that
+    are currently displayed on the slide, at their original resolution.
+    """
+
+    EXTENSIONS = {
+        'image/png': '.png',
+        'image/jpeg': '.jpg',
+        'image/webp': '.webp',
+        'image/gif': '.gif',
+        'image/svg+xml': '.svg',
+    }
+    # Formats Pillow can decode for comparison and PDF pages
+    RASTER_TYPES = ('image/png', 'image/jpeg', 'image/webp', 'image/gif')
+
+    def __init__(self, driver, min_bytes=20000, url_pattern=None, cache_size=200):
+        self.driver = driver
+        self.min_bytes = min_bytes
+        self.url_pattern = re.compile(url_pattern) if url_pattern else None
+        self.cache_size = cache_size
+        self._requests = {}
+        self._bodies = collections.OrderedDict()
+
+    @staticmethod
+    def enable_logging(chrome_options):
+        """Ask chromedriver to record DevTools events in the performance log"""
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    def start(self):
+        """Enable the Network domain with buffers large enough to keep slide images"""
+        self.driver.get_log('performance')  # Discard events from earlier pages
+        self.driver.execute_cdp_cmd('Network.enable', {
+            'maxTotalBufferSize': 200 * 1024 * 1024,
+            'maxResourceBufferSize': 50 * 1024 * 1024,
+        })
+
+    def poll(self):
+        """Read new performance log entries and fetch finished image responses"""
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            params = message.get('params', {})
+            if message.get('method') == 'Network.responseReceived':
+                response = params.get('response', {})
+                mime_type = response.get('mimeType', '').split(';')[0].strip().lower()
+                url = response.get('url', '')
+                if mime_type in self.EXTENSIONS and (not self.url_pattern or self.url_pattern.search(url)):
+                    self._requests[params['requestId']] = (url, mime_type)
+            elif message.get('method') == 'Network.loadingFinished':
+                request = self._requests.pop(params.get('requestId'), None)
+                if request and params.get('encodedDataLength', 0) >= self.min_bytes:
+                    self._fetch_body(params['requestId'], *request)
+            elif message.get('method') == 'Network.loadingFailed':
+                self._requests.pop(params.get('requestId'), None)
+
+    def _fetch_body(self, request_id, url, mime_type):
+        try:
+            body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            logging.debug(tr("Could not fetch response body for {}: {}").format(url, e))
+            return
+        data = base64.b64decode(body['body']) if body.get('base64Encoded') else body['body'].encode('utf-8')
+        self._bodies[url] = (mime_type, data)
+        self._bodies.move_to_end(url)
+        while len(self._bodies) > self.cache_size:
+            self._bodies.popitem(last=False)
+
+    def slide_assets(self, displayed_urls):
+        """Return (url, mime type, data) for the displayed URLs whose bodies were captured"""
+        self.poll()
+        assets = []
+        for url in displayed_urls:
+            if url in self._bodies and all(url != asset[0] for asset in assets):
+                assets.append((url,) + self._bodies[url])
+        return assets
+
+
+class CaptureMetrics:
+    """Per-phase timers and event counters of one capture
+
+    phase() adds the monotonic time spent in a block to a named phase,
+    count() increments a named counter. Both may be called from the output
+    threads and from parallel range captures.
+    """
+
+    PROMETHEUS_PREFIX = 'powerpoint_capture'
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = collections.defaultdict(lambda: [0.0, 0])  # name -> [seconds, calls]
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self.phases[name][0] += elapsed
+                self.phases[name][1] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def report(self, **fields):
+        """Return the metrics as a JSON-serialisable dict, starting with `fields`"""
+        seconds = time.monotonic() - self.started
+        with self._lock:
+            report = dict(fields)
+            report['seconds'] = round(seconds, 3)
+            report['slides_per_second'] = round(self.counters['slides_accepted'] / seconds, 3) if seconds else 0.0
+            report['phases'] = {
+                name: {'seconds': round(elapsed, 3), 'calls': calls}
+                for name, (elapsed, calls) in sorted(self.phases.items())
+            }
+            report['counters'] = dict(sorted(self.counters.items()))
+        return report
+
+    def write_json(self, path, **fields):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**fields), f, indent=2)
+
+    def write_prometheus(self, path, **labels):
+        """Write the metrics in the Prometheus text exposition format, e.g. for a node exporter textfile collector"""
+        def series(name, value, **extra):
+            label_text = ','.join(
+                '{}="{}"'.format(key, str(val).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, val in dict(labels, **extra).items()
+            )
+            return f'{self.PROMETHEUS_PREFIX}_{name}{{{label_text}}} {value}'
+
+        report = self.report()
+        lines = [
+            f'# HELP {self.PROMETHEUS_PREFIX}_duration_seconds Wall-clock time of the capture',
+            f'# TYPE {self.PROMETHEUS_PREFIX}_duration_seconds gauge',
+            series('duration_seconds', report['seconds']),
+            f'# HELP {self.PROMETHEUS_PREFIX}_slides_per_second Accepted slides per second',
+            f'# TYPE {self.PROMETHEUS_PREFIX}_slides_per_second gauge',
+            series('slides_per_second', report['slides_per_second']),
+            f'# HELP {self.PROMETHEUS_PREFIX}_phase_seconds Time spent in each phase of the capture',
+            f'# TYPE {self.PROMETHEUS_PREFIX}_phase_seconds gauge',
+        ]
+        lines += [series('phase_seconds', phase['seconds'], phase=name) for name, phase in report['phases'].items()]
+        lines += [
+            f'# HELP {self.PROMETHEUS_PREFIX}_phase_calls Number of times each phase ran',
+            f'# TYPE {self.PROMETHEUS_PREFIX}_phase_calls gauge',
+        ]
+        lines += [series('phase_calls', phase['calls'], phase=name) for name, phase in report['phases'].items()]
+        lines += [
+            f'# HELP {self.PROMETHEUS_PREFIX}_events Slides, retries, fallbacks and bytes counted during the capture',
+            f'# TYPE {self.PROMETHEUS_PREFIX}_events gauge',
+        ]
+        lines += [series('events', value, event=name) for name, value in report['counters'].items()]
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+
+
+class CaptureManifest:
+    """Record of the slides accepted for one deck, kept as manifest.json in the output folder
+
+    Each slide entry holds its index, file name, SHA-256 of the file, the
+    number of arrow key presses that led to it, the presenter's slide number
+    when known, and timing. The manifest is rewritten atomically after every
+    slide, so an interrupted capture can be resumed from it.
+    """
+
+    FILE_NAME = 'manifest.json'
+
+    def __init__(self, output_folder, url, slides=None, complete=False, version=None):
+        self.output_folder = output_folder
+        self.url = url
+        self.slides = slides or []
+        self.complete = complete
+        self.version = version  # Document version read from the page, when exposed
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.output_folder, self.FILE_NAME)
+
+    @classmethod
+    def load(cls, output_folder, url):
+        """Load the manifest of `url` from output_folder, keeping only slides whose files are intact"""
+        path = os.path.join(output_folder, cls.FILE_NAME)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('url') != url:
+            return None
+
+        slides = []
+        for slide in data.get('slides', []):
+            if slide.get('index') != len(slides) or file_sha256(os.path.join(output_folder, slide['file'])) != slide.get('hash'):
+                break
+            slides.append(slide)
+        complete = data.get('complete', False) and len(slides) == len(data['slides'])
+        return cls(output_folder, url, slides, complete, data.get('version'))
+
+    def add(self, record):
+        """Append a slide record and save"""
+        with self._lock:
+            self.slides.append(record)
+            self.save()
+
+    def save(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': self.url, 'version': self.version, 'complete': self.complete, 'slides': self.slides},
+                      f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def image_files(self):
+        """Paths of the recorded slides, in order"""
+        return [os.path.join(self.output_folder, slide['file']) for slide in self.slides]
+
+
+class DriverPool:
+    """Pool of long-lived Chrome drivers reused across decks
+
+    Drivers are health-checked when acquired, reset to a single blank tab when
+    released, and recycled after `max_uses` decks or when they stop responding.
+    """
+
+    def __init__(self, chrome_options, size=1, max_uses=20):
+        self.chrome_options = chrome_options
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def _create(self):
+        logging.info(tr("Starting browser..."))
+        driver = webdriver.Chrome(options=self.chrome_options)
+        driver.maximize_window()
+        self._uses[driver.session_id] = 0
+        return driver
+
+    def _quit(self, driver):
+        self._uses.pop(driver.session_id, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(tr("Failed to quit browser: {}").format(e))
+
+    @staticmethod
+    def is_healthy(driver):
+        """Check that the browser still answers commands"""
+        try:
+            return driver.execute_script('return 1') == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def warm(self):
+        """Start browsers until the pool holds `size` idle drivers"""
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            driver = self._create()
+            with self._lock:
+                self._idle.append(driver)
+
+    def acquire(self):
+        """Return a ready driver, starting a new browser only when no healthy one is idle"""
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                return self._create()
+            if self.is_healthy(driver):
+                return driver
+            logging.warning(tr("Discarding unresponsive browser"))
+            self._quit(driver)
+
+    def release(self, driver):
+        """Return a driver to the pool after a deck, or quit it if it is worn out or broken"""
+        uses = self._uses.get(driver.session_id, 0) + 1
+        self._uses[driver.session_id] = uses
+        with self._lock:
+            full = len(self._idle) >= self.size
+        if full or uses >= self.max_uses or not self.is_healthy(driver):
+            self._quit(driver)
+            return
+        try:
+            self.reset(driver)
+        except Exception as e:
+            logging.warning(tr("Failed to reset browser, recycling it: {}").format(e))
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    @staticmethod
+    def reset(driver):
+        """Leave the driver on a single blank tab in the top-level frame"""
+        driver.switch_to.default_content()
+        old_handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        new_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(new_handle)
+
+    def close(self):
+        """Quit all idle drivers"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+
+class PowerPointCapture:
+    SETTLE_MODES = ('fixed', 'event')
+    CAPTURE_BACKENDS = ('screenshot', 'network')
+    # Differing perceptual hash bits up to which a frame is checked against a slide already captured
+    DUPLICATE_DISTANCE = 7
+    # Build steps after which a slide that keeps changing is kept as it is
+    MAX_BUILDS_PER_SLIDE = 50
+    # Size of each slide's cell in the thumbnail sprite
+    SPRITE_TILE = (320, 180)
+    # Share of the slide container a downloaded image must cover to be stored as the slide
+    ASSET_COVERAGE = 0.95
+
+    def __init__(self, compare_engine='auto', in_memory=False, settle_mode='fixed', settle_timeout=5.0,
+                 use_slide_counter=True, headless=False, pool_size=0, recycle_after=20, stream_pdf=False,
+                 writer_threads=0, thumbnails=False, capture_backend='screenshot', asset_url_pattern=None,
+                 clip_to_slide=False, clip_scale=1.0, resume=True, incremental=False,
+                 skip_duplicates=False, detect_loop=False, present_timeout=30.0,
+                 frame_path_cache=FRAME_PATH_CACHE, prometheus=False, image_format='png', image_quality=85,
+                 dpi=None, collapse_builds=False, single_step=False, text_layer=False, slide_store=None,
+                 postprocess_workers=0, sprite=False, optimize=None, build_outputs=True):
+        if settle_mode not in self.SETTLE_MODES:
+            raise ValueError(tr("Unknown settle mode: {}").format(settle_mode))
+        if capture_backend not in self.CAPTURE_BACKENDS:
+            raise ValueError(tr("Unknown capture backend: {}").format(capture_backend))
+        if optimize is not None and optimize not in OPTIMIZE_FORMATS:
+            raise ValueError(tr("Unknown optimized format: {}").format(optimize))
+        self.comparator = SlideComparator(compare_engine)
+        # File format, quality and resolution of the saved slides and PDF pages
+        self.output_profile = OutputProfile(image_format, image_quality, dpi)
+        # Folder of the content-addressed store that deck folders link their slides from (None: no store)
+        self.slide_store = SlideStore(slide_store, self.output_profile) if slide_store else None
+        # Processes that decode and compress the slides for the PDF, sprite and optimized copies after capture
+        self.postprocess_workers = postprocess_workers
+        self.postprocess_pool = (concurrent.futures.ProcessPoolExecutor(postprocess_workers)
+                                 if postprocess_workers > 0 else None)
+        # Thumbnail sprite and losslessly optimized copies ('png' or 'webp') made by post-processing
+        self.sprite = sprite
+        self.optimize = optimize
+        # Whether captures end with post-processing (False: left to the caller, as run_batch does)
+        self.build_outputs = build_outputs
+        # Keep only the final frame of slides with build animations
+        self.collapse_builds = collapse_builds
+        # Keep frames in memory and only write accepted slides to disk (background writers need the
+        # frames in memory, incremental runs must not overwrite unchanged slides, profiles re-encode them,
+        # build steps replace the frame of their slide, the store looks frames up before writing them)
+        self.in_memory = (in_memory or writer_threads > 0 or incremental or collapse_builds
+                          or not self.output_profile.passthrough or self.slide_store is not None)
+        # Threads that write slides, thumbnails and PDF pages while capture continues
+        self.writer_threads = writer_threads
+        self.thumbnails = thumbnails
+        # 'network' stores the slide images the presenter downloads, with screenshots as fallback
+        self.capture_backend = capture_backend
+        self.asset_url_pattern = asset_url_pattern
+        # Capture only the slide container instead of the whole window
+        self.clip_to_slide = clip_to_slide
+        self.clip_scale = clip_scale
+        # Continue an interrupted capture from the manifest in the output folder
+        self.resume = resume
+        # Compare against the previous complete run and only rewrite the slides that changed
+        self.incremental = incremental
+        # Drop frames identical to an earlier slide, and stop when the presenter wraps back to slide 1
+        self.skip_duplicates = skip_duplicates
+        self.detect_loop = detect_loop
+        # 'event' waits for the slide to become quiescent in the page, 'fixed' uses sleeps
+        self.settle_mode = 'event' if single_step else settle_mode
+        # Advance, settle and read the counter with one in-page script per slide
+        self.single_step = single_step
+        # Whether the presenter reacts to keys sent from the page (None: not known yet)
+        self.page_keys_work = None
+        self.step_misses = 0
+        self.settle_timeout = settle_timeout
+        # Stop as soon as the presenter's slide counter reports the last slide
+        self.use_slide_counter = use_slide_counter
+        # Append PDF pages while capturing instead of building the PDF at the end
+        self.stream_pdf = stream_pdf
+        # Save the words shown on each slide as a sidecar and an invisible PDF text layer
+        self.text_layer = text_layer
+        # Presenter frame offset and window width that map its text to screenshot pixels (read once per capture)
+        self.text_geometry = None
+        # iframe indices leading to the frame that held the Present button ([] = main page)
+        self.present_frame_path = []
+        # Overall time allowed to find the Present button, and where its frame path is cached (None: no cache)
+        self.present_timeout = present_timeout
+        self.frame_path_cache = frame_path_cache
+        # Message of the error that ended the last capture, if any
+        self.last_error = None
+        # Whether the last (incremental) capture found the deck unchanged and kept its PDF
+        self.last_unchanged = False
+        # Timings and counters of the last capture, saved as capture_report.json
+        self.metrics = CaptureMetrics()
+        self.prometheus = prometheus
+        # Set by cancel() to stop the running capture after its current slide
+        self.cancel_requested = threading.Event()
+        self.chrome_options = Options()
+        # Set browser window size to 1920x1080
+        self.chrome_options.add_argument('--window-size=1920,1080')
+        self.chrome_options.add_argument('--start-maximized')
+        if headless:
+            self.chrome_options.add_argument('--headless=new')
+        
+        # Other necessary settings
+        self.chrome_options.add_argument('--disable-infobars')
+        self.chrome_options.add_argument('--disable-notifications')
+        self.chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+        self.chrome_options.add_experimental_option('useAutomationExtension', False)
+        if capture_backend == 'network':
+            NetworkAssetCollector.enable_logging(self.chrome_options)
+
+        # Keep warm browsers between decks when pooling is enabled
+        self.driver_pool = DriverPool(self.chrome_options, pool_size, recycle_after) if pool_size > 0 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Quit the browsers kept in the driver pool and stop the post-processing workers"""
+        if self.driver_pool:
+            self.driver_pool.close()
+        if self.postprocess_pool:
+            self.postprocess_pool.shutdown()
+
+    def cancel(self):
+        """Stop the running capture (from another thread or a progress callback) before its next frame"""
+        self.cancel_requested.set()
+
+    def find_and_click_present_button(self, driver, max_attempts=3):
+        """Find and click the Present button in the specified frame"""
+        for attempt in range(max_attempts):
+            try:
+                # Wait for button to appear
+                present_button = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '[aria-label="Present"]'))
+                )
+                
+                # Remove overlaying elements
+                driver.execute_script("""
+                    const overlays = document.querySelectorAll('[role="dialog"], [class*="overlay"], [class*="modal"]');
+                    overlays.forEach(overlay => overlay.remove());
+                """)
+                
+                # Ensure button is visible
+                driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", present_button)
+                
+                # Try to click
+                try:
+                    present_button.click()
+                except:
+                    driver.execute_script("arguments[0].click();", present_button)
+                
+                time.sleep(2)
+                return True
+            except StaleElementReferenceException:
+                if attempt < max_attempts - 1:
+                    time.sleep(1)
+                    continue
+            except Exception as e:
+                logging.warning(tr("Click attempt {} failed: {}").format(attempt + 1, e))
+                if attempt < max_attempts - 1:
+                    time.sleep(1)
+                    continue
+        return False
+
+    def search_present_button(self, driver, prefix=()):
+        """Return the frame path of the Present button below the frame at `prefix`, or None
+
+        One script searches the frame and all its same-origin frames; only
+        cross-origin frames are entered through WebDriver.
+        """
+        try:
+            self.switch_to_frame_path(driver, prefix)
+            result = driver.execute_script(PRESENT_BUTTON_SCRIPT)
+        except Exception as e:
+            logging.debug(tr("Present button search failed in frame {}: {}").format(list(prefix), e))
+            return None
+        finally:
+            driver.switch_to.default_content()
+        if result['path'] is not None:
+            return list(prefix) + result['path']
+        for blocked in result['blocked']:
+            path = self.search_present_button(driver, list(prefix) + blocked)
+            if path is not None:
+                return path
+        return None
+
+    def try_click_present_button(self, driver):
+        """Find the Present button in any frame, polling until present_timeout, and click it"""
+        try:
+            host = urllib.parse.urlparse(driver.current_url).netloc
+            cached = load_frame_paths(self.frame_path_cache).get(host) if self.frame_path_cache else None
+            logging.info(tr("Looking for Present button..."))
+            deadline = time.monotonic() + self.present_timeout
+            while True:
+                # Try the frame that held the button on this host last time before searching everywhere
+                path = self.search_present_button(driver, cached) if cached is not None else None
+                if path is None:
+                    path = self.search_present_button(driver)
+                if path is not None:
+                    break
+                if time.monotonic() >= deadline:
+                    logging.error(tr("Could not find clickable Present button in any location"))
+                    return False
+                time.sleep(0.25)
+            
+            location = tr("main page") if not path else f"iframe {'/'.join(str(i + 1) for i in path)}"
+            logging.info(tr("Present button found in {}").format(location))
+            try:
+                self.switch_to_frame_path(driver, path)
+                if not self.find_and_click_present_button(driver):
+                    return False
+            finally:
+                driver.switch_to.default_content()
+            self.present_frame_path = path
+            if self.frame_path_cache:
+                remember_frame_path(host, path, self.frame_path_cache)
+            return True
+            
+        except Exception as e:
+            logging.error(tr("Failed to click Present button: {}").format(e))
+            return False
+
+    def check_presentation_mode(self, driver):
+        """Check if in presentation mode"""
+        try:
+            time.sleep(2)
+            # Check URL change
+            if "view=present" in driver.current_url.lower():
+                return True
+            # Check if fullscreen
+            is_fullscreen = driver.execute_script("""
+                return document.fullscreenElement !== null || 
+                       document.webkitFullscreenElement !== null ||
+                       document.mozFullScreenElement !== null ||
+                       document.msFullscreenElement !== null;
+            """)
+            if is_fullscreen:
+                return True
+            # Check specific elements
+            try:
+                return driver.find_element(By.CSS_SELECTOR, '[class*="presentationMode"]').is_displayed()
+            except:
+                return False
+        except:
+            return False
+        
+    def switch_to_frame_path(self, driver, path):
+        """Switch into the frame reached through a list of iframe indices"""
+        driver.switch_to.default_content()
+        for index in path:
+            driver.switch_to.frame(driver.find_elements(By.TAG_NAME, "iframe")[index])
+
+    def switch_to_presenter(self, driver):
+        """Switch into the frame that hosts the presenter"""
+        self.switch_to_frame_path(driver, self.present_frame_path)
+
+    def run_presenter_script(self, driver, script, *args, async_script=False):
+        """Run a script in the presenter frame and return to the main page"""
+        try:
+            self.switch_to_presenter(driver)
+            if async_script:
+                return driver.execute_async_script(script, *args)
+            return driver.execute_script(script, *args)
+        finally:
+            driver.switch_to.default_content()
+
+    def wait_for_slide_settle(self, driver):
+        """Wait until the current slide has finished rendering"""
+        with self.metrics.phase('settle'):
+            if self.settle_mode == 'event':
+                try:
+                    result = self.run_presenter_script(
+                        driver, SETTLE_SCRIPT, 300, int(self.settle_timeout * 1000), 3, async_script=True
+                    )
+                    if result and result.get('settled'):
+                        return
+                    logging.warning(tr("Slide did not settle within the time limit, using fixed wait"))
+                except Exception as e:
+                    logging.warning(tr("Settle detection failed, using fixed wait: {}").format(e))
+
+            # Wait for animations to complete
+            time.sleep(2)  # Base wait time
+        
+            # Check if page is still changing
+            old_source = driver.page_source
+            time.sleep(0.5)
+            if old_source != driver.page_source:
+                time.sleep(1.5)  # Wait longer if page is changing
+
+    def read_slide_counter(self, driver, step=None):
+        """Read (current slide, total slides) from the presenter, or None if not available
+
+        When given the result of next_slide(), its counter is used without
+        another call to the browser.
+        """
+        if step is not None:
+            counter = step.get('counter')
+            return (counter['index'], counter['total']) if counter else None
+        try:
+            counter = self.run_presenter_script(driver, SLIDE_COUNTER_SCRIPT)
+        except Exception as e:
+            logging.debug(tr("Could not read slide counter: {}").format(e))
+            return None
+        if not counter:
+            return None
+        return counter['index'], counter['total']
+
+    def read_document_version(self, driver):
+        """Read the document version or modified stamp exposed by the page, or None"""
+        try:
+            return driver.execute_script(DOCUMENT_VERSION_SCRIPT)
+        except Exception as e:
+            logging.debug(tr("Could not read document version: {}").format(e))
+            return None
+
+    def presenter_frame_offset(self, driver):
+        """Position of the presenter frame's viewport within the browser window"""
+        x = y = 0
+        try:
+            driver.switch_to.default_content()
+            for index in self.present_frame_path:
+                frame = driver.find_elements(By.TAG_NAME, "iframe")[index]
+                left, top = driver.execute_script("""
+                    var r = arguments[0].getBoundingClientRect();
+                    return [r.left + arguments[0].clientLeft, r.top + arguments[0].clientTop];
+                """, frame)
+                x += left
+                y += top
+                driver.switch_to.frame(frame)
+        finally:
+            driver.switch_to.default_content()
+        return x, y
+
+    def locate_slide_container(self, driver):
+        """Return the slide container's rectangle in window coordinates, or None"""
+        try:
+            rect = self.run_presenter_script(driver, SLIDE_RECT_SCRIPT)
+            if not rect:
+                return None
+            offset_x, offset_y = self.presenter_frame_offset(driver)
+        except Exception as e:
+            logging.warning(tr("Could not locate slide container: {}").format(e))
+            return None
+        return {
+            'x': rect['x'] + offset_x,
+            'y': rect['y'] + offset_y,
+            'width': rect['width'],
+            'height': rect['height'],
+        }
+
+    def read_slide_text(self, driver, clip, image_size):
+        """Read the text layer of the frame on screen: its words with boxes in the pixels of the captured image
+
+        Returns {'width', 'height', 'runs'} for an image of image_size
+        captured with clip, or None when the text cannot be read. Only the
+        words on the slide container are read, so the presenter's own text
+        stays out; words outside the captured area are left out as well.
+        """
+        try:
+            with self.metrics.phase('text'):
+                if self.text_geometry is None:
+                    slide = self.run_presenter_script(driver, SLIDE_RECT_SCRIPT)
+                    if not slide:
+                        logging.debug(tr("Slide container not found, no text layer for this frame"))
+                        return None
+                    offset_x, offset_y = self.presenter_frame_offset(driver)
+                    self.text_geometry = (offset_x, offset_y, driver.execute_script('return window.innerWidth'), slide)
+                runs = self.run_presenter_script(driver, SLIDE_TEXT_SCRIPT, self.text_geometry[3])
+        except Exception as e:
+            logging.warning(tr("Could not read slide text: {}").format(e))
+            return None
+        offset_x, offset_y, window_width, _ = self.text_geometry
+        if clip:
+            offset_x -= clip['x']
+            offset_y -= clip['y']
+        width, height = image_size
+        # Screenshots are in device pixels, clipped captures also scaled by clip_scale
+        scale = width / (clip['width'] if clip else window_width or width)
+        layer = []
+        for run in runs or []:
+            x, y = (run['x'] + offset_x) * scale, (run['y'] + offset_y) * scale
+            run_width, run_height = run['width'] * scale, run['height'] * scale
+            if x + run_width <= 0 or y + run_height <= 0 or x >= width or y >= height:
+                continue
+            layer.append({'text': run['text'], 'x': round(x, 1), 'y': round(y, 1),
+                          'width': round(run_width, 1), 'height': round(run_height, 1)})
+        self.metrics.count('text_runs', len(layer))
+        return {'width': width, 'height': height, 'runs': layer}
+
+    def grab_frame(self, driver, clip=None):
+        """Return the current frame as PNG bytes, limited to `clip` when given"""
+        with self.metrics.phase('screenshot'):
+            if clip:
+                result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                    'format': 'png',
+                    'clip': dict(clip, scale=self.clip_scale),
+                })
+                return base64.b64decode(result['data'])
+            return driver.get_screenshot_as_png()
+
+    def displayed_slide_images(self, driver):
+        """URLs of the images currently shown over the whole slide, largest first
+
+        An image stands in for the slide only when it covers at least
+        ASSET_COVERAGE of the slide container and no text is drawn over it;
+        otherwise, or when the container cannot be found, the list is empty
+        and the slide is captured as a screenshot.
+        """
+        try:
+            slide = self.run_presenter_script(driver, SLIDE_RECT_SCRIPT)
+            if not slide:
+                return []
+            images = self.run_presenter_script(driver, SLIDE_IMAGES_SCRIPT, slide, self.ASSET_COVERAGE)
+        except Exception as e:
+            logging.debug(tr("Could not list slide images: {}").format(e))
+            return []
+        return [image['url'] for image in images or []]
+
+    def go_to_slide(self, driver, slide_number, timeout=5.0):
+        """Jump to a 1-based slide number by typing it and pressing Enter, verified with the slide counter"""
+        try:
+            self.switch_to_presenter(driver)
+            actions = ActionChains(driver)
+            actions.send_keys(str(slide_number))
+            actions.send_keys(Keys.ENTER)
+            actions.perform()
+        except Exception as e:
+            logging.warning(tr("Failed to jump to slide {}: {}").format(slide_number, e))
+            return False
+        finally:
+            driver.switch_to.default_content()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            counter = self.read_slide_counter(driver)
+            if counter and counter[0] == slide_number:
+                return True
+            time.sleep(0.2)
+        return False
+
+    def fast_forward(self, driver, records):
+        """Bring the presenter back to the last slide of a manifest's records
+
+        A jump with go_to_slide() shows the slide before its build animations,
+        so only the key presses made on that slide so far are replayed (build
+        steps captured as frames of their own or collapsed into the record),
+        and the slide counter must still show the slide afterwards. Without a
+        jump, every key press since the first slide is replayed.
+        """
+        record = records[-1]
+        slide_number = record.get('slide_number')
+        position = record.get('position', record['index'])
+        jumped = slide_number and self.use_slide_counter and self.go_to_slide(driver, slide_number)
+        if jumped:
+            presses = position - min(r.get('position', r['index']) - r.get('builds', 0)
+                                     for r in records if r.get('slide_number') == slide_number)
+        else:
+            # Replay the arrow key presses that led to the slide
+            presses = position
+        for _ in range(presses):
+            actions = ActionChains(driver)
+            actions.send_keys(Keys.ARROW_RIGHT)
+            actions.perform()
+            time.sleep(0.1)
+        if jumped and presses:
+            counter = self.read_slide_counter(driver)
+            if not counter or counter[0] != slide_number:
+                raise Exception(tr("Slide counter shows {} instead of slide {} after resuming; the deck may have "
+                                   "changed since the last capture").format(counter[0] if counter else tr("nothing"),
+                                                                            slide_number))
+
+    def is_build_step(self, previous_counter, counter, previous_image, image, is_same=False):
+        """Whether `image` shows one more build animation step of the slide in `previous_image`
+
+        With the presenter's slide counter a build keeps the slide number. The
+        end screen after the last slide keeps the number too, so there (and
+        without a counter) the frame must only add content to the previous one.
+        A frame equal to the previous one (`is_same`) is never a build step,
+        so a presenter that stopped reacting to keys still ends the capture.
+        """
+        if is_same:
+            return False
+        if previous_counter and counter:
+            if counter != previous_counter:
+                return False
+            if counter[0] < counter[1]:
+                return True
+        return adds_content(previous_image, image)
+
+    def skip_build_steps(self, driver, counter, slide_clip, png_data, image, buffer, text=None):
+        """Advance through the build animations of the slide on screen
+
+        Each following frame is only compared and checked with
+        is_build_step(); build steps are not hashed, written or added to the
+        PDF. Returns the final frame as (png_data, image, buffer, text), the
+        number of build steps and the first frame after them with its
+        next_slide() result and text layer, which the capture loop uses
+        instead of taking a new screenshot. After MAX_BUILDS_PER_SLIDE build
+        steps the frame is kept as it is and no next frame is returned.
+        """
+        builds = 0
+        while builds < self.MAX_BUILDS_PER_SLIDE:
+            step = self.next_slide(driver, image, slide_clip)
+            if step is None:
+                self.wait_for_slide_settle(driver)
+            next_png = self.grab_frame(driver, slide_clip)
+            next_image = Image.open(io.BytesIO(next_png))
+            next_counter = self.read_slide_counter(driver, step) if counter else None
+            next_text = self.read_slide_text(driver, slide_clip, next_image.size) if self.text_layer else None
+            with self.metrics.phase('compare'):
+                next_buffer = self.comparator.prepare(next_image)
+                is_same = self.comparator.equal(next_buffer, buffer)
+                build = self.is_build_step(counter, next_counter, image, next_image, is_same)
+            next_frame = (next_png, next_image, next_buffer, step, next_text)
+            if not build:
+                return (png_data, image, buffer, text), builds, next_frame
+            builds += 1
+            self.metrics.count('build_steps')
+            png_data, image, buffer, _, text = next_frame
+        logging.warning(tr("Slide still changing after {} build steps, moving on").format(builds))
+        return (png_data, image, buffer, text), builds, None
+
+    def next_slide(self, driver, frame=None, clip=None):
+        """Advance to the next slide; with single_step, also wait for it to settle in the same call
+
+        Returns the SLIDE_STEP_SCRIPT result when the in-page step moved the
+        presenter on and it settled. Otherwise returns None once the slide has
+        been advanced, with advance_slide() when the page's key had no effect,
+        and the caller waits for the slide to settle as usual. After three
+        steps without effect and none with, the presenter is assumed to ignore
+        keys sent from the page and only advance_slide() is used.
+
+        A presenter that only redraws a canvas or CSS state leaves the DOM and
+        the slide counter unchanged, so when `frame` (the image on screen
+        before the step, grabbed with `clip`) is given, a new frame must also
+        equal it before the key counts as having no effect.
+        """
+        if not self.single_step or self.page_keys_work is False:
+            self.advance_slide(driver)
+            return None
+        try:
+            with self.metrics.phase('step'):
+                result = self.run_presenter_script(
+                    driver, SLIDE_STEP_SCRIPT, 300, int(self.settle_timeout * 1000), 3, async_script=True
+                )
+        except Exception as e:
+            logging.warning(tr("Slide step script failed: {}").format(e))
+            result = None
+        if result and result.get('changed'):
+            self.page_keys_work = True
+            return result if result.get('settled') else None
+        if result and frame is not None:
+            with Image.open(io.BytesIO(self.grab_frame(driver, clip))) as image:
+                if not self.images_equal(image, frame):
+                    self.page_keys_work = True
+                    return None
+        # The key had no visible effect: the last slide, or a presenter that ignores untrusted key events
+        self.metrics.count('step_fallbacks')
+        self.step_misses += 1
+        if not self.page_keys_work and self.step_misses >= 3:
+            logging.info(tr("Presenter ignores keys sent from the page, using WebDriver key presses"))
+            self.page_keys_work = False
+        self.advance_slide(driver)
+        return None
+
+    def advance_slide(self, driver):
+        """Move to the next slide with the right arrow key"""
+        with self.metrics.phase('advance'):
+            # In event mode the next settle wait covers the animation
+            animation_wait = 0 if self.settle_mode == 'event' else 2
+            try:
+                actions = ActionChains(driver)
+                actions.send_keys(Keys.ARROW_RIGHT)
+                if animation_wait:
+                    actions.pause(0.5)
+                actions.perform()
+                time.sleep(animation_wait)  # Wait for animation
+            except Exception as e:
+                logging.warning(tr("Failed to send right arrow key: {}").format(e))
+                try:
+                    driver.execute_script("""
+                        var event = new KeyboardEvent('keydown', {
+                            'key': 'ArrowRight',
+                            'code': 'ArrowRight',
+                            'keyCode': 39,
+                            'which': 39,
+                            'bubbles': true
+                        });
+                        document.dispatchEvent(event);
+                    """)
+                    self.metrics.count('key_fallbacks')
+                    time.sleep(animation_wait)
+                except Exception as e:
+                    logging.error(tr("Failed to simulate keypress: {}").format(e))
+
+    def capture_slides(self, url, output_folder='slides', progress=None):
+        """Capture all slides of a presentation, returning the screenshot paths or None on failure"""
+        slides = self.iter_slides(url, output_folder, progress)
+        while True:
+            try:
+                next(slides)
+            except StopIteration as done:
+                return done.value
+    
+    def iter_slides(self, url, output_folder='slides', progress=None):
+        """Capture a presentation, yielding a CapturedSlide as soon as each slide is accepted
+
+        Files, manifest and PDF are written as in capture_slides(), whose
+        result (the screenshot paths or None on failure) is the generator's
+        return value. Slides restored by a resumed capture are not yielded.
+        progress(captured, total) is called before each yield with the slides
+        captured so far and the deck's slide count (None without counter).
+        Closing the generator, or calling cancel(), stops the capture and
+        leaves it resumable; last_error is then 'cancelled'.
+        """
+        driver = None
+        screenshots = None
+        pdf_writer = None
+        output = None
+        collector = None
+        self.last_error = None
+        self.last_unchanged = False
+        self.metrics = CaptureMetrics()
+        self.cancel_requested.clear()
+        self.text_geometry = None
+        try:
+            # Create output folder
+            if not os.path.exists(output_folder):
+                os.makedirs(output_folder)
+            manifest = CaptureManifest.load(output_folder, url) if self.resume or self.incremental else None
+            pdf_file = os.path.join(output_folder, 'presentation.pdf')
+            
+            with self.metrics.phase('browser_start'):
+                if self.driver_pool:
+                    driver = self.driver_pool.acquire()
+                else:
+                    logging.info(tr("Starting browser..."))
+                    driver = webdriver.Chrome(options=self.chrome_options)
+                    driver.maximize_window()
+            
+            if self.capture_backend == 'network':
+                collector = NetworkAssetCollector(driver, url_pattern=self.asset_url_pattern)
+                collector.start()
+            
+            logging.info(tr("Accessing PowerPoint page..."))
+            with self.metrics.phase('page_load'):
+                driver.get(url)
+                if self.driver_pool:
+                    # A warm browser only needs the document itself, the Present button search waits for the rest
+                    try:
+                        WebDriverWait(driver, 5).until(
+                            lambda d: d.execute_script('return document.readyState') == 'complete'
+                        )
+                    except:
+                        logging.warning(tr("Page load timeout"))
+                else:
+                    time.sleep(5)  # Wait for page to load
+            
+            version = self.read_document_version(driver) if self.incremental else None
+            if (version and manifest and manifest.complete and manifest.version == version
+                    and os.path.exists(pdf_file)):
+                logging.info(tr("Document version unchanged ({}), skipping capture").format(version))
+                self.last_unchanged = True
+                screenshots = manifest.image_files()
+                return screenshots
+            
+            # Try to click Present button
+            with self.metrics.phase('present_button'):
+                entered = self.try_click_present_button(driver)
+            if not entered:
+                # Save page source for debugging
+                with open(os.path.join(output_folder, 'page_source.html'), 'w', encoding='utf-8') as f:
+                    f.write(driver.page_source)
+                logging.info(tr("Page source saved to page_source.html"))
+                raise Exception(tr("Could not enter presentation mode"))
+            
+            # Wait for presentation mode to load
+            if self.settle_mode == 'event':
+                driver.set_script_timeout(self.settle_timeout + 5)
+            else:
+                with self.metrics.phase('settle'):
+                    time.sleep(3)
+            
+            # Start screenshot loop
+            slide_count = 0
+            key_presses = 0  # Arrow keys sent so far, recorded so a capture can be replayed
+            last_screenshot = None
+            last_buffer = None  # Prepared comparison buffer of the last accepted slide (in-memory mode)
+            last_asset_hash = None  # Hash of the last slide image captured from the network
+            slide_clip = None  # Slide container rectangle when clipping
+            clip_located = False
+            screenshots = []
+            consecutive_same_count = 0  # Count of consecutive identical screenshots
+            next_frame = None  # Frame already taken while skipping build steps
+            step = None  # Result of the in-page step that showed the current slide (single-step mode)
+            previous = None  # Complete manifest of the previous run (incremental mode)
+            hash_index = SlideHashIndex(self.DUPLICATE_DISTANCE)
+            seen_pixels = {}  # Pixel hash -> index of the accepted slides (duplicate detection)
+            first_slide = None  # (perceptual hash, pixel hash) of the first slide (loop detection)
+            last_slide_counter = None  # Counter of the last slide once it is reached
+            changed_slides = 0
+            
+            if self.resume and manifest and manifest.slides and not manifest.complete:
+                last_record = manifest.slides[-1]
+                logging.info(tr("Resuming after slide {0} from {1}").format(len(manifest.slides),
+                                                                             CaptureManifest.FILE_NAME))
+                self.wait_for_slide_settle(driver)
+                with self.metrics.phase('fast_forward'):
+                    self.fast_forward(driver, manifest.slides)
+                slide_count = len(manifest.slides)
+                key_presses = last_record.get('position', last_record['index'])
+                screenshots = manifest.image_files()
+                for record in manifest.slides:
+                    if record.get('phash'):
+                        hash_index.add(int(record['phash'], 16), record['index'])
+                    if record.get('pixels'):
+                        seen_pixels.setdefault(record['pixels'], record['index'])
+                if self.detect_loop and manifest.slides[0].get('phash'):
+                    with Image.open(screenshots[0]) as image:
+                        first_slide = (int(manifest.slides[0]['phash'], 16),
+                                       manifest.slides[0].get('pixels') or pixel_hash(image))
+                # Compare the next frame with the last captured slide
+                last_screenshot = screenshots[-1]
+                last_asset_hash = last_record['hash']
+                if self.in_memory:
+                    with Image.open(last_screenshot) as image:
+                        last_buffer = self.comparator.prepare(image)
+                counter = self.read_slide_counter(driver) if self.use_slide_counter else None
+                if counter and counter[0] >= counter[1]:
+                    last_slide_counter = counter
+                # The step compares against the frame on screen, as a canvas-only presenter shows no other change
+                frame = None
+                if self.single_step:
+                    frame = Image.open(io.BytesIO(self.grab_frame(driver, slide_clip)))
+                    frame.load()
+                step = self.next_slide(driver, frame, slide_clip)
+                key_presses += 1
+            else:
+                if self.incremental and manifest and manifest.complete:
+                    previous = manifest
+                    logging.info(tr("Comparing with the previous capture ({} slides)").format(len(previous.slides)))
+                manifest = CaptureManifest(output_folder, url, version=version)
+                manifest.save()
+            
+            # An incremental run only knows whether the PDF needs rebuilding once every slide is compared
+            if self.stream_pdf and previous is None:
+                pdf_writer = StreamingPdfWriter(pdf_file, self.output_profile.pdf_resolution, self.slide_store)
+                for image_file in screenshots:
+                    pdf_writer.add_file(image_file, self.output_profile.pdf_quality, load_text_layer(image_file))
+            output = SlideOutputPipeline(
+                self.writer_threads,
+                pdf_writer=pdf_writer,
+                thumbnail_folder=os.path.join(output_folder, 'thumbnails') if self.thumbnails else None,
+                first_index=slide_count,
+                manifest=manifest,
+                metrics=self.metrics,
+                profile=self.output_profile,
+                store=self.slide_store,
+            )
+            slide_started = time.monotonic()
+            
+            logging.info(tr("Starting slide capture..."))
+            while True:
+                if self.cancel_requested.is_set():
+                    logging.info(tr("Capture cancelled after {} slides").format(slide_count))
+                    self.last_error = 'cancelled'
+                    screenshots = None
+                    return None
+                if next_frame:
+                    step = next_frame[3]
+                elif step is None:
+                    # Wait for page to load (the in-page step already reports a settled slide)
+                    try:
+                        WebDriverWait(driver, 5).until(
+                            lambda d: d.execute_script('return document.readyState') == 'complete'
+                        )
+                    except:
+                        logging.warning(tr("Page load timeout"))
+                    self.wait_for_slide_settle(driver)
+
+                # Capture current page
+                screenshot_path = os.path.join(output_folder, f'slide_{slide_count:03d}{self.output_profile.extension}')
+                
+                if self.clip_to_slide and not clip_located:
+                    # Locate the slide once the presentation has rendered its first slide
+                    clip_located = True
+                    slide_clip = self.locate_slide_container(driver)
+                    if slide_clip:
+                        logging.info(tr("Clipping captures to the slide at {x:.0f},{y:.0f} ({width:.0f}x{height:.0f})")
+                                     .format(**slide_clip))
+                    else:
+                        logging.info(tr("Slide container not found, capturing the whole window"))
+                
+                # With the network backend, use the slide image the presenter downloaded when there is one
+                assets = collector.slide_assets(self.displayed_slide_images(driver)) if collector else []
+                asset = next((a for a in assets if a[1] in NetworkAssetCollector.RASTER_TYPES), None)
+                frame_on_disk = not self.in_memory and asset is None
+                frame_text = None  # Text layer read while skipping build steps
+                
+                if asset:
+                    asset_hash = hashlib.sha256(asset[2]).hexdigest()
+                    is_same = asset_hash == last_asset_hash
+                    extension = NetworkAssetCollector.EXTENSIONS[asset[1]]
+                    screenshot_path = os.path.join(output_folder, f'slide_{slide_count:03d}{extension}')
+                elif self.in_memory:
+                    # Grab the frame as PNG bytes and compare it with the cached previous frame
+                    if next_frame:
+                        png_data, current_img, current_buffer = next_frame[:3]
+                        frame_text = next_frame[4]
+                    else:
+                        png_data = self.grab_frame(driver, slide_clip)
+                        current_img = Image.open(io.BytesIO(png_data))
+                        current_buffer = None
+                    with self.metrics.phase('compare'):
+                        if current_buffer is None:
+                            current_buffer = self.comparator.prepare(current_img)
+                        is_same = last_buffer is not None and self.comparator.equal(current_buffer, last_buffer)
+                else:
+                    png_data = self.grab_frame(driver, slide_clip)
+                    replace_file(screenshot_path, png_data)
+                    self.metrics.count('bytes_written', len(png_data))
+                    
+                    # Check if identical to previous screenshot
+                    is_same = False
+                    current_img = Image.open(screenshot_path)
+                    if last_screenshot:
+                        last_img = Image.open(last_screenshot)
+                        is_same = self.images_equal(current_img, last_img)
+                next_frame = None
+                
+                if not is_same:
+                    if asset:
+                        current_img = Image.open(io.BytesIO(asset[2]))
+                    with self.metrics.phase('hash_index'):
+                        phash = perceptual_hash(current_img)
+                        match = hash_index.find(phash)
+                    # Close hashes only pick the candidates, the pixels themselves must be identical
+                    # (distinct slides with the same layout can be a few bits apart)
+                    if (self.detect_loop and first_slide and slide_count > 1
+                            and hash_distance(phash, first_slide[0]) <= self.DUPLICATE_DISTANCE
+                            and pixel_hash(current_img) == first_slide[1] and (
+                            not self.use_slide_counter or (self.read_slide_counter(driver, step) or (1,))[0] == 1)):
+                        # A closing slide that repeats the title is not a loop when the counter says otherwise
+                        logging.info(tr("Presentation wrapped back to slide 1, last slide reached"))
+                        if frame_on_disk:
+                            os.remove(screenshot_path)
+                        break
+                    if match and self.skip_duplicates:
+                        with self.metrics.phase('hash_index'):
+                            duplicate = seen_pixels.get(pixel_hash(current_img))
+                        if duplicate is not None:
+                            logging.info(tr("Frame matches captured slide {}").format(duplicate + 1))
+                            self.metrics.count('frames_duplicate')
+                            is_same = True
+                    if slide_count == 0 and self.detect_loop and not is_same:
+                        first_slide = (phash, pixel_hash(current_img))
+                
+                if is_same:
+                    self.metrics.count('frames_rejected')
+                    consecutive_same_count += 1
+                    logging.info(tr("Detected identical screenshot ({}/10), trying next slide...")
+                                 .format(consecutive_same_count))
+                    
+                    # On the last slide the first unchanged frame ends the capture, otherwise
+                    # 10 consecutive identical screenshots are needed to confirm the last slide
+                    if last_slide_counter or consecutive_same_count >= 10:
+                        if last_slide_counter:
+                            logging.info(tr("Slide counter shows {}/{}, last slide reached").format(*last_slide_counter))
+                        else:
+                            logging.info(tr("Confirmed last slide reached"))
+                        if frame_on_disk:
+                            os.remove(screenshot_path)
+                        break
+                    
+                    if frame_on_disk:
+                        os.remove(screenshot_path)
+                    
+                    # Try to move to next slide
+                    self.metrics.count('duplicate_retries')
+                    step = self.next_slide(driver, None if asset else current_img, slide_clip)
+                    key_presses += 1
+                    continue
+                
+                consecutive_same_count = 0
+                counter = self.read_slide_counter(driver, step) if self.use_slide_counter else None
+                if last_slide_counter and (self.collapse_builds or not (counter and counter[0] >= counter[1])):
+                    # Past the last slide (and its collapsed build steps), e.g. an end-of-show screen
+                    logging.info(tr("Slide counter shows {}/{}, last slide reached").format(*last_slide_counter))
+                    if frame_on_disk:
+                        os.remove(screenshot_path)
+                    break
+                text = None
+                if self.text_layer and not asset:
+                    text = frame_text or self.read_slide_text(driver, slide_clip, current_img.size)
+                builds = 0
+                first_state = current_img
+                if self.collapse_builds and not asset:
+                    # Keep the slide's last build step instead of every partial state
+                    (png_data, current_img, current_buffer, text), builds, next_frame = self.skip_build_steps(
+                        driver, counter, slide_clip, png_data, current_img, current_buffer, text)
+                    if builds:
+                        logging.info(tr("Skipped {0} build steps of slide {1}").format(builds, slide_count + 1))
+                        # The slide's first state stays findable for duplicate detection
+                        hash_index.add(phash, slide_count)
+                        if self.skip_duplicates:
+                            seen_pixels.setdefault(pixel_hash(first_state), slide_count)
+                        with self.metrics.phase('hash_index'):
+                            phash = perceptual_hash(current_img)
+                    key_presses += builds
+                record = {
+                    'index': slide_count,
+                    'file': os.path.basename(screenshot_path),
+                    'position': key_presses,
+                    'slide_number': counter[0] if counter else None,
+                    'phash': f'{phash:064x}',
+                    'captured_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'seconds': round(time.monotonic() - slide_started, 3),
+                }
+                if builds:
+                    record['builds'] = builds
+                if text is not None:
+                    record['text'] = os.path.basename(text_layer_path(screenshot_path))
+                if (self.incremental or self.slide_store or self.skip_duplicates) and current_img is not None:
+                    with self.metrics.phase('hash_index'):
+                        record['pixels'] = pixel_hash(current_img)
+                        seen_pixels.setdefault(record['pixels'], slide_count)
+                
+                # Keep the previous run's file only when the slide's pixels are identical
+                # (the perceptual hash just rules out clearly changed slides cheaply)
+                old = previous.slides[slide_count] if previous and slide_count < len(previous.slides) else None
+                unchanged = (old is not None and old['file'] == record['file'] and old.get('phash') == record['phash']
+                             and old.get('pixels') is not None and old['pixels'] == record.get('pixels'))
+                if previous and not unchanged:
+                    changed_slides += 1
+                elif unchanged:
+                    self.metrics.count('slides_unchanged')
+                slide_started = time.monotonic()
+                for number, (_, mime_type, data) in enumerate((a for a in assets if a is not asset), 1):
+                    # Keep the other downloaded images of the slide (e.g. SVG layers) next to it
+                    asset_path = os.path.join(
+                        output_folder, f'slide_{slide_count:03d}_asset_{number}{NetworkAssetCollector.EXTENSIONS[mime_type]}'
+                    )
+                    with open(asset_path, 'wb') as f:
+                        f.write(data)
+                    self.metrics.count('bytes_written', len(data))
+                if asset:
+                    last_asset_hash = asset_hash
+                    output.submit(slide_count, screenshot_path, None if unchanged else asset[2], record=record, raw=True)
+                elif self.in_memory:
+                    last_buffer = current_buffer
+                    # Only accepted slides are written to disk
+                    output.submit(slide_count, screenshot_path, None if unchanged else png_data, current_img,
+                                  record=record, text=text)
+                else:
+                    output.submit(slide_count, screenshot_path, record=record, text=text)
+                logging.info((tr("Captured slide {} (unchanged)") if unchanged else tr("Captured slide {}"))
+                             .format(slide_count + 1))
+                self.metrics.count('slides_accepted')
+                last_screenshot = screenshot_path
+                screenshots.append(screenshot_path)
+                hash_index.add(phash, slide_count)
+                slide_count += 1
+                if progress:
+                    progress(slide_count, counter[1] if counter else None)
+                yield CapturedSlide(record['index'], screenshot_path, asset[2] if asset else png_data, current_img,
+                                    phash, record['slide_number'], record['seconds'])
+                
+                if counter and counter[0] >= counter[1]:
+                    # Go on through the last slide's build steps up to the first unchanged frame
+                    last_slide_counter = counter
+                if self.use_slide_counter and counter is None and slide_count == 1:
+                    logging.info(tr("No slide counter found, detecting the last slide from screenshots"))
+                
+                # Simulate right arrow key (skipping build steps already moved on to the next frame)
+                step = None
+                if next_frame is None:
+                    step = self.next_slide(driver, None if asset else current_img, slide_clip)
+                key_presses += 1
+            
+            # Wait for the background writers to finish
+            with self.metrics.phase('output_wait'):
+                output.close()
+            manifest.complete = True
+            manifest.save()
+            
+            if previous:
+                # Remove slides the deck no longer has
+                kept = {slide['file'] for slide in manifest.slides}
+                for slide in previous.slides:
+                    if slide['file'] not in kept:
+                        changed_slides += 1
+                        os.remove(os.path.join(output_folder, slide['file']))
+                        if slide.get('text') and os.path.exists(os.path.join(output_folder, slide['text'])):
+                            os.remove(os.path.join(output_folder, slide['text']))
+            
+            # Convert to PDF
+            screenshots = manifest.image_files()
+            if previous and not changed_slides and os.path.exists(pdf_file):
+                logging.info(tr("No slide changed since the last capture, keeping the existing PDF"))
+                self.last_unchanged = True
+            elif pdf_writer and screenshots:
+                with self.metrics.phase('pdf'):
+                    pdf_writer.close()
+                pdf_writer = None
+                self.metrics.count('bytes_written', os.path.getsize(pdf_file))
+                logging.info(tr("Presentation saved as PDF: {}").format(pdf_file))
+                if self.build_outputs and (self.sprite or self.optimize):
+                    self.postprocess(screenshots, output_folder)
+            elif not self.build_outputs:
+                logging.info(tr("Leaving the PDF to post-processing"))
+            elif previous:
+                logging.info(tr("{} slides changed since the last capture").format(changed_slides))
+                self.create_pdf(screenshots, pdf_file)
+                self.metrics.count('bytes_written', os.path.getsize(pdf_file))
+                logging.info(tr("Presentation saved as PDF: {}").format(pdf_file))
+            elif screenshots:
+                self.create_pdf(screenshots, pdf_file)
+                self.metrics.count('bytes_written', os.path.getsize(pdf_file))
+                logging.info(tr("Presentation saved as PDF: {}").format(pdf_file))
+            
+            logging.info(tr("Total slides captured: {}").format(len(screenshots)))
+            
+        except (GeneratorExit, KeyboardInterrupt):
+            logging.info(tr("Capture cancelled"))
+            self.last_error = 'cancelled'
+            screenshots = None
+            raise
+        except Exception as e:
+            logging.error(tr("An error occurred: {}").format(e))
+            self.last_error = str(e)
+            screenshots = None
+            if driver:
+                # Save page source for debugging
+                with open(os.path.join(output_folder, 'error_page_source.html'), 'w', encoding='utf-8') as f:
+                    f.write(driver.page_source)
+                logging.info(tr("Error page source saved to error_page_source.html"))
+        finally:
+            if output:
+                output.close(raise_errors=False)
+            if pdf_writer:
+                pdf_writer.abort()
+            if driver and self.driver_pool:
+                self.driver_pool.release(driver)
+            elif driver:
+                driver.quit()
+            self.write_report(url, output_folder, screenshots)
+        return screenshots
+    
+    def write_report(self, url, output_folder, screenshots):
+        """Save the metrics of the last capture as capture_report.json, and capture_metrics.prom when enabled"""
+        phases = self.metrics.report()['phases']
+        if phases:
+            logging.info(tr("Time per phase: {}").format(
+                ", ".join(f"{name} {phase['seconds']:.1f}s" for name, phase in phases.items())))
+        pdf_file = os.path.join(output_folder, 'presentation.pdf')
+        profile = self.output_profile
+        output = {
+            'format': profile.image_format,
+            'quality': profile.quality if profile.image_format in ('jpeg', 'webp') else None,
+            'dpi': profile.dpi,
+            'image_bytes': sum(os.path.getsize(path) for path in screenshots or [] if os.path.exists(path)),
+            'pdf_bytes': os.path.getsize(pdf_file) if screenshots and os.path.exists(pdf_file) else None,
+        }
+        if screenshots:
+            message = tr("Output size ({}): slides {:.0f} KB").format(profile.image_format, output['image_bytes'] / 1024)
+            if output['pdf_bytes']:
+                message += tr(", PDF {:.0f} KB").format(output['pdf_bytes'] / 1024)
+            logging.info(message)
+        try:
+            self.metrics.write_json(
+                os.path.join(output_folder, 'capture_report.json'),
+                url=url,
+                status='failed' if screenshots is None else 'ok',
+                slides=len(screenshots or []),
+                error=self.last_error,
+                output=output,
+            )
+            if self.prometheus:
+                self.metrics.write_prometheus(os.path.join(output_folder, 'capture_metrics.prom'), deck=url)
+        except OSError as e:
+            logging.warning(tr("Could not write capture report: {}").format(e))
+    
+    def open_presentation(self, url, output_folder):
+        """Start a browser (or take one from the pool), open url and enter presentation mode"""
+        with self.metrics.phase('browser_start'):
+            if self.driver_pool:
+                driver = self.driver_pool.acquire()
+            else:
+                driver = webdriver.Chrome(options=self.chrome_options)
+                driver.maximize_window()
+        try:
+            with self.metrics.phase('page_load'):
+                driver.get(url)
+                try:
+                    WebDriverWait(driver, 10).until(
+                        lambda d: d.execute_script('return document.readyState') == 'complete'
+                    )
+                except:
+                    logging.warning(tr("Page load timeout"))
+            with self.metrics.phase('present_button'):
+                entered = self.try_click_present_button(driver)
+            if not entered:
+                with open(os.path.join(output_folder, 'page_source.html'), 'w', encoding='utf-8') as f:
+                    f.write(driver.page_source)
+                raise Exception(tr("Could not enter presentation mode"))
+            if self.settle_mode == 'event':
+                driver.set_script_timeout(self.settle_timeout + 5)
+            else:
+                time.sleep(3)
+            return driver
+        except:
+            self.release_driver(driver)
+            raise
+    
+    def release_driver(self, driver):
+        """Return a driver to the pool, or quit it when not pooling"""
+        if self.driver_pool:
+            self.driver_pool.release(driver)
+        else:
+            driver.quit()
+    
+    def capture_range(self, driver, first, last, folder):
+        """Capture slides first..last (1-based) of an open presentation into folder
+
+        Returns [(path, slide number, perceptual hash, text layer)] in capture
+        order. Build steps of a slide are kept as separate frames, as in
+        capture_slides, unless collapse_builds is set.
+        """
+        self.text_geometry = None
+        if first > 1 and not self.go_to_slide(driver, first):
+            logging.info(tr("Could not jump to slide {}, stepping forward").format(first))
+            for _ in range(first * 20):
+                counter = self.read_slide_counter(driver)
+                if counter and counter[0] >= first:
+                    break
+                ActionChains(driver).send_keys(Keys.ARROW_RIGHT).perform()
+                time.sleep(0.1)
+            else:
+                raise Exception(tr("Could not reach slide {}").format(first))
+        
+        slide_clip = None
+        if self.clip_to_slide:
+            self.wait_for_slide_settle(driver)
+            slide_clip = self.locate_slide_container(driver)
+        
+        frames = []
+        last_buffer = None
+        last_image = None
+        last_counter = None
+        consecutive_same_count = 0
+        builds = 0  # Build steps of the last frame
+        step = None
+        while True:
+            if self.cancel_requested.is_set():
+                raise Exception(tr("Capture cancelled"))
+            if step is None:
+                self.wait_for_slide_settle(driver)
+            counter = self.read_slide_counter(driver, step)
+            if counter and counter[0] > last:
+                break
+            png_data = self.grab_frame(driver, slide_clip)
+            image = Image.open(io.BytesIO(png_data))
+            with self.metrics.phase('compare'):
+                buffer = self.comparator.prepare(image)
+                is_same = last_buffer is not None and self.comparator.equal(buffer, last_buffer)
+            build = (self.collapse_builds and frames and builds < self.MAX_BUILDS_PER_SLIDE
+                     and self.is_build_step(last_counter, counter, last_image, image, is_same))
+            if is_same and not build:
+                self.metrics.count('frames_rejected')
+                consecutive_same_count += 1
+                # The first unchanged frame on the last slide, or 10 of them without a counter
+                if consecutive_same_count >= 10 or (last_counter and last_counter[0] >= last_counter[1]):
+                    break  # End of the presentation
+            elif build:
+                # Replace the slide's frame with its latest build step
+                consecutive_same_count = 0
+                builds += 1
+                last_buffer = buffer
+                last_image = image
+                path, slide_number, _, _ = frames[-1]
+                with open(path, 'wb') as f:
+                    f.write(png_data)
+                self.metrics.count('bytes_written', len(png_data))
+                self.metrics.count('build_steps')
+                text = self.read_slide_text(driver, slide_clip, image.size) if self.text_layer else None
+                frames[-1] = (path, slide_number, perceptual_hash(image), text)
+            elif last_counter and last_counter[0] >= last_counter[1] and (
+                    self.collapse_builds or not (counter and counter[0] >= counter[1])):
+                break  # The frame after the last slide (and its collapsed builds)
+            else:
+                consecutive_same_count = 0
+                builds = 0
+                last_buffer = buffer
+                last_image = image
+                last_counter = counter
+                path = os.path.join(folder, f'frame_{len(frames):04d}.png')
+                with open(path, 'wb') as f:
+                    f.write(png_data)
+                self.metrics.count('bytes_written', len(png_data))
+                self.metrics.count('slides_accepted')
+                text = self.read_slide_text(driver, slide_clip, image.size) if self.text_layer else None
+                frames.append((path, counter[0] if counter else None, perceptual_hash(image), text))
+                logging.info(tr("[slides {}-{}] Captured slide {}").format(first, last,
+                                                                           counter[0] if counter else len(frames)))
+            step = self.next_slide(driver, image, slide_clip)
+        return frames
+    
+    def capture_slides_parallel(self, url, output_folder='slides', tabs=2):
+        """Capture one deck with several browsers, each working on its own range of slides
+
+        The slide count is read from the presenter's slide counter. Every
+        browser jumps to the start of its range and stops when the counter
+        passes its end; the ranges are then numbered in order and merged into
+        one PDF. Decks without a slide counter are captured sequentially.
+        Returns the screenshot paths or None on failure.
+        """
+        self.last_error = None
+        self.last_unchanged = False
+        self.metrics = CaptureMetrics()
+        self.cancel_requested.clear()
+        os.makedirs(output_folder, exist_ok=True)
+        driver = None
+        range_folders = []
+        try:
+            logging.info(tr("Accessing PowerPoint page..."))
+            driver = self.open_presentation(url, output_folder)
+            self.wait_for_slide_settle(driver)
+            counter = self.read_slide_counter(driver)
+            if not counter:
+                logging.info(tr("No slide counter found, capturing sequentially"))
+                self.release_driver(driver)
+                driver = None
+                return self.capture_slides(url, output_folder)
+            
+            total = counter[1]
+            tabs = max(1, min(tabs, total))
+            size = -(-total // tabs)
+            ranges = [(first, min(first + size - 1, total)) for first in range(1, total + 1, size)]
+            logging.info(tr("Capturing {} slides in {} ranges: {}").format(
+                total, len(ranges), ", ".join(f"{first}-{last}" for first, last in ranges)))
+            
+            def run(number, first, last, range_driver):
+                # Each range works on its own copy, which keeps its own presenter frame path
+                worker = copy.copy(self)
+                try:
+                    if range_driver is None:
+                        range_driver = worker.open_presentation(url, range_folders[number])
+                    return worker.capture_range(range_driver, first, last, range_folders[number])
+                finally:
+                    if range_driver is not None:
+                        worker.release_driver(range_driver)
+            
+            for number in range(len(ranges)):
+                range_folders.append(os.path.join(output_folder, f'.range_{number + 1:02d}'))
+                os.makedirs(range_folders[-1], exist_ok=True)
+            with concurrent.futures.ThreadPoolExecutor(len(ranges)) as executor:
+                # The browser that read the slide count already shows slide 1 and takes the first range
+                futures = [executor.submit(run, number, first, last, driver if number == 0 else None)
+                           for number, (first, last) in enumerate(ranges)]
+                driver = None
+                results = [future.result() for future in futures]
+            
+            # Number the frames of all ranges in order and build the PDF
+            manifest = CaptureManifest(output_folder, url)
+            pdf_file = os.path.join(output_folder, 'presentation.pdf')
+            pdf_writer = StreamingPdfWriter(pdf_file, self.output_profile.pdf_resolution, self.slide_store)
+            output = SlideOutputPipeline(
+                self.writer_threads,
+                pdf_writer=pdf_writer,
+                thumbnail_folder=os.path.join(output_folder, 'thumbnails') if self.thumbnails else None,
+                manifest=manifest,
+                metrics=self.metrics,
+                profile=self.output_profile,
+                store=self.slide_store,
+            )
+            screenshots = []
+            try:
+                for frames in results:
+                    for temp_path, slide_number, phash, text in frames:
+                        path = os.path.join(output_folder, f'slide_{len(screenshots):03d}{self.output_profile.extension}')
+                        record = {
+                            'index': len(screenshots),
+                            'file': os.path.basename(path),
+                            'position': None,
+                            'slide_number': slide_number,
+                            'phash': f'{phash:064x}',
+                        }
+                        if text is not None:
+                            record['text'] = os.path.basename(text_layer_path(path))
+                        with open(temp_path, 'rb') as f:
+                            output.submit(len(screenshots), path, f.read(), record=record, text=text)
+                        screenshots.append(path)
+                with self.metrics.phase('pdf'):
+                    output.close()
+                    pdf_writer.close()
+            finally:
+                output.close(raise_errors=False)
+                pdf_writer.abort()
+            self.metrics.count('bytes_written', os.path.getsize(pdf_file))
+            manifest.complete = True
+            manifest.save()
+            logging.info(tr("Presentation saved as PDF: {}").format(pdf_file))
+            if self.build_outputs and (self.sprite or self.optimize):
+                self.postprocess(screenshots, output_folder)
+            logging.info(tr("Total slides captured: {}").format(len(screenshots)))
+            self.write_report(url, output_folder, screenshots)
+            return screenshots
+        
+        except Exception as e:
+            logging.error(tr("An error occurred: {}").format(e))
+            self.last_error = str(e)
+            self.write_report(url, output_folder, None)
+            return None
+        finally:
+            if driver:
+                self.release_driver(driver)
+            for folder in range_folders:
+                shutil.rmtree(folder, ignore_errors=True)
+    
+    def images_equal(self, img1, img2):
+        """Compare if two images are identical"""
+        with self.metrics.phase('compare'):
+            if img1.size != img2.size:
+                return False
+            return self.comparator.equal(self.comparator.prepare(img1), self.comparator.prepare(img2))
+    
+    def create_pdf(self, image_files, output_file):
+        """Combine images into PDF, with the thumbnail sprite and optimized copies when enabled"""
+        if not image_files:
+            return
+        
+        logging.info(tr("Generating PDF..."))
+        self.postprocess(image_files, os.path.dirname(output_file), output_file)
+    
+    def postprocess(self, image_files, output_folder, pdf_file=None):
+        """Write the PDF, thumbnail sprite and optimized copies of the slide files in one pass
+
+        postprocess_slide() decodes and compresses each slide, on the pool of
+        post-processing workers when there is one, with at most two slides
+        per worker in flight so memory does not grow with the deck size. The
+        results are stitched together in slide order: PDF pages with their
+        text layers, the cells of `thumbnails.jpg` (indexed by
+        `thumbnails.json`) and the files in `optimized/`.
+        """
+        if not image_files:
+            return
+        optimized_folder = os.path.join(output_folder, 'optimized')
+        if self.optimize:
+            os.makedirs(optimized_folder, exist_ok=True)
+        tasks = [(path, self.output_profile.pdf_quality if pdf_file else None,
+                  self.SPRITE_TILE if self.sprite else None, self.optimize,
+                  os.path.join(optimized_folder, f'{os.path.splitext(os.path.basename(path))[0]}.{self.optimize}')
+                  if self.optimize else None,
+                  self.slide_store) for path in image_files]
+
+        def results():
+            if self.postprocess_pool is None:
+                for task in tasks:
+                    yield postprocess_slide(*task)
+                return
+            pending = collections.deque()
+            try:
+                for task in tasks:
+                    pending.append(self.postprocess_pool.submit(postprocess_slide, *task))
+                    if len(pending) >= 2 * self.postprocess_workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        sprite = cells = None
+        if self.sprite:
+            tile_width, tile_height = self.SPRITE_TILE
+            # Close to a square sheet
+            columns = max(1, round((len(image_files) * tile_height / tile_width) ** 0.5))
+            sprite = Image.new('RGB', (columns * tile_width, -(-len(image_files) // columns) * tile_height), 'white')
+            cells = []
+        with self.metrics.phase('pdf' if pdf_file else 'postprocess'):
+            writer = StreamingPdfWriter(pdf_file, self.output_profile.pdf_resolution) if pdf_file else None
+            try:
+                for number, (path, (key, encoded, thumbnail, written)) in enumerate(zip(image_files, results())):
+                    if writer:
+                        writer.add_encoded(encoded, load_text_layer(path), key)
+                    if thumbnail:
+                        size, pixels = thumbnail
+                        x, y = number % columns * tile_width, number // columns * tile_height
+                        sprite.paste(Image.frombytes('RGB', size, pixels), (x, y))
+                        cells.append({'file': os.path.basename(path), 'x': x, 'y': y,
+                                      'width': size[0], 'height': size[1]})
+                    if written:
+                        self.metrics.count('bytes_written', written)
+                if writer:
+                    writer.close()
+            finally:
+                if writer:
+                    writer.abort()
+            if sprite:
+                sprite_file = os.path.join(output_folder, 'thumbnails.jpg')
+                sprite.save(sprite_file, 'JPEG', quality=85)
+                with open(os.path.join(output_folder, 'thumbnails.json'), 'w', encoding='utf-8') as f:
+                    json.dump({'image': os.path.basename(sprite_file), 'tile': list(self.SPRITE_TILE),
+                               'columns': columns, 'slides': cells}, f, indent=2)
+                self.metrics.count('bytes_written', os.path.getsize(sprite_file))
+    
+    def postprocess_folder(self, url, output_folder):
+        """Post-process a deck captured with build_outputs=False, from the manifest in its output folder"""
+        manifest = CaptureManifest.load(output_folder, url)
+        if manifest is None or not manifest.complete:
+            raise Exception(tr("No complete capture of {0} in {1}").format(url, output_folder))
+        # A streamed PDF was already written during capture (incremental runs rebuild it instead)
+        pdf_file = None if self.stream_pdf and not self.incremental else os.path.join(output_folder, 'presentation.pdf')
+        if pdf_file or self.sprite or self.optimize:
+            self.postprocess(manifest.image_files(), output_folder, pdf_file)
+
+# Rough memory footprint of one Chrome + chromedriver worker, used to size batch pools
+WORKER_MEMORY_GB = 1.0
+
+def default_worker_count(memory_per_worker_gb=WORKER_MEMORY_GB):
+    """Number of parallel Chrome workers allowed by CPU cores and physical memory"""
+    workers = os.cpu_count() or 1
+    try:
+        total_memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+        workers = min(workers, int(total_memory / (memory_per_worker_gb * 1024 ** 3)))
+    except (AttributeError, ValueError, OSError):
+        pass  # Memory size not available on this platform
+    return max(1, workers)
+
+def read_batch_file(path, base_folder='slides'):
+    """Read batch jobs from a file ('-' for stdin)
+
+    Each non-empty line holds a URL, optionally followed by whitespace and an
+    output folder. Lines starting with # are ignored. Decks without a folder
+    are saved to base_folder/deck_NNN.
+    """
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        lines = stream.read().splitlines()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    jobs = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split(None, 1)
+        folder = parts[1].strip() if len(parts) > 1 else os.path.join(base_folder, f'deck_{len(jobs) + 1:03d}')
+        jobs.append((parts[0], folder))
+    return jobs
+
+def _batch_worker(worker_number, capture_options, conn):
+    """Capture decks received through conn in a worker process, reusing one warm browser"""
+    # Replace handlers inherited from the parent (basicConfig's force= needs Python 3.8)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    logging.basicConfig(level=logging.INFO,
+                        format=f'%(asctime)s - %(levelname)s - [worker {worker_number}] %(message)s')
+    # Turn terminate() into SystemExit so the browser is closed in capture_slides' finally
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    with PowerPointCapture(**capture_options) as capture:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            job_number, url, output_folder = job
+            logging.info(tr("Deck {}: {}").format(job_number, url))
+            screenshots = capture.capture_slides(url, output_folder)
+            conn.send({'slides': len(screenshots) if screenshots is not None else 0,
+                       'error': capture.last_error if screenshots is None else None,
+                       'unchanged': capture.last_unchanged})
+
+def run_batch(jobs, workers=None, deck_timeout=3600.0, capture_options=None, summary_path='batch_summary.json'):
+    """Capture a list of (url, output_folder) jobs on a pool of independent Chrome workers
+
+    Every worker is a separate process that keeps its browser warm between
+    decks. A deck that hangs past deck_timeout is handled by terminating its
+    worker, without stalling the others. With `postprocess_workers` in
+    capture_options, each captured deck's PDF, sprite and optimized copies
+    are built here on that many processes while the workers go on to the
+    next decks; decks an incremental run found unchanged keep their outputs.
+    Returns the per-deck summary.
+    """
+    workers = workers or default_worker_count()
+    capture_options = dict(capture_options or {})
+    capture_options.setdefault('pool_size', 1)
+    # Workers are daemon processes, which cannot start a pool of their own
+    postprocessor = post_thread = None
+    post_futures = {}
+    if capture_options.get('postprocess_workers'):
+        postprocessor = PowerPointCapture(**capture_options)
+        post_thread = concurrent.futures.ThreadPoolExecutor(1)
+        capture_options.update(postprocess_workers=0, build_outputs=False)
+    logging.info(tr("Capturing {0} decks with {1} workers...").format(len(jobs), workers))
+
+    pending = list(enumerate(jobs, 1))
+    workers_state = {}  # worker number -> [process, connection, (job number, start time) or None]
+    results = {}
+    next_worker = 1
+    while pending or any(state[2] for state in workers_state.values()):
+        # Hand pending decks to idle workers, then start new workers up to the limit
+        for state in workers_state.values():
+            if pending and state[2] is None:
+                job_number, (url, output_folder) = pending.pop(0)
+                state[1].send((job_number, url, output_folder))
+                state[2] = (job_number, time.monotonic())
+        while pending and len(workers_state) < workers:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_batch_worker, args=(next_worker, capture_options, child_conn), daemon=True
+            )
+            process.start()
+            child_conn.close()
+            job_number, (url, output_folder) = pending.pop(0)
+            parent_conn.send((job_number, url, output_folder))
+            workers_state[next_worker] = [process, parent_conn, (job_number, time.monotonic())]
+            next_worker += 1
+
+        finished = False
+        for worker_number, (process, conn, current) in list(workers_state.items()):
+            if current is None:
+                continue
+            job_number, started = current
+            elapsed = time.monotonic() - started
+            url, output_folder = jobs[job_number - 1]
+            try:
+                outcome = conn.recv() if conn.poll() else None
+                crashed = False
+            except EOFError:
+                outcome, crashed = None, True  # Worker died before reporting
+            if outcome is not None:
+                status = 'failed' if outcome['error'] or not outcome['slides'] else 'ok'
+                workers_state[worker_number][2] = None
+            elif crashed or not process.is_alive():
+                process.join(10)
+                outcome = {'slides': 0, 'error': f"worker exited with code {process.exitcode}"}
+                status = 'failed'
+                conn.close()
+                del workers_state[worker_number]
+            elif elapsed > deck_timeout:
+                logging.error(tr("Deck {} timed out after {:.0f}s, terminating worker").format(job_number, elapsed))
+                process.terminate()
+                process.join(10)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                outcome = {'slides': 0, 'error': f"timed out after {deck_timeout:.0f}s"}
+                status = 'timeout'
+                conn.close()
+                del workers_state[worker_number]
+            else:
+                continue
+            finished = True
+            results[job_number] = {
+                'url': url,
+                'output_folder': output_folder,
+                'status': status,
+                'slides': outcome['slides'],
+                'seconds': round(elapsed, 1),
+                'error': outcome['error'],
+            }
+            logging.info(tr("Deck {0}/{1} {2}: {3} slides in {4:.1f}s").format(job_number, len(jobs), status,
+                                                                                outcome['slides'], elapsed))
+            if postprocessor and status == 'ok' and outcome.get('unchanged'):
+                logging.info(tr("Deck {} unchanged, keeping its outputs").format(job_number))
+            elif postprocessor and status == 'ok':
+                post_futures[job_number] = post_thread.submit(postprocessor.postprocess_folder, url, output_folder)
+        # Wake up as soon as a worker reports, or periodically to check deadlines
+        busy = [state[1] for state in workers_state.values() if state[2]]
+        if busy and not finished:
+            multiprocessing.connection.wait(busy, timeout=0.5)
+
+    for process, conn, _ in workers_state.values():
+        conn.send(None)
+        process.join(30)
+        if process.is_alive():
+            process.terminate()
+        conn.close()
+
+    if postprocessor:
+        for job_number, future in post_futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(tr("Post-processing deck {} failed: {}").format(job_number, e))
+                results[job_number].update(status='failed', error=f"post-processing failed: {str(e)}")
+        post_thread.shutdown()
+        postprocessor.close()
+
+    summary = [results[number] for number in sorted(results)]
+    write_batch_summary(summary, summary_path)
+    return summary
+
+def write_batch_summary(summary, summary_path):
+    """Log the per-deck results of a batch and save them as JSON when summary_path is set"""
+    succeeded = sum(1 for r in summary if r['status'] == 'ok')
+    logging.info(tr("Batch finished: {} succeeded, {} failed").format(succeeded, len(summary) - succeeded))
+    for number, result in enumerate(summary, 1):
+        logging.info(tr("  {:3d}. {:<7} {:4d} slides {:8.1f}s  {}").format(number, result['status'], result['slides'],
+                                                                         result['seconds'], result['url']))
+    if summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        logging.info(tr("Batch summary saved to {}").format(summary_path))
+
+class DevToolsError(Exception):
+    """Error returned by the browser for a DevTools command or script"""
+
+class DevToolsConnection:
+    """One websocket to the browser's DevTools endpoint, shared by all tabs
+
+    Commands for a tab carry its flat session id; replies are matched to
+    their command by id and events are handed to the callbacks registered
+    with on() for their session and method.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.next_id = 0
+        self.pending = {}  # command id -> future of its result
+        self.listeners = {}  # (session id, method) -> callbacks
+        self.reader = asyncio.ensure_future(self.read())
+
+    @classmethod
+    async def connect(cls, url):
+        # Screenshots easily exceed the default 1 MiB message limit
+        return cls(await websockets.connect(url, max_size=None))
+
+    async def read(self):
+        error = DevToolsError(tr("DevTools connection closed"))
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self.pending.pop(message['id'], None)
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(DevToolsError(message['error'].get('message', str(message['error']))))
+                    else:
+                        future.set_result(message.get('result', {}))
+                else:
+                    for callback in self.listeners.get((message.get('sessionId'), message.get('method')), []):
+                        callback(message.get('params', {}))
+        except Exception as e:
+            error = DevToolsError(tr("DevTools connection lost: {}").format(e))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+
+    async def send(self, method, params=None, session_id=None):
+        """Send a command (to a tab when session_id is given) and return its result"""
+        if self.reader.done():
+            raise DevToolsError(tr("DevTools connection closed"))
+        self.next_id += 1
+        message = {'id': self.next_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await future
+        finally:
+            self.pending.pop(message['id'], None)
+
+    def on(self, session_id, method, callback):
+        self.listeners.setdefault((session_id, method), []).append(callback)
+
+    def forget(self, session_id):
+        """Drop the event callbacks of a closed session"""
+        for key in [key for key in self.listeners if key[0] == session_id]:
+            del self.listeners[key]
+
+    async def close(self):
+        await self.websocket.close()
+        await self.reader
+
+class DevToolsTab:
+    """A browser tab driven over a flat DevTools session
+
+    The sessions of cross-origin (out-of-process) frames are attached as they
+    appear, so scripts can be run in any frame of the page: run() takes a
+    (session id, iframe path) context, where the path leads to a same-origin
+    frame below that session's document.
+    """
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.frame_sessions = []  # Sessions of cross-origin frames, in attach order
+
+    @classmethod
+    async def open(cls, connection, width=1920, height=1080):
+        target = await connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await connection.send('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        tab = cls(connection, target['targetId'], attached['sessionId'])
+        await tab.watch_frames(tab.session_id)
+        await tab.send('Emulation.setDeviceMetricsOverride',
+                       {'width': width, 'height': height, 'deviceScaleFactor': 1, 'mobile': False})
+        # Background tabs otherwise never have focus, and the presenter ignores keys without it
+        await tab.send('Emulation.setFocusEmulationEnabled', {'enabled': True})
+        return tab
+
+    async def send(self, method, params=None, session_id=None):
+        return await self.connection.send(method, params, session_id or self.session_id)
+
+    async def watch_frames(self, session_id):
+        """Let scripts run despite the page's CSP and attach to the cross-origin frames of a session"""
+        self.connection.on(session_id, 'Target.attachedToTarget', self.frame_attached)
+        self.connection.on(session_id, 'Target.detachedFromTarget', self.frame_detached)
+        await self.send('Page.setBypassCSP', {'enabled': True}, session_id)
+        await self.send('Target.setAutoAttach', {'autoAttach': True, 'waitForDebuggerOnStart': False, 'flatten': True},
+                        session_id)
+
+    def frame_attached(self, params):
+        if params['targetInfo'].get('type') != 'iframe':
+            return
+        self.frame_sessions.append(params['sessionId'])
+        task = asyncio.ensure_future(self.watch_frames(params['sessionId']))
+        # A frame can be gone again before it is set up
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def frame_detached(self, params):
+        if params.get('sessionId') in self.frame_sessions:
+            self.frame_sessions.remove(params['sessionId'])
+            self.connection.forget(params['sessionId'])
+
+    async def run(self, script, *args, context=(None, ()), async_script=False):
+        """Run a script body with the given arguments in a frame and return its JSON result"""
+        session_id, path = context
+        expression = (f"{FRAME_CALL_SCRIPT}({json.dumps(list(path))}, {json.dumps(script)}, "
+                      f"{json.dumps(list(args))}, {json.dumps(async_script)})")
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression, 'returnByValue': True, 'awaitPromise': async_script,
+        }, session_id)
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise DevToolsError(details.get('exception', {}).get('description') or details.get('text'))
+        return result['result'].get('value')
+
+    async def navigate(self, url, timeout=30.0):
+        await self.send('Page.navigate', {'url': url})
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if await self.run('return document.readyState') == 'complete':
+                    return
+            except DevToolsError:
+                pass  # Document replaced while navigating
+            await asyncio.sleep(0.1)
+        logging.warning(tr("Page load timeout"))
+
+    async def press_key(self, key='ArrowRight', key_code=39):
+        for event_type in ('rawKeyDown', 'keyUp'):
+            await self.send('Input.dispatchKeyEvent', {
+                'type': event_type, 'key': key, 'code': key,
+                'windowsVirtualKeyCode': key_code, 'nativeVirtualKeyCode': key_code,
+            })
+
+    async def screenshot(self):
+        result = await self.send('Page.captureScreenshot', {'format': 'png'})
+        return base64.b64decode(result['data'])
+
+    async def close(self, timeout=10.0):
+        try:
+            # Bounded, as this also runs when the tab is abandoned because the page hangs
+            await asyncio.wait_for(self.connection.send('Target.closeTarget', {'targetId': self.target_id}), timeout)
+        except (DevToolsError, asyncio.TimeoutError) as e:
+            logging.debug(tr("Could not close tab: {}").format(e))
+        for session_id in [self.session_id] + self.frame_sessions:
+            self.connection.forget(session_id)
+
+# Chrome executables looked up on PATH when no binary is given
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+async def launch_chrome(user_data_dir, chrome_binary=None, timeout=30.0):
+    """Start headless Chrome with remote debugging, returning the process and its DevTools websocket URL"""
+    binary = chrome_binary or next(filter(None, map(shutil.which, CHROME_BINARIES)), None)
+    if not binary:
+        raise Exception(tr("Chrome not found, pass its path with --chrome-binary"))
+    process = await asyncio.create_subprocess_exec(
+        binary, '--headless=new', '--remote-debugging-port=0', f'--user-data-dir={user_data_dir}',
+        '--no-first-run', '--no-default-browser-check', '--window-size=1920,1080',
+        # Tabs in the background must keep rendering and running timers at full speed
+        '--disable-background-timer-throttling', '--disable-renderer-backgrounding',
+        '--disable-backgrounding-occluded-windows',
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    # Chrome writes the port it picked and the browser endpoint path once it listens
+    port_file = os.path.join(user_data_dir, 'DevToolsActivePort')
+    deadline = time.monotonic() + timeout
+    while True:
+        if os.path.exists(port_file):
+            with open(port_file, encoding='utf-8') as f:
+                lines = f.read().split()
+            if len(lines) >= 2:
+                return process, f'ws://127.0.0.1:{lines[0]}{lines[1]}'
+        if process.returncode is not None or time.monotonic() > deadline:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+            raise Exception(tr("Chrome did not start (exit code {})").format(process.returncode))
+        await asyncio.sleep(0.1)
+
+class AsyncCaptureEngine:
+    """Capture many decks as tabs of one headless Chrome, driven from one event loop
+
+    The browser is started from chrome_binary (found on PATH by default), or
+    an already running one is used through its DevTools websocket
+    browser_url. Every deck gets its own tab running the present, settle,
+    capture and advance sequence; a semaphore keeps at most `tabs` decks open
+    at once. Image decoding, comparison and output run on worker threads so
+    they do not hold up the other tabs.
+
+    Takes the PowerPointCapture options of the synchronous engine; settle
+    detection is always event based. Options that change what is captured
+    and that this engine does not implement (UNSUPPORTED_OPTIONS and the
+    network backend) raise ValueError. Captures cannot be resumed, so a
+    deck whose output folder holds an interrupted capture fails instead of
+    overwriting it, unless `resume` is False.
+    """
+
+    UNSUPPORTED_OPTIONS = ('incremental', 'text_layer', 'collapse_builds', 'clip_to_slide', 'skip_duplicates',
+                           'detect_loop')
+
+    def __init__(self, tabs=8, chrome_binary=None, browser_url=None, deck_timeout=3600.0, capture_options=None,
+                 width=1920, height=1080):
+        if websockets is None:
+            raise Exception(tr("The asyncio engine needs the websockets package (pip install websockets)"))
+        capture_options = dict(capture_options or {})
+        unsupported = [name for name in self.UNSUPPORTED_OPTIONS if capture_options.get(name)]
+        if capture_options.get('capture_backend', 'screenshot') != 'screenshot':
+            unsupported.append(f"capture_backend={capture_options['capture_backend']}")
+        if unsupported:
+            raise ValueError(tr("The asyncio engine does not support: {}").format(', '.join(unsupported)))
+        self.tabs = tabs
+        self.chrome_binary = chrome_binary
+        self.browser_url = browser_url
+        self.deck_timeout = deck_timeout
+        self.width = width
+        self.height = height
+        capture_options.update(headless=True, pool_size=0)
+        self.capture = PowerPointCapture(**capture_options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the post-processing workers"""
+        self.capture.close()
+
+    async def run(self, jobs):
+        """Capture (url, output_folder) jobs and return the per-deck results in job order"""
+        process = None
+        user_data_dir = None
+        browser_url = self.browser_url
+        try:
+            if not browser_url:
+                logging.info(tr("Starting browser..."))
+                user_data_dir = tempfile.mkdtemp(prefix='powerpoint_capture_')
+                process, browser_url = await launch_chrome(user_data_dir, self.chrome_binary)
+            connection = await DevToolsConnection.connect(browser_url)
+            try:
+                semaphore = asyncio.Semaphore(self.tabs)
+                return await asyncio.gather(*(
+                    self.run_job(connection, semaphore, number, len(jobs), url, output_folder)
+                    for number, (url, output_folder) in enumerate(jobs, 1)
+                ))
+            finally:
+                await connection.close()
+        finally:
+            if process and process.returncode is None:
+                process.terminate()
+                await process.wait()
+            if user_data_dir:
+                shutil.rmtree(user_data_dir, ignore_errors=True)
+
+    async def run_job(self, connection, semaphore, number, total, url, output_folder):
+        async with semaphore:
+            logging.info(tr("[tab] Deck {}: {}").format(number, url))
+            started = time.monotonic()
+            slides, error = 0, None
+            try:
+                screenshots = await asyncio.wait_for(
+                    self.capture_deck(connection, url, output_folder, f"Deck {number}"), self.deck_timeout
+                )
+                slides = len(screenshots)
+                status = 'ok' if slides else 'failed'
+            except asyncio.TimeoutError:
+                logging.error(tr("Deck {} timed out after {:.0f}s, closing its tab").format(number, self.deck_timeout))
+                status, error = 'timeout', f"timed out after {self.deck_timeout:.0f}s"
+            except Exception as e:
+                status, error = 'failed', str(e)
+            elapsed = time.monotonic() - started
+            logging.info(tr("Deck {0}/{1} {2}: {3} slides in {4:.1f}s").format(number, total, status, slides, elapsed))
+            return {
+                'url': url,
+                'output_folder': output_folder,
+                'status': status,
+                'slides': slides,
+                'seconds': round(elapsed, 1),
+                'error': error,
+            }
+
+    async def enter_presentation(self, tab, timeout):
+        """Click the Present button in whichever frame holds it and return that frame as a run() context"""
+        deadline = time.monotonic() + timeout
+        while True:
+            for session_id in [None] + tab.frame_sessions:
+                try:
+                    found = await tab.run(PRESENT_BUTTON_SCRIPT, context=(session_id, ()))
+                    if found and found['path'] is not None:
+                        context = (session_id, tuple(found['path']))
+                        if await tab.run(PRESENT_CLICK_SCRIPT, context=context):
+                            logging.info(tr("Successfully clicked Present button"))
+                            return context
+                except DevToolsError:
+                    continue  # Frame navigating or already gone
+            if time.monotonic() > deadline:
+                raise Exception(tr("Could not find the Present button"))
+            await asyncio.sleep(0.25)
+
+    async def read_slide_counter(self, tab, context):
+        try:
+            counter = await tab.run(SLIDE_COUNTER_SCRIPT, context=context)
+        except DevToolsError as e:
+            logging.debug(tr("Could not read slide counter: {}").format(e))
+            return None
+        return (counter['index'], counter['total']) if counter else None
+
+    @staticmethod
+    def prepare_frame(capture, png_data, last_buffer):
+        """Decode a screenshot and compare it with the last slide (run on a worker thread)"""
+        image = Image.open(io.BytesIO(png_data))
+        buffer = capture.comparator.prepare(image)
+        return image, buffer, last_buffer is not None and capture.comparator.equal(buffer, last_buffer)
+
+    async def capture_deck(self, connection, url, output_folder, label):
+        """Capture one deck in a new tab, returning the slide paths
+
+        Works on a copy of the configured PowerPointCapture for its metrics
+        and writes the same outputs as capture_slides().
+        """
+        previous = CaptureManifest.load(output_folder, url) if self.capture.resume else None
+        if previous and previous.slides and not previous.complete:
+            raise Exception(tr("{} holds an interrupted capture, which the asyncio engine cannot resume; capture "
+                               "the deck without --async-tabs or pass --no-resume").format(output_folder))
+        capture = copy.copy(self.capture)
+        capture.metrics = metrics = CaptureMetrics()
+        capture.last_error = None
+        profile = capture.output_profile
+        os.makedirs(output_folder, exist_ok=True)
+        pdf_file = os.path.join(output_folder, 'presentation.pdf')
+        screenshots = None
+        tab = None
+        pdf_writer = None
+        output = None
+        try:
+            with metrics.phase('browser_start'):
+                tab = await DevToolsTab.open(connection, self.width, self.height)
+            with metrics.phase('page_load'):
+                await tab.navigate(url)
+            with metrics.phase('present_button'):
+                context = await self.enter_presentation(tab, capture.present_timeout)
+
+            manifest = CaptureManifest(output_folder, url)
+            manifest.save()
+            pdf_writer = StreamingPdfWriter(pdf_file, profile.pdf_resolution, capture.slide_store)
+            output = SlideOutputPipeline(
+                pdf_writer=pdf_writer,
+                thumbnail_folder=os.path.join(output_folder, 'thumbnails') if capture.thumbnails else None,
+                manifest=manifest,
+                metrics=metrics,
+                profile=profile,
+                store=capture.slide_store,
+            )
+            screenshots = []
+            last_buffer = None
+            consecutive_same_count = 0
+            last_slide_counter = None
+            key_presses = 0
+            slide_started = time.monotonic()
+            while True:
+                with metrics.phase('settle'):
+                    try:
+                        result = await tab.run(SETTLE_SCRIPT, 300, int(capture.settle_timeout * 1000), 3,
+                                               context=context, async_script=True)
+                        if not (result and result.get('settled')):
+                            logging.warning(tr("[{}] Slide did not settle within the time limit").format(label))
+                    except DevToolsError as e:
+                        logging.warning(tr("[{}] Settle detection failed: {}").format(label, e))
+                with metrics.phase('screenshot'):
+                    png_data = await tab.screenshot()
+                metrics.count('frames_captured')
+                with metrics.phase('compare'):
+                    image, buffer, is_same = await asyncio.to_thread(self.prepare_frame, capture, png_data, last_buffer)
+
+                if is_same:
+                    metrics.count('frames_rejected')
+                    consecutive_same_count += 1
+                    if last_slide_counter:
+                        logging.info(tr("[{}] Slide counter shows {}/{}, last slide reached").format(
+                            label, *last_slide_counter))
+                        break
+                    if consecutive_same_count >= 10:
+                        logging.info(tr("[{}] Detected 10 consecutive identical slides, presentation ended")
+                                     .format(label))
+                        break
+                else:
+                    consecutive_same_count = 0
+                    last_buffer = buffer
+                    counter = await self.read_slide_counter(tab, context) if capture.use_slide_counter else None
+                    if last_slide_counter and not (counter and counter[0] >= counter[1]):
+                        logging.info(tr("[{}] Slide counter shows {}/{}, last slide reached").format(
+                            label, *last_slide_counter))
+                        break
+                    index = len(screenshots)
+                    path = os.path.join(output_folder, f'slide_{index:03d}{profile.extension}')
+                    with metrics.phase('hash_index'):
+                        phash = await asyncio.to_thread(perceptual_hash, image)
+                    record = {
+                        'index': index,
+                        'file': os.path.basename(path),
+                        'position': key_presses,
+                        'slide_number': counter[0] if counter else None,
+                        'phash': f'{phash:064x}',
+                        'captured_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'seconds': round(time.monotonic() - slide_started, 3),
+                    }
+                    slide_started = time.monotonic()
+                    await asyncio.to_thread(output.submit, index, path, png_data, image, record=record)
+                    logging.info(tr("[{}] Captured slide {}").format(label, index + 1))
+                    metrics.count('slides_accepted')
+                    screenshots.append(path)
+                    if counter and counter[0] >= counter[1]:
+                        # Go on through the last slide's build steps up to the first unchanged frame
+                        last_slide_counter = counter
+
+                with metrics.phase('advance'):
+                    await tab.press_key()
+                key_presses += 1
+
+            with metrics.phase('output_wait'):
+                await asyncio.to_thread(output.close)
+            manifest.complete = True
+            manifest.save()
+            if screenshots:
+                with metrics.phase('pdf'):
+                    await asyncio.to_thread(pdf_writer.close)
+                pdf_writer = None
+                metrics.count('bytes_written', os.path.getsize(pdf_file))
+                logging.info(tr("[{}] Presentation saved as PDF: {}").format(label, pdf_file))
+                if capture.sprite or capture.optimize:
+                    await asyncio.to_thread(capture.postprocess, screenshots, output_folder)
+            logging.info(tr("[{}] Total slides captured: {}").format(label, len(screenshots)))
+            return screenshots
+        except asyncio.CancelledError:
+            capture.last_error = "cancelled"  # Deck timeout
+            screenshots = None
+            raise
+        except Exception as e:
+            logging.error(tr("[{}] An error occurred: {}").format(label, e))
+            capture.last_error = str(e)
+            screenshots = None
+            raise
+        finally:
+            if output:
+                output.close(raise_errors=False)
+            if pdf_writer:
+                pdf_writer.abort()
+            if tab:
+                await tab.close()
+            capture.write_report(url, output_folder, screenshots)
+
+def run_async_batch(jobs, tabs=8, deck_timeout=3600.0, capture_options=None, summary_path='batch_summary.json',
+                    chrome_binary=None, browser_url=None):
+    """Capture a list of (url, output_folder) jobs as tabs of one headless Chrome
+
+    Uses AsyncCaptureEngine instead of a process and browser per deck, so many
+    decks share one browser process. Returns the per-deck summary like run_batch().
+    """
+    logging.info(tr("Capturing {0} decks in up to {1} tabs of one browser...").format(len(jobs), tabs))
+    with AsyncCaptureEngine(tabs, chrome_binary, browser_url, deck_timeout, capture_options) as engine:
+        summary = asyncio.run(engine.run(jobs))
+    write_batch_summary(summary, summary_path)
+    return summary
+
+def capture_options_from_args(args):
+    """Build PowerPointCapture keyword arguments from parsed command-line arguments"""
+    return {
+        'compare_engine': args.compare_engine,
+        'in_memory': args.in_memory,
+        'settle_mode': args.settle,
+        'settle_timeout': args.settle_timeout,
+        'use_slide_counter': args.slide_counter,
+        'headless': args.headless,
+        'recycle_after': args.recycle_after,
+        'stream_pdf': args.stream_pdf,
+        'writer_threads': args.writer_threads,
+        'thumbnails': args.thumbnails,
+        'capture_backend': args.backend,
+        'asset_url_pattern': args.asset_url_pattern,
+        'clip_to_slide': args.clip_to_slide,
+        'clip_scale': args.clip_scale,
+        'resume': args.resume,
+        'incremental': args.incremental,
+        'skip_duplicates': args.skip_duplicates,
+        'detect_loop': args.detect_loop,
+        'present_timeout': args.present_timeout,
+        'prometheus': args.prometheus,
+        'image_format': args.format,
+        'image_quality': args.quality,
+        'dpi': args.dpi,
+        'collapse_builds': args.collapse_builds,
+        'single_step': args.single_step,
+        'text_layer': args.text_layer,
+        'slide_store': args.store,
+        'postprocess_workers': args.postprocess_workers,
+        'sprite': args.sprite,
+        'optimize': args.optimize,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=tr("Capture a SharePoint PowerPoint presentation as images and PDF"))
+    parser.add_argument('url', nargs='?', help=tr("SharePoint PowerPoint page URL (prompted when omitted)"))
+    parser.add_argument('output_folder', nargs='?', help=tr("Output folder (default: slides)"))
+    parser.add_argument('--compare-engine', choices=SlideComparator.ENGINES, default='auto',
+                        help=tr("Slide comparison engine (default: numpy when installed, otherwise imagechops)"))
+    parser.add_argument('--in-memory', action='store_true',
+                        help=tr("Compare frames in memory and write only accepted slides to disk"))
+    parser.add_argument('--settle', choices=PowerPointCapture.SETTLE_MODES, default='fixed',
+                        help=tr("How to wait for each slide: fixed sleeps or in-page settle detection "
+                                "(default: fixed)"))
+    parser.add_argument('--settle-timeout', type=float, default=5.0,
+                        help=tr("Maximum seconds to wait for a slide to settle in event mode (default: 5)"))
+    parser.add_argument('--no-slide-counter', dest='slide_counter', action='store_false',
+                        help=tr("Ignore the presenter's slide counter and detect the last slide from screenshots only"))
+    parser.add_argument('--headless', action='store_true', help=tr("Run Chrome without a visible window"))
+    parser.add_argument('--stream-pdf', action='store_true',
+                        help=tr("Append each slide to the PDF as soon as it is captured"))
+    parser.add_argument('--writer-threads', type=int, default=0,
+                        help=tr("Threads that write slides and PDF pages in the background (default: 0, inline)"))
+    parser.add_argument('--thumbnails', action='store_true',
+                        help=tr("Also save a small preview of every slide in a thumbnails folder"))
+    parser.add_argument('--backend', choices=PowerPointCapture.CAPTURE_BACKENDS, default='screenshot',
+                        help=tr("Take screenshots, or store the slide images the presenter downloads "
+                                "and fall back to screenshots (default: screenshot)"))
+    parser.add_argument('--asset-url-pattern', metavar='REGEX',
+                        help=tr("Only treat downloaded images whose URL matches REGEX as slide images"))
+    parser.add_argument('--clip-to-slide', action='store_true',
+                        help=tr("Capture only the slide area instead of the whole window"))
+    parser.add_argument('--clip-scale', type=float, default=1.0,
+                        help=tr("Scale factor for clipped captures, e.g. 2 for double resolution (default: 1)"))
+    parser.add_argument('--no-resume', dest='resume', action='store_false',
+                        help=tr("Start from the first slide even if the output folder holds an interrupted capture"))
+    parser.add_argument('--incremental', action='store_true',
+                        help=tr("Only rewrite slides that changed since the last capture in the output folder, "
+                                "and skip decks whose document version is unchanged"))
+    parser.add_argument('--present-timeout', type=float, default=30.0,
+                        help=tr("Seconds to look for the Present button before giving up (default: 30)"))
+    parser.add_argument('--skip-duplicates', action='store_true',
+                        help=tr("Drop frames identical to any slide already captured, not just the previous one"))
+    parser.add_argument('--detect-loop', action='store_true',
+                        help=tr("Stop when the presentation wraps back to its first slide"))
+    parser.add_argument('--parallel', type=int, default=1, metavar='N',
+                        help=tr("Capture one deck with N browsers working on separate slide ranges "
+                                "(needs the presenter's slide counter; default: 1)"))
+    parser.add_argument('--prometheus', action='store_true',
+                        help=tr("Also write the capture metrics in Prometheus text format to capture_metrics.prom"))
+    parser.add_argument('--single-step', action='store_true',
+                        help=tr("Advance, wait for the slide and read its counter with one in-page script per slide "
+                                "(implies --settle event)"))
+    parser.add_argument('--collapse-builds', action='store_true',
+                        help=tr("Save one image per slide with all its build animations shown, "
+                                "instead of one per animation step"))
+    parser.add_argument('--text-layer', action='store_true',
+                        help=tr("Save the text shown on each slide with its position as slide_NNN.json "
+                                "and make the PDF searchable with an invisible text layer"))
+    parser.add_argument('--format', choices=OutputProfile.FORMATS, default='png',
+                        help=tr("Slide image format: lossless png, png-palette (256 colors, small for text slides), "
+                                "jpeg or webp (default: png)"))
+    parser.add_argument('--quality', type=int, default=85,
+                        help=tr("Quality of jpeg and webp slides, 1-100 (default: 85)"))
+    parser.add_argument('--dpi', type=float,
+                        help=tr("Downscale slides to this density on a 13.33-inch wide page "
+                                "and use it as PDF resolution"))
+    parser.add_argument('--store', nargs='?', const=SLIDE_STORE, metavar='DIR',
+                        help=tr("Keep each distinct slide once in a content-addressed store shared by all decks and "
+                                "hard link deck folders to it (default DIR: {})").format(SLIDE_STORE))
+    parser.add_argument('--postprocess-workers', type=int, default=0, metavar='N',
+                        help=tr("Build the PDF, sprite and optimized copies after capture on N processes "
+                                "(default: 0, in the capture process)"))
+    parser.add_argument('--sprite', action='store_true',
+                        help=tr("Also save thumbnails.jpg, one sheet with a thumbnail of every slide, "
+                                "indexed by thumbnails.json"))
+    parser.add_argument('--optimize', choices=OPTIMIZE_FORMATS,
+                        help=tr("Also save losslessly optimized copies of the slides in this format to optimized/"))
+    parser.add_argument('--batch', metavar='FILE',
+                        help=tr("Capture every URL listed in FILE ('-' for stdin), one 'URL [output_folder]' per line"))
+    parser.add_argument('--workers', type=int,
+                        help=tr("Parallel Chrome workers in batch mode (default: limited by CPU cores and memory)"))
+    parser.add_argument('--memory-per-worker', type=float, default=WORKER_MEMORY_GB,
+                        help=tr("Memory budget in GB per worker when sizing the batch pool (default: {})")
+                        .format(WORKER_MEMORY_GB))
+    parser.add_argument('--deck-timeout', type=float, default=3600.0,
+                        help=tr("Seconds after which a batch deck is abandoned (default: 3600)"))
+    parser.add_argument('--summary', default='batch_summary.json',
+                        help=tr("Where to write the batch summary (default: batch_summary.json)"))
+    parser.add_argument('--recycle-after', type=int, default=20,
+                        help=tr("Restart a batch worker's browser after this many decks (default: 20)"))
+    parser.add_argument('--async-tabs', type=int, metavar='N',
+                        help=tr("Capture decks as up to N tabs of one headless Chrome driven over DevTools, "
+                                "instead of a browser per worker (needs the websockets package)"))
+    parser.add_argument('--chrome-binary', metavar='PATH',
+                        help=tr("Chrome executable for --async-tabs (default: looked up on PATH)"))
+    parser.add_argument('--devtools-url', metavar='WS_URL',
+                        help=tr("Use a running Chrome's DevTools browser websocket for --async-tabs "
+                                "instead of starting one"))
+    return parser.parse_args(argv)
+
+def main():
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        args = parse_args()
+        if args.batch:
+            jobs = read_batch_file(args.batch)
+            if not jobs:
+                logging.error(tr("No URLs found in batch file"))
+                return
+            if args.async_tabs:
+                summary = run_async_batch(
+                    jobs,
+                    tabs=args.async_tabs,
+                    deck_timeout=args.deck_timeout,
+                    capture_options=capture_options_from_args(args),
+                    summary_path=args.summary,
+                    chrome_binary=args.chrome_binary,
+                    browser_url=args.devtools_url,
+                )
+            else:
+                summary = run_batch(
+                    jobs,
+                    workers=args.workers or default_worker_count(args.memory_per_worker),
+                    deck_timeout=args.deck_timeout,
+                    capture_options=capture_options_from_args(args),
+                    summary_path=args.summary,
+                )
+            if any(result['status'] != 'ok' for result in summary):
+                sys.exit(1)
+            return
+
+        url = args.url
+        output_folder = args.output_folder
+        if not url:
+            url = input(tr("Enter SharePoint PowerPoint page URL: ")).strip()
+            if not url:
+                logging.error(tr("URL cannot be empty"))
+                return
+            
+            output_folder = input(tr("Enter output folder name (default: slides): ")).strip() or 'slides'
+        
+        if args.async_tabs:
+            summary = run_async_batch([(url, output_folder or 'slides')], tabs=1, deck_timeout=args.deck_timeout,
+                                      capture_options=capture_options_from_args(args), summary_path=None,
+                                      chrome_binary=args.chrome_binary, browser_url=args.devtools_url)
+            if summary[0]['status'] != 'ok':
+                sys.exit(1)
+            return
+        
+        with PowerPointCapture(**capture_options_from_args(args)) as capture:
+            if args.parallel > 1:
+                capture.capture_slides_parallel(url, output_folder or 'slides', args.parallel)
+            else:
+                # Slides are logged and written as they are yielded; closing the generator on
+                # Ctrl+C keeps the capture resumable
+                with contextlib.closing(capture.iter_slides(url, output_folder or 'slides')) as slides:
+                    for slide in slides:
+                        pass
+        if capture.last_error:
+            sys.exit(1)
+        
+    except KeyboardInterrupt:
+        logging.info(tr("\nProgram interrupted by user"))
+        sys.exit(0)
+    except Exception as e:
+        logging.error(tr("Program execution error: {}").format(e))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main() 
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""Shared fixtures: the capture module, sample slides and a scripted browser"""
+import importlib
+import io
+import os
+import sys
+
+import pytest
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def pc():
+    """The powerpoint_capture module"""
+    return importlib.import_module('powerpoint_capture')
+
+
+def make_slide(number, note='', size=(640, 360), builds=0):
+    """A slide image with a title bar, a colored block and an optional line of text
+
+    `builds` adds that many boxes below the title bar, as build animations
+    revealing them one after another would.
+    """
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, size[0], 50], fill=(30, 60, 120))
+    draw.text((20, 15), f'Slide {number}', fill='white')
+    draw.rectangle([40 + 25 * number, 120, 240 + 25 * number, 300], fill=((70 * number) % 256, 140, 90))
+    if note:
+        draw.text((300, 200), note, fill='black')
+    for build in range(builds):
+        draw.rectangle([40 + 120 * build, 60, 140 + 120 * build, 105], fill=(200, 90, 40))
+    return image
+
+
+def png_bytes(image, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', **options)
+    return buffer.getvalue()
+
+
+class FakeSwitch:
+    def default_content(self):
+        pass
+
+    def frame(self, frame):
+        pass
+
+
+class FakeDriver:
+    """Stands in for Chrome: shows deck[pos] and moves on with every right arrow key
+
+    `counters` holds the (slide number, total) the slide counter shows with
+    each frame of the deck, or None where it shows none.
+    """
+
+    def __init__(self, pc, deck, version=None, counters=None):
+        self.pc = pc
+        self.deck = deck
+        self.version = version
+        self.counters = counters
+        self.pos = 0
+        self.screenshots = 0
+        self.switch_to = FakeSwitch()
+        self.page_source = '<html></html>'
+
+    def maximize_window(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_script(self, script, *args):
+        if 'readyState' in script:
+            return 'complete'
+        if script == self.pc.DOCUMENT_VERSION_SCRIPT:
+            return self.version
+        if script == self.pc.SLIDE_COUNTER_SCRIPT and self.counters:
+            counter = self.counters[min(self.pos, len(self.counters) - 1)]
+            return {'index': counter[0], 'total': counter[1]} if counter else None
+        return None
+
+    def execute_async_script(self, script, *args):
+        return None
+
+    def find_elements(self, *args):
+        return []
+
+    def get_screenshot_as_png(self):
+        self.screenshots += 1
+        return self.deck[min(self.pos, len(self.deck) - 1)]
+
+    def quit(self):
+        pass
+
+
+class FakeActions:
+    """ActionChains replacement that advances the FakeDriver on every right arrow key"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.presses = 0
+
+    def send_keys(self, *keys):
+        self.presses += sum(1 for key in keys if key == self.driver.pc.Keys.ARROW_RIGHT)
+        return self
+
+    def pause(self, seconds):
+        return self
+
+    def perform(self):
+        self.driver.pos += self.presses
+
+
+@pytest.fixture
+def fake_capture(pc, monkeypatch):
+    """Build a PowerPointCapture that captures `deck` (PNG bytes per key press) from a FakeDriver"""
+    monkeypatch.setattr(pc.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(pc, 'ActionChains', FakeActions)
+
+    def build(deck, version=None, counters=None, **options):
+        driver = FakeDriver(pc, deck, version, counters)
+        monkeypatch.setattr(pc.webdriver, 'Chrome', lambda options=None: driver)
+        options.setdefault('use_slide_counter', False)
+        options.setdefault('frame_path_cache', None)
+        capture = pc.PowerPointCapture(**options)
+        capture.try_click_present_button = lambda driver: True
+        return capture, driver
+
+    return build
@@ -0,0 +1,51 @@
+"""AsyncCaptureEngine: options it cannot honour and output folders it must not overwrite"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('websockets')
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+
+@pytest.mark.parametrize('option', [
+    {'incremental': True}, {'text_layer': True}, {'collapse_builds': True}, {'clip_to_slide': True},
+    {'skip_duplicates': True}, {'detect_loop': True}, {'capture_backend': 'network'},
+])
+def test_rejects_options_it_does_not_implement(pc, option):
+    with pytest.raises(ValueError):
+        pc.AsyncCaptureEngine(capture_options=dict(option, frame_path_cache=None))
+
+
+def test_accepts_the_options_of_a_plain_capture(pc):
+    options = {'frame_path_cache': None, 'resume': True, 'settle_mode': 'event', 'image_format': 'jpeg'}
+    with pc.AsyncCaptureEngine(capture_options=options) as engine:
+        assert engine.capture.output_profile.image_format == 'jpeg'
+
+
+def interrupted_capture(pc, folder):
+    (folder / 'slide_000.png').write_bytes(b'slide')
+    manifest = pc.CaptureManifest(str(folder), URL)
+    manifest.slides.append({'index': 0, 'file': 'slide_000.png', 'hash': pc.file_sha256(str(folder / 'slide_000.png')),
+                            'position': 0})
+    manifest.save()
+    return (folder / pc.CaptureManifest.FILE_NAME).read_bytes()
+
+
+def test_leaves_an_interrupted_capture_alone(pc, tmp_path):
+    before = interrupted_capture(pc, tmp_path)
+    with pc.AsyncCaptureEngine(capture_options={'frame_path_cache': None}) as engine:
+        with pytest.raises(Exception, match='interrupted capture'):
+            asyncio.run(engine.capture_deck(None, URL, str(tmp_path), 'Deck 1'))
+    assert (tmp_path / pc.CaptureManifest.FILE_NAME).read_bytes() == before
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['manifest.json', 'slide_000.png']
+
+
+def test_overwrites_an_interrupted_capture_without_resume(pc, tmp_path):
+    interrupted_capture(pc, tmp_path)
+    with pc.AsyncCaptureEngine(capture_options={'frame_path_cache': None, 'resume': False}) as engine:
+        # No DevTools connection: the capture gets past the manifest check and fails on opening its tab
+        with pytest.raises(AttributeError):
+            asyncio.run(engine.capture_deck(None, URL, str(tmp_path), 'Deck 1'))
+    assert json.loads((tmp_path / 'capture_report.json').read_text(encoding='utf-8'))
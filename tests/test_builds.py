@@ -0,0 +1,49 @@
+"""Telling build animation steps from slide transitions, and collapsing them into one frame per slide"""
+import pytest
+from PIL import Image
+
+from conftest import make_slide, png_bytes
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+
+def test_revealed_elements_add_content(pc):
+    assert pc.adds_content(make_slide(3), make_slide(3, builds=1))
+    assert pc.adds_content(make_slide(3, builds=1), make_slide(3, builds=3))
+
+
+@pytest.mark.parametrize('before, after', [
+    (make_slide(3), make_slide(3)),
+    (make_slide(3), make_slide(4)),
+    (make_slide(3, builds=2), make_slide(3, builds=1)),
+    (make_slide(3, builds=2), Image.new('RGB', (640, 360), 'black')),
+])
+def test_unchanged_moved_or_removed_content_is_not_added(pc, before, after):
+    assert not pc.adds_content(before, after)
+
+
+@pytest.mark.parametrize('previous_counter, counter, after, expected', [
+    # Same slide number before the last slide: a build whatever the frame shows
+    ((2, 5), (2, 5), make_slide(4), True),
+    ((2, 5), (3, 5), make_slide(2, builds=1), False),
+    # On the last slide and without a counter, the frame decides
+    ((5, 5), (5, 5), make_slide(2, builds=1), True),
+    ((5, 5), (5, 5), Image.new('RGB', (640, 360), 'black'), False),
+    (None, None, make_slide(2, builds=1), True),
+    (None, None, make_slide(3), False),
+])
+def test_is_build_step(pc, previous_counter, counter, after, expected):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None)
+    assert capture.is_build_step(previous_counter, counter, make_slide(2), after) is expected
+
+
+def test_a_frame_equal_to_the_previous_one_is_never_a_build_step(pc):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None)
+    assert not capture.is_build_step((2, 5), (2, 5), make_slide(2), make_slide(2, builds=1), is_same=True)
+
+
+def test_collapse_builds_keeps_the_last_frame_of_each_slide(fake_capture, tmp_path):
+    frames = [make_slide(1), make_slide(2), make_slide(2, builds=1), make_slide(2, builds=2), make_slide(3)]
+    capture, _ = fake_capture([png_bytes(frame) for frame in frames], collapse_builds=True)
+    files = capture.capture_slides(URL, str(tmp_path))
+    assert [open(path, 'rb').read() for path in files] == [png_bytes(frames[index]) for index in (0, 3, 4)]
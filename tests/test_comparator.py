@@ -0,0 +1,49 @@
+"""SlideComparator: the numpy, imagechops and pure-Python engines give the same answers"""
+import pytest
+from PIL import Image
+
+from conftest import make_slide
+
+ENGINES = ('numpy', 'imagechops', 'python')
+
+
+def comparators(pc):
+    if pc.np is None:
+        pytest.skip('numpy is not installed')
+    return [pc.SlideComparator(engine) for engine in ENGINES]
+
+
+def gray(size, level):
+    return Image.new('RGB', size, (level, level, level))
+
+
+@pytest.mark.parametrize('first, second', [
+    (make_slide(1), make_slide(1)),
+    (make_slide(2, 'Growth 12%'), make_slide(2, 'Growth 15%')),
+    (make_slide(1), make_slide(2)),
+    (make_slide(3), make_slide(3, builds=2)),
+    (make_slide(1, size=(641, 361)), make_slide(1, 'Q3', size=(641, 361))),
+])
+def test_engines_agree_on_slides(pc, first, second):
+    results = {(round(c.diff_percentage(c.prepare(first), c.prepare(second)), 9),
+                c.equal(c.prepare(first), c.prepare(second))) for c in comparators(pc)}
+    assert len(results) == 1
+
+
+@pytest.mark.parametrize('step, differs', [(25, False), (26, True)])
+def test_engines_agree_at_the_pixel_threshold(pc, step, differs):
+    first, second = gray((64, 36), 100), gray((64, 36), 100 + step)
+    for comparator in comparators(pc):
+        percentage = comparator.diff_percentage(comparator.prepare(first), comparator.prepare(second))
+        assert percentage == (100.0 if differs else 0.0), comparator.engine
+
+
+def test_frames_of_different_sizes_are_never_equal(pc):
+    for comparator in comparators(pc):
+        assert not comparator.equal(comparator.prepare(make_slide(1)),
+                                    comparator.prepare(make_slide(1, size=(1280, 720))))
+
+
+def test_rejects_unknown_engines(pc):
+    with pytest.raises(ValueError):
+        pc.SlideComparator('opencv')
@@ -0,0 +1,59 @@
+"""SlideHashIndex lookups at the edges of max_distance and of the hash bands"""
+import random
+
+import pytest
+
+from conftest import make_slide
+
+
+def flip(value, *bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def spread_bits(index, count):
+    """`count` bit positions, one in each of the first `count` bands of the index"""
+    return [band * index.band_bits for band in range(count)]
+
+
+@pytest.mark.parametrize('max_distance', [0, 3, 6, 7, 12])
+def test_finds_hashes_up_to_max_distance_in_any_band(pc, max_distance):
+    index = pc.SlideHashIndex(max_distance)
+    base = random.Random(max_distance).getrandbits(256)
+    index.add(base, 4)
+    assert index.find(base) == (4, 0)
+    # Worst case for the bands: every differing bit in a band of its own
+    assert index.find(flip(base, *spread_bits(index, max_distance))) == (4, max_distance)
+    assert index.find(flip(base, *spread_bits(index, max_distance + 1))) is None
+    # The highest bit lies in the last (possibly shorter) band
+    assert index.find(flip(base, 255)) == ((4, 1) if max_distance else None)
+
+
+def test_returns_the_closest_slide_and_the_earliest_on_ties(pc):
+    index = pc.SlideHashIndex(7)
+    base = random.Random(1).getrandbits(256)
+    index.add(flip(base, 0, 40, 80), 0)
+    index.add(flip(base, 0), 1)
+    index.add(flip(base, 100), 2)
+    index.add(base ^ ((1 << 256) - 1), 3)
+    assert index.find(base) == (1, 1)
+    index.add(flip(base, 1), 0)
+    assert index.find(base) == (0, 1)
+
+
+def test_many_unrelated_hashes_do_not_match(pc):
+    rng = random.Random(2)
+    index = pc.SlideHashIndex(7)
+    hashes = [rng.getrandbits(256) for _ in range(2000)]
+    for slide, value in enumerate(hashes):
+        index.add(value, slide)
+    assert index.find(flip(hashes[1234], 3, 90, 200)) == (1234, 3)
+    assert all(index.find(rng.getrandbits(256)) is None for _ in range(200))
+
+
+def test_perceptual_hash_of_slides(pc):
+    first = pc.perceptual_hash(make_slide(1))
+    assert 0 <= first < 1 << 256
+    assert pc.hash_distance(first, pc.perceptual_hash(make_slide(1).convert('L'))) == 0
+    assert pc.hash_distance(first, pc.perceptual_hash(make_slide(6))) > 7
@@ -0,0 +1,56 @@
+"""Incremental re-capture: the slides and decks a run against the previous capture rewrites or skips"""
+import os
+
+from conftest import make_slide, png_bytes
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+
+def deck(count, note='Growth 12%'):
+    return [png_bytes(make_slide(number, note)) for number in range(1, count + 1)]
+
+
+def test_incremental_run_keeps_unchanged_slides(fake_capture, tmp_path):
+    capture, _ = fake_capture(deck(4), incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    stamps = {name: os.stat(tmp_path / name).st_mtime_ns for name in os.listdir(tmp_path)
+              if name.endswith(('.png', '.pdf'))}
+
+    capture, _ = fake_capture(deck(4), incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    assert capture.last_unchanged
+    assert {name: os.stat(tmp_path / name).st_mtime_ns for name in stamps} == stamps
+
+
+def test_incremental_run_rewrites_a_slide_with_a_small_edit(pc, fake_capture, tmp_path):
+    capture, _ = fake_capture(deck(4), incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    pdf_stamp = os.stat(tmp_path / 'presentation.pdf').st_mtime_ns
+
+    edited = make_slide(2, 'Growth 15%')
+    # Too small a change for the perceptual hash, which must not decide on its own
+    assert pc.perceptual_hash(edited) == pc.perceptual_hash(make_slide(2, 'Growth 12%'))
+    slides = deck(4)
+    slides[1] = png_bytes(edited)
+    capture, _ = fake_capture(slides, incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    assert not capture.last_unchanged
+    assert (tmp_path / 'slide_001.png').read_bytes() == slides[1]
+    assert os.stat(tmp_path / 'presentation.pdf').st_mtime_ns != pdf_stamp
+
+
+def test_incremental_run_removes_slides_the_deck_no_longer_has(fake_capture, tmp_path):
+    capture, _ = fake_capture(deck(5), incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    capture, _ = fake_capture(deck(3), incremental=True)
+    files = capture.capture_slides(URL, str(tmp_path))
+    assert sorted(name for name in os.listdir(tmp_path) if name.startswith('slide_')) == [
+        os.path.basename(path) for path in files] == ['slide_000.png', 'slide_001.png', 'slide_002.png']
+
+
+def test_unchanged_document_version_skips_the_capture(fake_capture, tmp_path):
+    capture, _ = fake_capture(deck(3), version='v7', incremental=True)
+    capture.capture_slides(URL, str(tmp_path))
+    capture, driver = fake_capture(deck(3), version='v7', incremental=True)
+    assert len(capture.capture_slides(URL, str(tmp_path))) == 3
+    assert capture.last_unchanged and driver.screenshots == 0
@@ -0,0 +1,73 @@
+"""CaptureManifest loading, and resuming an interrupted capture from it"""
+import json
+import os
+
+from conftest import make_slide, png_bytes
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+
+def deck(count, note='Growth 12%'):
+    return [png_bytes(make_slide(number, note)) for number in range(1, count + 1)]
+
+
+def write_manifest(pc, folder, count, complete=True):
+    manifest = pc.CaptureManifest(str(folder), URL, complete=complete, version='v1')
+    for index in range(count):
+        path = folder / f'slide_{index:03d}.png'
+        path.write_bytes(png_bytes(make_slide(index + 1)))
+        manifest.slides.append({'index': index, 'file': path.name, 'hash': pc.file_sha256(str(path)),
+                                'position': index})
+    manifest.save()
+    return manifest
+
+
+def test_load_round_trip(pc, tmp_path):
+    write_manifest(pc, tmp_path, 3)
+    manifest = pc.CaptureManifest.load(str(tmp_path), URL)
+    assert manifest.complete and manifest.version == 'v1'
+    assert [slide['file'] for slide in manifest.slides] == ['slide_000.png', 'slide_001.png', 'slide_002.png']
+    assert manifest.image_files() == [str(tmp_path / f'slide_{index:03d}.png') for index in range(3)]
+
+
+def test_load_ignores_other_decks_and_unreadable_files(pc, tmp_path):
+    assert pc.CaptureManifest.load(str(tmp_path), URL) is None
+    write_manifest(pc, tmp_path, 2)
+    assert pc.CaptureManifest.load(str(tmp_path), URL + '?other') is None
+    (tmp_path / pc.CaptureManifest.FILE_NAME).write_text('{"url": ', encoding='utf-8')
+    assert pc.CaptureManifest.load(str(tmp_path), URL) is None
+
+
+def test_load_stops_at_the_first_modified_or_missing_slide(pc, tmp_path):
+    write_manifest(pc, tmp_path, 4)
+    (tmp_path / 'slide_002.png').write_bytes(png_bytes(make_slide(9)))
+    manifest = pc.CaptureManifest.load(str(tmp_path), URL)
+    assert len(manifest.slides) == 2 and not manifest.complete
+    os.remove(tmp_path / 'slide_001.png')
+    assert len(pc.CaptureManifest.load(str(tmp_path), URL).slides) == 1
+
+
+def test_load_stops_at_a_gap_in_the_indexes(pc, tmp_path):
+    write_manifest(pc, tmp_path, 3)
+    path = tmp_path / pc.CaptureManifest.FILE_NAME
+    data = json.loads(path.read_text(encoding='utf-8'))
+    data['slides'][1]['index'] = 5
+    path.write_text(json.dumps(data), encoding='utf-8')
+    manifest = pc.CaptureManifest.load(str(tmp_path), URL)
+    assert len(manifest.slides) == 1 and not manifest.complete
+
+
+def test_resume_continues_after_the_last_recorded_slide(fake_capture, tmp_path):
+    slides = deck(6)
+    capture, driver = fake_capture(slides)
+    partial = capture.capture_slides(URL, str(tmp_path), progress=lambda done, total: done == 3 and capture.cancel())
+    assert partial is None and capture.last_error == 'cancelled'
+    assert not json.loads((tmp_path / 'manifest.json').read_text(encoding='utf-8'))['complete']
+
+    capture, driver = fake_capture(slides)
+    files = capture.capture_slides(URL, str(tmp_path))
+    assert [open(path, 'rb').read() for path in files] == slides
+    manifest = json.loads((tmp_path / 'manifest.json').read_text(encoding='utf-8'))
+    assert manifest['complete'] and [slide['position'] for slide in manifest['slides']] == list(range(6))
+    # The three recorded slides were skipped with key presses, not captured again
+    assert driver.screenshots < 6 + 10
@@ -0,0 +1,36 @@
+"""Choosing the downloaded image that stands in for a slide with the network backend"""
+from conftest import FakeDriver
+
+SLIDE = {'x': 80, 'y': 45, 'width': 1280, 'height': 720}
+
+
+class PresenterDriver(FakeDriver):
+    """Shows the slide container at `slide` and the images SLIDE_IMAGES_SCRIPT finds over it"""
+
+    def __init__(self, pc, slide, images):
+        super().__init__(pc, [])
+        self.slide = slide
+        self.images = images
+        self.image_args = None
+
+    def execute_script(self, script, *args):
+        if script == self.pc.SLIDE_RECT_SCRIPT:
+            return self.slide
+        if script == self.pc.SLIDE_IMAGES_SCRIPT:
+            self.image_args = args
+            return self.images
+        return super().execute_script(script, *args)
+
+
+def test_images_are_matched_against_the_slide_container(pc):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None)
+    driver = PresenterDriver(pc, SLIDE, [{'url': 'https://cdn/slide2.png', 'area': 921600}])
+    assert capture.displayed_slide_images(driver) == ['https://cdn/slide2.png']
+    assert driver.image_args == (SLIDE, capture.ASSET_COVERAGE)
+
+
+def test_without_a_slide_container_the_slide_is_a_screenshot(pc):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None)
+    driver = PresenterDriver(pc, None, [{'url': 'https://cdn/background.jpg', 'area': 921600}])
+    assert capture.displayed_slide_images(driver) == []
+    assert driver.image_args is None
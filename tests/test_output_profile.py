@@ -0,0 +1,51 @@
+"""OutputProfile: names, sizes and encodings of the slide files"""
+import io
+
+import pytest
+from PIL import Image
+
+from conftest import make_slide
+
+
+def test_rejects_unknown_formats(pc):
+    with pytest.raises(ValueError):
+        pc.OutputProfile('gif')
+
+
+@pytest.mark.parametrize('image_format, quality, dpi, key, extension, passthrough', [
+    ('png', 85, None, 'png', '.png', True),
+    ('png', 85, 150, 'png-150dpi', '.png', False),
+    ('png-palette', 85, None, 'png-palette', '.png', False),
+    ('jpeg', 70, None, 'jpeg-q70', '.jpg', False),
+    ('webp', 85, 96, 'webp-q85-96dpi', '.webp', False),
+])
+def test_names(pc, image_format, quality, dpi, key, extension, passthrough):
+    profile = pc.OutputProfile(image_format, quality, dpi)
+    assert (profile.key, profile.extension, profile.passthrough) == (key, extension, passthrough)
+
+
+def test_pdf_settings(pc):
+    assert pc.OutputProfile('png').pdf_resolution == 100.0
+    assert pc.OutputProfile('png', dpi=150).pdf_resolution == 150.0
+    assert pc.OutputProfile('png').pdf_quality == 75
+    assert pc.OutputProfile('jpeg', 60).pdf_quality == 60
+
+
+def test_dpi_only_downscales_wider_slides(pc):
+    profile = pc.OutputProfile('png', dpi=96)
+    assert profile.output_size((1920, 1080)) == (1280, 720)
+    assert profile.output_size((1000, 562)) == (1000, 562)
+    assert pc.OutputProfile('png').output_size((3840, 2160)) == (3840, 2160)
+
+
+@pytest.mark.parametrize('image_format, file_format, mode', [
+    ('png', 'PNG', 'RGB'),
+    ('png-palette', 'PNG', 'P'),
+    ('jpeg', 'JPEG', 'RGB'),
+    ('webp', 'WEBP', 'RGB'),
+])
+def test_encode(pc, image_format, file_format, mode):
+    slide = make_slide(2, 'encoded').resize((1920, 1080))
+    data = pc.OutputProfile(image_format, dpi=96).encode(slide)
+    with Image.open(io.BytesIO(data)) as image:
+        assert (image.format, image.mode, image.size) == (file_format, mode, (1280, 720))
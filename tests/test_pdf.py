@@ -0,0 +1,144 @@
+"""StreamingPdfWriter: file validity, embedded PNG and JPEG streams and the text layer"""
+import io
+import os
+import struct
+import zlib
+
+import pytest
+
+from conftest import make_slide, png_bytes
+
+pypdf = pytest.importorskip('pypdf')
+
+
+def split_idat(data, chunk_size):
+    """Rewrite a PNG file with its image data spread over IDAT chunks of chunk_size bytes"""
+    chunks = []
+    offset = 8
+    while offset < len(data):
+        length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks.append((kind, data[offset + 8:offset + 8 + length]))
+        offset += length + 12
+    idat = b''.join(body for kind, body in chunks if kind == b'IDAT')
+    out = [data[:8]]
+    for kind, body in chunks:
+        if kind == b'IDAT':
+            if idat is None:
+                continue
+            bodies = [idat[i:i + chunk_size] for i in range(0, len(idat), chunk_size)]
+            idat = None
+        else:
+            bodies = [body]
+        for part in bodies:
+            out.append(struct.pack('>I4s', len(part), kind) + part + struct.pack('>I', zlib.crc32(kind + part)))
+    return b''.join(out)
+
+
+def read_pdf(path):
+    return pypdf.PdfReader(path, strict=True)
+
+
+def page_image(page):
+    return page.images[0].image.convert('RGB')
+
+
+def test_pages_have_the_image_size_at_the_resolution(pc, tmp_path):
+    path = str(tmp_path / 'deck.pdf')
+    with pc.StreamingPdfWriter(path, resolution=150) as writer:
+        writer.add_image(make_slide(1))
+        writer.add_image(make_slide(2, size=(320, 240)))
+    reader = read_pdf(path)
+    assert len(reader.pages) == 2
+    assert [(float(page.mediabox.width), float(page.mediabox.height)) for page in reader.pages] == [
+        pytest.approx((640 * 72 / 150, 360 * 72 / 150)), pytest.approx((320 * 72 / 150, 240 * 72 / 150))]
+    assert not os.path.exists(path + '.part')
+
+
+@pytest.mark.parametrize('mode', ['RGB', 'L', 'P'])
+def test_png_files_are_embedded_losslessly(pc, tmp_path, mode):
+    image = make_slide(3, 'lossless')
+    image = image.convert(mode) if mode != 'P' else image.quantize(64)
+    slide = tmp_path / 'slide.png'
+    slide.write_bytes(split_idat(png_bytes(image), 1000))
+    encoded = pc.StreamingPdfWriter.encode_file(slide.read_bytes())
+    assert encoded.filter == '/FlateDecode' and encoded.size == image.size
+
+    path = str(tmp_path / 'deck.pdf')
+    with pc.StreamingPdfWriter(path) as writer:
+        writer.add_file(str(slide))
+    assert page_image(read_pdf(path).pages[0]).tobytes() == image.convert('RGB').tobytes()
+
+
+def test_jpeg_files_are_embedded_unchanged(pc):
+    buffer = io.BytesIO()
+    make_slide(4).save(buffer, 'JPEG', quality=80)
+    encoded = pc.StreamingPdfWriter.encode_file(buffer.getvalue())
+    assert encoded.filter == '/DCTDecode' and encoded.data == buffer.getvalue()
+
+
+@pytest.mark.parametrize('kind', ['rgba', 'transparent-palette', '16-bit', 'webp', 'cmyk-jpeg', 'truncated'])
+def test_files_a_pdf_cannot_embed_are_left_to_reencoding(pc, kind):
+    image = make_slide(5)
+    buffer = io.BytesIO()
+    if kind == 'rgba':
+        image.convert('RGBA').save(buffer, 'PNG')
+    elif kind == 'transparent-palette':
+        image.quantize(16).save(buffer, 'PNG', transparency=0)
+    elif kind == '16-bit':
+        image.convert('I;16').save(buffer, 'PNG')
+    elif kind == 'webp':
+        image.save(buffer, 'WEBP')
+    elif kind == 'cmyk-jpeg':
+        image.convert('CMYK').save(buffer, 'JPEG')
+    else:
+        buffer.write(png_bytes(image)[:40])
+    assert pc.StreamingPdfWriter.encode_file(buffer.getvalue()) is None
+
+
+def test_reencoded_slides_still_make_valid_pages(pc, tmp_path):
+    slide = tmp_path / 'slide.png'
+    make_slide(6).convert('RGBA').save(slide)
+    path = str(tmp_path / 'deck.pdf')
+    with pc.StreamingPdfWriter(path) as writer:
+        writer.add_file(str(slide))
+    page = read_pdf(path).pages[0]
+    assert page['/Resources']['/XObject']['/Im0'].get_object()['/Filter'] == '/DCTDecode'
+    assert page_image(page).size == (640, 360)
+
+
+def test_identical_slide_files_share_one_image_object(pc, tmp_path):
+    first, second = tmp_path / 'a.png', tmp_path / 'b.png'
+    first.write_bytes(png_bytes(make_slide(7)))
+    second.write_bytes(first.read_bytes())
+    path = str(tmp_path / 'deck.pdf')
+    with pc.StreamingPdfWriter(path) as writer:
+        writer.add_file(str(first))
+        writer.add_file(str(second))
+    images = [page['/Resources']['/XObject'].raw_get('/Im0') for page in read_pdf(path).pages]
+    assert len(images) == 2 and images[0].idnum == images[1].idnum
+
+
+def test_text_layer_is_extractable(pc, tmp_path):
+    text = {'width': 1280, 'height': 720, 'runs': [
+        {'text': 'Quarterly', 'x': 100, 'y': 40, 'width': 260, 'height': 48},
+        {'text': 'revenue', 'x': 380, 'y': 40, 'width': 200, 'height': 48},
+        {'text': 'Größe', 'x': 100, 'y': 300, 'width': 150, 'height': 30},
+        {'text': '季度收入', 'x': 100, 'y': 400, 'width': 160, 'height': 30},
+        {'text': '', 'x': 0, 'y': 0, 'width': 0, 'height': 0},
+    ]}
+    path = str(tmp_path / 'deck.pdf')
+    with pc.StreamingPdfWriter(path) as writer:
+        writer.add_image(make_slide(8), text=text)
+        writer.add_image(make_slide(9))
+    reader = read_pdf(path)
+    words = reader.pages[0].extract_text().split()
+    assert words == ['Quarterly', 'revenue', 'Größe', '季度收入']
+    assert reader.pages[1].extract_text().strip() == ''
+
+
+def test_abort_leaves_no_file(pc, tmp_path):
+    path = str(tmp_path / 'deck.pdf')
+    writer = pc.StreamingPdfWriter(path)
+    writer.add_image(make_slide(1))
+    writer.abort()
+    assert os.listdir(tmp_path) == []
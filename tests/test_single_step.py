@@ -0,0 +1,63 @@
+"""Stepping through slides with in-page key events (single-step mode)"""
+from conftest import FakeDriver, make_slide, png_bytes
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+
+def deck(count=4):
+    return [png_bytes(make_slide(number)) for number in range(1, count + 1)]
+
+
+def captured(files):
+    return [open(path, 'rb').read() for path in files]
+
+
+class CanvasDriver(FakeDriver):
+    """A presenter that redraws a canvas: page keys move it on, but its DOM and counter never change"""
+
+    def __init__(self, pc, deck, page_keys=True):
+        super().__init__(pc, deck)
+        self.page_keys = page_keys
+        self.steps = 0
+
+    def execute_async_script(self, script, *args):
+        if script == self.pc.SLIDE_STEP_SCRIPT:
+            self.steps += 1
+            if self.page_keys:
+                self.pos += 1
+            return {'settled': True, 'changed': False}
+        return super().execute_async_script(script, *args)
+
+
+def build(pc, fake_capture, monkeypatch, driver):
+    """A single-step capture of driver's deck through `driver`"""
+    capture, _ = fake_capture(driver.deck, single_step=True)
+    monkeypatch.setattr(pc.webdriver, 'Chrome', lambda options=None: driver)
+    return capture
+
+
+def test_a_step_that_only_redraws_the_canvas_is_not_repeated(pc, fake_capture, monkeypatch, tmp_path):
+    slides = deck()
+    driver = CanvasDriver(pc, slides)
+    capture = build(pc, fake_capture, monkeypatch, driver)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides
+    assert capture.page_keys_work is True
+
+
+def test_ignored_page_keys_fall_back_to_key_presses(pc, fake_capture, monkeypatch, tmp_path):
+    slides = deck()
+    driver = CanvasDriver(pc, slides, page_keys=False)
+    capture = build(pc, fake_capture, monkeypatch, driver)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides
+    # After three steps without effect the script is no longer tried
+    assert capture.page_keys_work is False
+    assert driver.steps == 3
+
+
+def test_resumed_canvas_capture_does_not_skip_a_slide(pc, fake_capture, monkeypatch, tmp_path):
+    slides = deck(6)
+    capture = build(pc, fake_capture, monkeypatch, CanvasDriver(pc, slides))
+    capture.capture_slides(URL, str(tmp_path), progress=lambda captured, total: captured == 3 and capture.cancel())
+    assert capture.last_error == 'cancelled'
+    capture = build(pc, fake_capture, monkeypatch, CanvasDriver(pc, slides))
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides
@@ -0,0 +1,53 @@
+"""Stopping at the last slide from the presenter's slide counter"""
+from conftest import make_slide, png_bytes
+
+URL = 'https://example.sharepoint.com/deck.pptx'
+
+# Three slides, the last one with two build steps
+FRAMES = [(1, 0), (2, 0), (3, 0), (3, 1), (3, 2)]
+COUNTERS = [(number, 3) for number, _ in FRAMES]
+
+
+def deck(frames=FRAMES):
+    return [png_bytes(make_slide(number, builds=builds)) for number, builds in frames]
+
+
+def captured(files):
+    return [open(path, 'rb').read() for path in files]
+
+
+def test_captures_the_build_steps_of_the_last_slide(fake_capture, tmp_path):
+    slides = deck()
+    capture, driver = fake_capture(slides, counters=COUNTERS, use_slide_counter=True)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides
+    # Stopped at the first unchanged frame instead of waiting for ten of them
+    assert driver.screenshots == len(slides) + 1
+
+
+def test_without_a_counter_ten_identical_frames_end_the_capture(fake_capture, tmp_path):
+    slides = deck()
+    capture, driver = fake_capture(slides)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides
+    assert driver.screenshots == len(slides) + 10
+
+
+def test_stops_when_the_counter_leaves_the_last_slide(fake_capture, tmp_path):
+    slides = deck([(1, 0), (2, 0), (9, 0)])
+    # The third frame is an end-of-show screen without a counter
+    capture, _ = fake_capture(slides, counters=[(1, 2), (2, 2), None], use_slide_counter=True)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == slides[:2]
+
+
+def test_collapses_the_build_steps_of_the_last_slide(fake_capture, tmp_path):
+    slides = deck()
+    capture, _ = fake_capture(slides, counters=COUNTERS, use_slide_counter=True, collapse_builds=True)
+    assert captured(capture.capture_slides(URL, str(tmp_path))) == [slides[0], slides[1], slides[4]]
+
+
+def test_slide_ranges_keep_the_build_steps_of_the_last_slide(fake_capture, tmp_path):
+    slides = deck()
+    capture, driver = fake_capture(slides, counters=COUNTERS, use_slide_counter=True)
+    driver.pos = 1
+    frames = capture.capture_range(driver, 2, 3, str(tmp_path))
+    assert [slide_number for _, slide_number, _, _ in frames] == [2, 3, 3, 3]
+    assert [open(path, 'rb').read() for path, _, _, _ in frames] == slides[1:]
@@ -0,0 +1,39 @@
+"""Reading the text layer of a slide from the presenter's DOM"""
+from conftest import FakeDriver
+
+SLIDE = {'x': 0, 'y': 0, 'width': 640, 'height': 360}
+RUNS = [{'text': 'Revenue', 'x': 40, 'y': 20, 'width': 120, 'height': 30}]
+
+
+class TextDriver(FakeDriver):
+    """A presenter whose slide container is at `slide`, in a window twice its width"""
+
+    def __init__(self, pc, slide):
+        super().__init__(pc, [])
+        self.slide = slide
+        self.text_args = None
+
+    def execute_script(self, script, *args):
+        if script == self.pc.SLIDE_RECT_SCRIPT:
+            return self.slide
+        if script == self.pc.SLIDE_TEXT_SCRIPT:
+            self.text_args = args
+            return RUNS
+        if script == 'return window.innerWidth':
+            return 1280
+        return super().execute_script(script, *args)
+
+
+def test_text_is_read_from_the_slide_container_only(pc):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None, text_layer=True)
+    driver = TextDriver(pc, SLIDE)
+    layer = capture.read_slide_text(driver, None, (2560, 1440))
+    assert driver.text_args == (SLIDE,)
+    assert layer['runs'] == [{'text': 'Revenue', 'x': 80, 'y': 40, 'width': 240, 'height': 60}]
+
+
+def test_no_text_layer_without_a_slide_container(pc):
+    capture = pc.PowerPointCapture(use_slide_counter=False, frame_path_cache=None, text_layer=True)
+    driver = TextDriver(pc, None)
+    assert capture.read_slide_text(driver, None, (2560, 1440)) is None
+    assert driver.text_args is None